@@ -1,13 +1,51 @@
+from django.conf import settings
 from django.contrib import admin
 from django.utils.html import format_html
-from django.db.models import Count
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from .counting import CountingPaginator
 from .models import Dormitory, RepairOrder
+from .search import search_repair_orders
+
+
+class RepairRecordFilter(admin.SimpleListFilter):
+    """按报修记录筛选宿舍，基于 DormitoryAdmin.get_queryset 注解的统计数"""
+    title = '维修记录'
+    parameter_name = 'repair_record'
+
+    # 报修次数达到该值视为频繁报修
+    FREQUENT_THRESHOLD = 5
+
+    def lookups(self, request, model_admin):
+        return (
+            ('pending', '有待处理'),
+            ('completed', '已全部处理'),
+            ('none', '无报修'),
+            ('frequent', f'报修{self.FREQUENT_THRESHOLD}次及以上'),
+        )
+
+    def queryset(self, request, queryset):
+        value = self.value()
+        if value == 'pending':
+            return queryset.filter(repair_pending__gt=0)
+        if value == 'completed':
+            # 待处理和维修中的都没有才算全部处理
+            return queryset.filter(repair_total__gt=0, repair_open=0)
+        if value == 'none':
+            return queryset.filter(repair_total=0)
+        if value == 'frequent':
+            return queryset.filter(repair_total__gte=self.FREQUENT_THRESHOLD)
+        return queryset
 
 
 @admin.register(Dormitory)
 class DormitoryAdmin(admin.ModelAdmin):
-    list_display = ['display_dormitory_info', 'building_name', 'room_number', 'floor', 'display_repair_count']
-    list_filter = ['building_name', 'floor']
+    list_display = [
+        'display_dormitory_info', 'building_name', 'room_number', 'floor', 'display_repair_count', 'repair_total'
+    ]
+    list_filter = ['building_name', 'floor', RepairRecordFilter]
+    # 筛选后不再额外统计全部宿舍数
+    show_full_result_count = False
     search_fields = ['building_name', 'room_number']
     ordering = ['building_name', 'floor', 'room_number']
     list_per_page = 25
@@ -33,9 +71,9 @@ class DormitoryAdmin(admin.ModelAdmin):
     display_dormitory_info.short_description = '🏠 宿舍信息'
     
     def display_repair_count(self, obj):
-        """统计报修次数"""
-        total_count = obj.repairorder_set.count()
-        pending_count = obj.repairorder_set.filter(status='pending').count()
+        """统计报修次数（get_queryset 中注解，不再逐行查询）"""
+        total_count = obj.repair_total
+        pending_count = obj.repair_pending
         
         if total_count == 0:
             return format_html(
@@ -61,9 +99,29 @@ class DormitoryAdmin(admin.ModelAdmin):
                 '</div>', total_count
             )
     display_repair_count.short_description = '🔧 维修记录'
+    display_repair_count.admin_order_field = 'repair_pending'
+    
+    def repair_total(self, obj):
+        """报修总次数"""
+        return obj.repair_total
+    repair_total.short_description = '📈 报修次数'
+    repair_total.admin_order_field = 'repair_total'
     
     def get_queryset(self, request):
-        return super().get_queryset(request).prefetch_related('repairorder_set')
+        # 列表查询中用相关子查询统计每个宿舍的报修总数和待处理数，不再加载全部历史工单；
+        # 子查询不产生 JOIN / GROUP BY，分页 COUNT 和筛选项的 DISTINCT 查询不受影响
+        return super().get_queryset(request).annotate(
+            repair_total=self._repair_count(),
+            repair_pending=self._repair_count(status='pending'),
+            repair_open=self._repair_count(status__in=['pending', 'processing']),
+        )
+    
+    @staticmethod
+    def _repair_count(**filters):
+        counts = RepairOrder.objects.filter(dormitory=OuterRef('pk'), **filters).order_by().values(
+            'dormitory'
+        ).annotate(count=Count('id')).values('count')
+        return Coalesce(Subquery(counts), Value(0))
 
 
 @admin.register(RepairOrder)
@@ -83,6 +141,8 @@ class RepairOrderAdmin(admin.ModelAdmin):
     ordering = ['-created_at']
     list_select_related = ['user', 'dormitory', 'repair_worker']
     list_per_page = 20
+    # 分页总数按 REPAIR_ORDER_ADMIN_COUNT_MODE 估算或缓存（见 counting.py），也不再统计未筛选的总数
+    show_full_result_count = False
     
     fieldsets = (
         ('📝 报修基本信息', {
@@ -220,6 +280,18 @@ class RepairOrderAdmin(admin.ModelAdmin):
         return super().get_queryset(request).select_related(
             'user', 'dormitory', 'repair_worker'
         )
+    
+    def get_paginator(self, request, queryset, per_page, orphans=0, allow_empty_first_page=True):
+        return CountingPaginator(
+            queryset, per_page, orphans, allow_empty_first_page,
+            count_mode=getattr(settings, 'REPAIR_ORDER_ADMIN_COUNT_MODE', 'estimate')
+        )
+    
+    def get_search_results(self, request, queryset, search_term):
+        """搜索框走 n-gram 全文检索，而不是多列 LIKE"""
+        if not search_term.strip():
+            return queryset, False
+        return search_repair_orders(queryset, search_term, rank=False), False
 
 
 # 自定义管理后台标题
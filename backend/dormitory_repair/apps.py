@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class DormitoryRepaiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'dormitory_repair'
+
+    def ready(self):
+        # 注册信号处理
+        from . import signals  # noqa: F401
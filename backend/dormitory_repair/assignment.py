@@ -0,0 +1,363 @@
+"""
+维修员自动分配
+
+AssignmentEngine 在进程内保存每个维修员的负载，为工单挑选得分最低的维修员:
+    得分 = 未完成工单数
+           - PROXIMITY_BONUS（维修员当前在该楼栋有未完成工单）
+           - SPECIALTY_BONUS（该故障类型是维修员的专长）
+未完成工单数达到 REPAIR_WORKER_MAX_OPEN_ORDERS 的维修员不再分配；得分相同时 ID 小者优先。
+专长为最近 SPECIALTY_WINDOW_DAYS 天内完成该类工单不少于 SPECIALTY_MIN_COMPLETED 张的故障类型。
+
+维修员按 (负载, ID) 放在四类最小堆中：全部维修员、在某楼栋有工单的、擅长某故障类型的、
+两者都满足的。同一个堆里的维修员对这张工单的加分相同，负载最小者即得分最低，因此只需比较
+四个堆顶，分配一张工单为 O(log n)，不必扫描所有维修员的未完成工单。负载变化时压入新的
+(负载, ID)，旧记录在取堆顶时丢弃（延迟删除）。
+
+引擎在第一次使用时从数据库构建，之后由 signals.py 在工单分配、完成、删除后增量更新，
+并每隔 REPAIR_ASSIGNMENT_REFRESH 秒重新构建，以纳入其他进程的修改。引擎只负责挑选
+维修员，写入时仍锁定工单行并检查状态，负载略有偏差不会导致重复分配。
+"""
+import heapq
+import threading
+import time
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import Group, User
+from django.db import transaction
+from django.db.models import Case, Count, Value, When
+from django.utils import timezone
+
+from .models import Dormitory, RepairOrder
+
+
+# 计入维修员负载的工单状态
+OPEN_STATUSES = ('pending', 'processing')
+# 同楼栋、专长的加分（相当于少几张未完成工单）
+PROXIMITY_BONUS = 2
+SPECIALTY_BONUS = 3
+# 专长的判定：统计最近多少天内完成的工单、至少完成几张
+SPECIALTY_WINDOW_DAYS = 180
+SPECIALTY_MIN_COMPLETED = 3
+# 批量分配每个事务处理的工单数
+ASSIGN_CHUNK_SIZE = 500
+# 分配时查询、锁定的工单字段（与批量更新相同，供 repair_orders_bulk_updated 使用）
+ORDER_FIELDS = ('id', 'status', 'priority', 'repair_worker_id', 'fault_type', 'dormitory_id', 'created_at')
+
+ALL_WORKERS = ('all',)
+
+
+class AssignmentError(ValueError):
+    """工单当前状态不能分配维修员"""
+
+
+class AssignmentEngine:
+    """
+    维修员负载的内存索引，不加锁，由调用方保证串行访问
+
+    max_open 为每个维修员最多的未完成工单数，None 表示不限
+    """
+
+    def __init__(self, max_open=None):
+        self.max_open = max_open
+        self.loads = {}
+        self.specialties = {}
+        self.buildings = {}
+        self.dormitory_buildings = {}
+        self._heaps = {}
+        self._members = {}
+
+    def add_worker(self, worker_id, specialties=()):
+        self.loads[worker_id] = 0
+        self.specialties[worker_id] = set(specialties)
+        self.buildings[worker_id] = Counter()
+        self._join(ALL_WORKERS, worker_id)
+        for fault_type in self.specialties[worker_id]:
+            self._join(('fault', fault_type), worker_id)
+
+    def add_order(self, worker_id, building_name):
+        """维修员新增一张未完成工单，不在名单中的维修员忽略"""
+        if worker_id not in self.loads:
+            return
+        buildings = self.buildings[worker_id]
+        buildings[building_name] += 1
+        if buildings[building_name] == 1:
+            self._join(('building', building_name), worker_id)
+            for fault_type in self.specialties[worker_id]:
+                self._join(('both', building_name, fault_type), worker_id)
+        self._set_load(worker_id, self.loads[worker_id] + 1)
+
+    def remove_order(self, worker_id, building_name):
+        """维修员的一张未完成工单完成、取消或转给他人"""
+        if worker_id not in self.loads or self.buildings[worker_id][building_name] <= 0:
+            return
+        buildings = self.buildings[worker_id]
+        buildings[building_name] -= 1
+        if not buildings[building_name]:
+            del buildings[building_name]
+            self._members[('building', building_name)].discard(worker_id)
+            for fault_type in self.specialties[worker_id]:
+                self._members[('both', building_name, fault_type)].discard(worker_id)
+        self._set_load(worker_id, self.loads[worker_id] - 1)
+
+    def score(self, worker_id, building_name, fault_type):
+        score = self.loads[worker_id]
+        if self.buildings[worker_id][building_name] > 0:
+            score -= PROXIMITY_BONUS
+        if fault_type in self.specialties[worker_id]:
+            score -= SPECIALTY_BONUS
+        return score
+
+    def best_worker(self, building_name, fault_type):
+        """得分最低、未满负荷的维修员ID，都已满负荷时返回 None"""
+        best = None
+        for group in (
+            ALL_WORKERS,
+            ('building', building_name),
+            ('fault', fault_type),
+            ('both', building_name, fault_type),
+        ):
+            worker_id = self._top(group)
+            if worker_id is None:
+                continue
+            candidate = (self.score(worker_id, building_name, fault_type), worker_id)
+            if best is None or candidate < best:
+                best = candidate
+        return best[1] if best is not None else None
+
+    def _groups(self, worker_id):
+        yield ALL_WORKERS
+        for fault_type in self.specialties[worker_id]:
+            yield ('fault', fault_type)
+        for building_name in self.buildings[worker_id]:
+            yield ('building', building_name)
+            for fault_type in self.specialties[worker_id]:
+                yield ('both', building_name, fault_type)
+
+    def _join(self, group, worker_id):
+        self._members.setdefault(group, set()).add(worker_id)
+        heapq.heappush(self._heaps.setdefault(group, []), (self.loads[worker_id], worker_id))
+
+    def _set_load(self, worker_id, load):
+        self.loads[worker_id] = load
+        entry = (load, worker_id)
+        for group in self._groups(worker_id):
+            heapq.heappush(self._heaps[group], entry)
+
+    def _top(self, group):
+        heap = self._heaps.get(group)
+        if not heap:
+            return None
+        members = self._members[group]
+        if len(heap) > 2 * len(members) + 64:
+            # 过期记录太多时重建堆
+            heap[:] = [(self.loads[worker_id], worker_id) for worker_id in members]
+            heapq.heapify(heap)
+        while heap:
+            load, worker_id = heap[0]
+            if worker_id in members and self.loads[worker_id] == load:
+                if self.max_open is not None and load >= self.max_open:
+                    return None
+                return worker_id
+            heapq.heappop(heap)
+        return None
+
+
+# ========================
+# 进程内引擎
+# ========================
+
+_engine = None
+_loaded_at = 0.0
+_lock = threading.RLock()
+
+
+def worker_queryset():
+    """可分配的维修员：REPAIR_WORKER_GROUP 组内的有效用户，该组不存在时为全部有效的员工用户"""
+    users = User.objects.filter(is_active=True)
+    group_name = getattr(settings, 'REPAIR_WORKER_GROUP', '维修员')
+    if group_name and Group.objects.filter(name=group_name).exists():
+        return users.filter(groups__name=group_name)
+    return users.filter(is_staff=True)
+
+
+def is_worker(user_id):
+    """用户是否为可分配、可领取工单的维修员"""
+    return worker_queryset().filter(pk=user_id).exists()
+
+
+def build_engine():
+    """从数据库构建分配引擎"""
+    engine = AssignmentEngine(max_open=getattr(settings, 'REPAIR_WORKER_MAX_OPEN_ORDERS', 20))
+    workers = worker_queryset()
+    since = timezone.now() - timedelta(days=SPECIALTY_WINDOW_DAYS)
+    specialties = {}
+    for row in RepairOrder.objects.filter(
+        status='completed', completed_at__gte=since, repair_worker__in=workers
+    ).order_by().values('repair_worker_id', 'fault_type').annotate(
+        completed=Count('id')
+    ).filter(completed__gte=SPECIALTY_MIN_COMPLETED):
+        specialties.setdefault(row['repair_worker_id'], []).append(row['fault_type'])
+
+    for worker_id in workers.order_by('id').values_list('id', flat=True):
+        engine.add_worker(worker_id, specialties.get(worker_id, ()))
+    engine.dormitory_buildings = dict(Dormitory.objects.values_list('id', 'building_name'))
+    for worker_id, dormitory_id in RepairOrder.objects.filter(
+        status__in=OPEN_STATUSES, repair_worker__in=workers
+    ).order_by().values_list('repair_worker_id', 'dormitory_id'):
+        engine.add_order(worker_id, _building_of(engine, dormitory_id))
+    return engine
+
+
+def get_engine():
+    """当前进程的分配引擎，首次使用或超过 REPAIR_ASSIGNMENT_REFRESH 秒后重新构建"""
+    global _engine, _loaded_at
+    with _lock:
+        if _engine is None or time.monotonic() - _loaded_at > getattr(settings, 'REPAIR_ASSIGNMENT_REFRESH', 300):
+            _engine = build_engine()
+            _loaded_at = time.monotonic()
+        return _engine
+
+
+def _building_of(engine, dormitory_id):
+    building_name = engine.dormitory_buildings.get(dormitory_id)
+    if building_name is None:
+        building_name = Dormitory.objects.filter(id=dormitory_id).values_list('building_name', flat=True).first()
+        engine.dormitory_buildings[dormitory_id] = building_name
+    return building_name
+
+
+def orders_moved(moves):
+    """
+    工单负载变化：moves 为 [(修改前, 修改后)]，每项为 (维修员ID, 宿舍ID)，
+    None 表示不计入负载（未分配、已完成或已取消）。事务提交后更新引擎，引擎尚未构建时忽略
+    """
+    moves = [(before, after) for before, after in moves if before != after]
+    if not moves or _engine is None:
+        return
+    transaction.on_commit(lambda: _apply_moves(moves))
+
+
+def _apply_moves(moves):
+    with _lock:
+        if _engine is None:
+            return
+        for before, after in moves:
+            if before is not None:
+                _engine.remove_order(before[0], _building_of(_engine, before[1]))
+            if after is not None:
+                _engine.add_order(after[0], _building_of(_engine, after[1]))
+
+
+# ========================
+# 分配
+# ========================
+
+def _pending_order_ids(limit):
+    """按领取顺序（优先级、创建时间）取待分配的工单ID"""
+    from .dispatch import CLAIM_PRIORITY_ORDER, claimable_orders
+
+    order_ids = []
+    for priority in CLAIM_PRIORITY_ORDER:
+        if len(order_ids) >= limit:
+            break
+        order_ids.extend(
+            claimable_orders().filter(priority=priority).order_by('created_at', 'id').values_list(
+                'id', flat=True
+            )[:limit - len(order_ids)]
+        )
+    return order_ids
+
+
+def assign_orders(order_ids=None, limit=5000):
+    """
+    为待处理、未分配的工单自动分配维修员并改为维修中，一次挑选一批，每批一个 UPDATE
+
+    order_ids 为 None 时按优先级、创建时间取前 limit 张。返回 (分配结果 {工单ID: 维修员ID}，
+    未分配的工单ID)，未分配指已不是待分配状态，或维修员均已满负荷
+    """
+    # signals.py 导入了本模块，在函数内导入以免循环导入
+    from .signals import repair_orders_bulk_updated
+
+    if order_ids is None:
+        order_ids = _pending_order_ids(limit)
+    assigned = {}
+    for start in range(0, len(order_ids), ASSIGN_CHUNK_SIZE):
+        chunk = order_ids[start:start + ASSIGN_CHUNK_SIZE]
+        # 引擎上暂记本批的分配，写入后撤销，提交后由信号正式计入
+        with _lock, transaction.atomic():
+            engine = get_engine()
+            rows = {
+                row['id']: row
+                for row in RepairOrder.objects.select_for_update().filter(
+                    id__in=chunk, status='pending', repair_worker__isnull=True
+                ).values(*ORDER_FIELDS)
+            }
+            picked = []
+            full = False
+            for order_id in chunk:
+                row = rows.get(order_id)
+                if row is None:
+                    continue
+                building_name = _building_of(engine, row['dormitory_id'])
+                worker_id = engine.best_worker(building_name, row['fault_type'])
+                if worker_id is None:
+                    # 维修员均已满负荷
+                    full = True
+                    break
+                engine.add_order(worker_id, building_name)
+                picked.append((row, worker_id, building_name))
+            if not picked:
+                if full:
+                    break
+                continue
+
+            by_worker = {}
+            for row, worker_id, _ in picked:
+                by_worker.setdefault(worker_id, []).append(row['id'])
+            RepairOrder.objects.filter(id__in=[row['id'] for row, _, _ in picked]).update(
+                status='processing',
+                repair_worker_id=Case(*[
+                    When(id__in=ids, then=Value(worker_id)) for worker_id, ids in by_worker.items()
+                ]),
+                updated_at=timezone.now(),
+            )
+            for row, worker_id, building_name in picked:
+                engine.remove_order(worker_id, building_name)
+                assigned[row['id']] = worker_id
+            repair_orders_bulk_updated.send(sender=RepairOrder, changes=[
+                (row, {'status': 'processing', 'repair_worker_id': worker_id}) for row, worker_id, _ in picked
+            ])
+        if full:
+            break
+    return assigned, [order_id for order_id in order_ids if order_id not in assigned]
+
+
+def assign_order(order_id, worker_id=None):
+    """
+    把工单分配给 worker_id，为 None 时自动挑选；待处理的工单同时改为维修中
+
+    返回维修员ID，自动挑选时维修员均已满负荷返回 None。工单不存在抛出
+    RepairOrder.DoesNotExist，状态不能分配时抛出 AssignmentError
+    """
+    from .signals import repair_orders_bulk_updated
+
+    with _lock, transaction.atomic():
+        row = RepairOrder.objects.select_for_update().values(*ORDER_FIELDS).get(id=order_id)
+        if row['status'] not in OPEN_STATUSES:
+            raise AssignmentError('已完成或已取消的工单不能分配维修员')
+        if worker_id is None:
+            if row['repair_worker_id'] is not None:
+                raise AssignmentError('工单已分配维修员，重新分配请指定维修员')
+            engine = get_engine()
+            worker_id = engine.best_worker(_building_of(engine, row['dormitory_id']), row['fault_type'])
+            if worker_id is None:
+                return None
+
+        updates = {'repair_worker_id': worker_id}
+        if row['status'] == 'pending':
+            updates['status'] = 'processing'
+        RepairOrder.objects.filter(id=order_id).update(updated_at=timezone.now(), **updates)
+        repair_orders_bulk_updated.send(sender=RepairOrder, changes=[(row, updates)])
+    return worker_id
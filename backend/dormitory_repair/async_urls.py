@@ -0,0 +1,24 @@
+"""
+ASGI 部署使用的路由：与 urls.py 相同，读接口替换为 async_views 中的异步版本
+"""
+from django.urls import path
+
+from . import async_views
+from .urls import app_name, urlpatterns as sync_urlpatterns
+
+# include() 读取 app_name
+__all__ = ['app_name', 'urlpatterns']
+
+ASYNC_VIEWS = {
+    'api_system_info': async_views.api_system_info,
+    'api_current_user': async_views.api_current_user,
+    'api_repair_orders': async_views.api_repair_orders,
+    'api_repair_order_detail': async_views.api_repair_order_detail,
+    'api_dormitories': async_views.api_dormitories,
+    'api_dormitory_detail': async_views.api_dormitory_detail,
+}
+
+urlpatterns = [
+    path(str(pattern.pattern), ASYNC_VIEWS.get(pattern.name, pattern.callback), name=pattern.name)
+    for pattern in sync_urlpatterns
+]
@@ -0,0 +1,188 @@
+"""
+读接口的异步版本（ASGI）
+
+在 uvicorn 等 ASGI 服务器下，同步视图的每个慢查询都要占住一个线程；这里的
+GET 接口使用异步 ORM（acount / aget / async for），等待数据库时让出事件循环，
+一个进程可以同时服务更多轮询请求。响应内容与 views.py 完全一致；写操作
+（POST/PUT/PATCH/DELETE）仍交给同步视图处理，保持原有的事务语义。
+
+路由见 async_urls.py，由 myproject/asgi.py 启用，WSGI 部署不受影响。
+"""
+from asgiref.sync import sync_to_async
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_http_methods
+
+from . import counters, counting, views
+from .conditional import conditional_get
+from .fieldsets import ORDER_DETAIL_FIELDS, InvalidFields, lookups_for, parse_fields, serialize
+from .models import Dormitory, RepairOrder
+from .pagination import InvalidCursor
+from .responses import ApiResponse
+
+
+@csrf_exempt
+@require_http_methods(["GET"])
+async def api_system_info(request):
+    """
+    系统信息API
+    """
+    return ApiResponse(views._system_info_payload(await counters.aread()))
+
+
+@csrf_exempt
+@require_http_methods(["GET"])
+async def api_current_user(request):
+    """
+    获取当前用户信息API
+    """
+    try:
+        return views._current_user_response(await request.auser())
+    except Exception as e:
+        return views._current_user_error(e)
+
+
+# ========================
+# 报修工单相关API
+# ========================
+
+_sync_repair_orders = sync_to_async(views.api_repair_orders)
+_sync_repair_order_detail = sync_to_async(views.api_repair_order_detail)
+
+
+async def _repair_orders_validators(request):
+    """同 views._repair_orders_validators"""
+    return views._repair_orders_etag(request, await counters.aread_version()), None
+
+
+async def _repair_order_validators(request, order_id):
+    """同 views._repair_order_validators"""
+    return views._repair_order_etag(request, order_id, await views._repair_order_validator_rows(order_id).afirst())
+
+
+@csrf_exempt
+@conditional_get(_repair_orders_validators)
+async def api_repair_orders(request):
+    """
+    报修工单API - GET(列表)异步处理，POST(创建)交给同步视图
+    """
+    if request.method == 'GET':
+        return await _get_repair_orders_list(request)
+    return await _sync_repair_orders(request)
+
+
+async def _get_repair_orders_list(request):
+    """
+    获取报修工单列表，参数与返回格式同 views._get_repair_orders_list
+    """
+    try:
+        page_queryset, count_query, build = views._repair_orders_page(request)
+        total_count = await counting.acount_rows(*count_query) if count_query else None
+        return ApiResponse(build([row async for row in page_queryset], total_count))
+
+    except InvalidCursor:
+        return ApiResponse({'error': '无效的分页游标'}, status=400)
+    except (InvalidFields, counting.InvalidCountMode) as e:
+        return ApiResponse({'error': str(e)}, status=400)
+    except Exception as e:
+        return ApiResponse({
+            'error': f'获取工单列表失败: {str(e)}'
+        }, status=500)
+
+
+@csrf_exempt
+@conditional_get(_repair_order_validators)
+async def api_repair_order_detail(request, order_id):
+    """
+    工单详情API - GET(详情)异步处理，PUT/PATCH/DELETE 交给同步视图
+    """
+    if request.method != 'GET':
+        return await _sync_repair_order_detail(request, order_id)
+    try:
+        fields = parse_fields(request.GET.get('fields'), ORDER_DETAIL_FIELDS)
+        row = await RepairOrder.objects.values(*lookups_for(fields)).aget(id=order_id)
+        return ApiResponse(serialize(row, fields))
+    except RepairOrder.DoesNotExist:
+        return ApiResponse({'error': '工单不存在'}, status=404)
+    except InvalidFields as e:
+        return ApiResponse({'error': str(e)}, status=400)
+    except Exception as e:
+        return ApiResponse({
+            'error': f'操作失败: {str(e)}'
+        }, status=500)
+
+
+# ========================
+# 宿舍管理API
+# ========================
+
+_sync_dormitories = sync_to_async(views.api_dormitories)
+_sync_dormitory_detail = sync_to_async(views.api_dormitory_detail)
+
+
+async def _repair_status_counts(dormitory_ids):
+    if not dormitory_ids:
+        return {}
+    return views._group_status_counts([row async for row in views._repair_status_rows(dormitory_ids)])
+
+
+async def _dormitories_validators(request):
+    """同 views._dormitories_validators"""
+    return views._dormitories_etag(request, await counters.aread_version()), None
+
+
+async def _dormitory_validators(request, dormitory_id):
+    """同 views._dormitory_validators"""
+    updated_at = await Dormitory.objects.filter(id=dormitory_id).values_list('updated_at', flat=True).afirst()
+    return views._dormitory_etag(dormitory_id, updated_at, await counters.aread_version() if updated_at else None)
+
+
+@csrf_exempt
+@conditional_get(_dormitories_validators)
+async def api_dormitories(request):
+    """
+    宿舍管理API - GET(列表)异步处理，POST(创建)交给同步视图
+    """
+    if request.method == 'GET':
+        return await _get_dormitories_list(request)
+    return await _sync_dormitories(request)
+
+
+async def _get_dormitories_list(request):
+    """
+    获取宿舍列表，参数与返回格式同 views._get_dormitories_list
+    """
+    try:
+        queryset, page_queryset, build = views._dormitories_page(request)
+        total_count = await queryset.acount()
+        page_dormitories = [dormitory async for dormitory in page_queryset]
+        status_counts = await _repair_status_counts([dormitory.id for dormitory in page_dormitories])
+        return ApiResponse(build(total_count, page_dormitories, status_counts))
+
+    except Exception as e:
+        return ApiResponse({
+            'error': f'获取宿舍列表失败: {str(e)}'
+        }, status=500)
+
+
+@csrf_exempt
+@conditional_get(_dormitory_validators)
+async def api_dormitory_detail(request, dormitory_id):
+    """
+    宿舍详情API - GET(详情)异步处理，PUT/PATCH/DELETE 交给同步视图
+    """
+    if request.method != 'GET':
+        return await _sync_dormitory_detail(request, dormitory_id)
+    try:
+        dormitory = await Dormitory.objects.aget(id=dormitory_id)
+        repair_orders = RepairOrder.objects.filter(dormitory=dormitory).select_related('user')
+        repair_list = [
+            views._serialize_recent_repair(order) async for order in repair_orders[:10]  # 只显示最近10条
+        ]
+        counts = (await _repair_status_counts([dormitory.id])).get(dormitory.id)
+        return ApiResponse(views._serialize_dormitory_detail(dormitory, repair_list, counts))
+    except Dormitory.DoesNotExist:
+        return ApiResponse({'error': '宿舍不存在'}, status=404)
+    except Exception as e:
+        return ApiResponse({
+            'error': f'操作失败: {str(e)}'
+        }, status=500)
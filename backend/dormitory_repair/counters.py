@@ -0,0 +1,152 @@
+"""
+系统统计计数器
+
+/api/system/info/ 的工单、宿舍、用户数量不再每次 COUNT(*)，而是读取
+StatisticCounter 表（一次主键范围查询）。计数由 signals.py 中的
+post_save/post_delete 增量维护，绕过信号的批量操作造成的偏差由
+reconcile()（manage.py reconcile_counters）定期修正；对账与增量之间不加全局锁，
+计数为最终一致。
+"""
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Case, Count, F, Value, When
+from django.utils import timezone
+
+from .models import Dormitory, RepairOrder, StatisticCounter
+
+
+ORDERS_TOTAL = 'orders.total'
+DORMITORIES_TOTAL = 'dormitories.total'
+USERS_TOTAL = 'users.total'
+# 工单列表的数据版本：工单、宿舍或报修人资料每次变化后递增，用作列表的 ETag，
+# 不参与对账（见 views._repair_orders_validators）
+ORDERS_VERSION = 'orders.version'
+
+
+def order_status_key(status):
+    return f'orders.{status}'
+
+
+ALL_KEYS = [
+    ORDERS_TOTAL,
+    *(order_status_key(status) for status, _ in RepairOrder.STATUS_CHOICES),
+    DORMITORIES_TOTAL,
+    USERS_TOTAL,
+]
+
+
+def adjust(deltas):
+    """
+    在当前事务提交后增减计数，deltas 为 {name: delta}
+
+    所有计数在一条 UPDATE 中完成；计数行不存在时忽略，等待对账补齐
+    """
+    deltas = {name: delta for name, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    transaction.on_commit(lambda: _apply(deltas))
+
+
+def _apply(deltas):
+    increment = Case(
+        *(When(name=name, then=Value(delta)) for name, delta in deltas.items()),
+        default=Value(0),
+    )
+    StatisticCounter.objects.filter(name__in=list(deltas)).update(
+        value=F('value') + increment,
+        updated_at=timezone.now(),
+    )
+
+
+def exact_counts(using=DEFAULT_DB_ALIAS):
+    """直接从业务表统计精确值"""
+    counts = dict.fromkeys(ALL_KEYS, 0)
+    for row in RepairOrder.objects.using(using).order_by().values('status').annotate(total=Count('id')):
+        counts[order_status_key(row['status'])] = row['total']
+        counts[ORDERS_TOTAL] += row['total']
+    counts[DORMITORIES_TOTAL] = Dormitory.objects.using(using).count()
+    counts[USERS_TOTAL] = User.objects.using(using).count()
+    return counts
+
+
+def reconcile(using=DEFAULT_DB_ALIAS):
+    """
+    用精确值覆盖计数器，返回 {name: (旧值, 新值)} 中发生偏差的项
+
+    在主库上执行（不读副本），锁定计数行后统计并覆盖，统计和覆盖在同一事务中。
+    结果只保证最终一致：对账期间提交的修改可能既计入精确值，又在提交后由 adjust 再累加一次
+    （或反之漏计），这类偏差由下一次对账修正
+    """
+    drift = {}
+    with transaction.atomic(using=using):
+        current = {
+            counter.name: counter
+            for counter in StatisticCounter.objects.using(using).select_for_update().filter(name__in=ALL_KEYS)
+        }
+        counts = exact_counts(using)
+        now = timezone.now()
+        missing = []
+        changed = []
+        for name, value in counts.items():
+            counter = current.get(name)
+            if counter is None:
+                missing.append(StatisticCounter(name=name, value=value))
+                drift[name] = (None, value)
+            elif counter.value != value:
+                drift[name] = (counter.value, value)
+                counter.value = value
+                counter.updated_at = now
+                changed.append(counter)
+        if missing:
+            # 并发对账时另一方可能已经插入
+            StatisticCounter.objects.using(using).bulk_create(missing, ignore_conflicts=True)
+        if changed:
+            StatisticCounter.objects.using(using).bulk_update(changed, ['value', 'updated_at'])
+    return drift
+
+
+def bump_version(name=ORDERS_VERSION):
+    """在当前事务提交后递增数据版本"""
+    adjust({name: 1})
+
+
+def read_version(name=ORDERS_VERSION):
+    """
+    读取数据版本（一次主键查询）；版本行不存在时创建
+    """
+    value = StatisticCounter.objects.filter(name=name).values_list('value', flat=True).first()
+    if value is None:
+        StatisticCounter.objects.bulk_create([StatisticCounter(name=name, value=0)], ignore_conflicts=True)
+        value = 0
+    return value
+
+
+async def aread_version(name=ORDERS_VERSION):
+    """read_version() 的异步版本"""
+    value = await StatisticCounter.objects.filter(name=name).values_list('value', flat=True).afirst()
+    if value is None:
+        await StatisticCounter.objects.abulk_create([StatisticCounter(name=name, value=0)], ignore_conflicts=True)
+        value = 0
+    return value
+
+
+def read():
+    """
+    读取全部计数 {name: value}；首次使用时计数行缺失，先对账一次
+    """
+    values = dict(StatisticCounter.objects.filter(name__in=ALL_KEYS).values_list('name', 'value'))
+    if len(values) < len(ALL_KEYS):
+        reconcile()
+        values = dict(StatisticCounter.objects.filter(name__in=ALL_KEYS).values_list('name', 'value'))
+    return values
+
+
+async def aread():
+    """read() 的异步版本"""
+    queryset = StatisticCounter.objects.filter(name__in=ALL_KEYS).values_list('name', 'value')
+    values = {name: value async for name, value in queryset}
+    if len(values) < len(ALL_KEYS):
+        await sync_to_async(reconcile)()
+        values = {name: value async for name, value in queryset}
+    return values
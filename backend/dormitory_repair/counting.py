@@ -0,0 +1,150 @@
+"""
+列表总数的统计方式
+
+分页需要总数，但在百万级的工单表上，带筛选（和 JOIN）的精确 COUNT(*) 往往比取一页
+数据还要慢。count_rows(queryset, mode) 支持以下方式：
+    - exact：精确 COUNT(*)
+    - estimate：估算值。没有筛选条件时读 MySQL 的表统计信息（information_schema.TABLES），
+      有筛选条件时取 EXPLAIN 的行数估计（rows × filtered%）。估算值小于
+      COUNT_ESTIMATE_THRESHOLD 时改为精确统计（结果少，COUNT 很快，页码也更准确）；
+      不支持估算的数据库（如开发用的 SQLite）同样精确统计
+    - cached：精确 COUNT(*)，结果按 SQL 在 Django 缓存中保存 COUNT_CACHE_TTL 秒
+    - none：不统计，返回 None（只有 API 列表可用，admin 分页必须有总数）
+
+CountingPaginator 供 admin 列表页使用，见 RepairOrderAdmin。
+"""
+import hashlib
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+
+EXACT = 'exact'
+ESTIMATE = 'estimate'
+CACHED = 'cached'
+NONE = 'none'
+
+COUNT_MODES = (EXACT, ESTIMATE, CACHED, NONE)
+
+
+class InvalidCountMode(ValueError):
+    """?count= 的取值无效"""
+
+
+def parse_count_mode(value, default=EXACT):
+    """
+    解析 ?count= 参数，未传时使用 default
+    """
+    if value is None or value == '':
+        return default
+    mode = value.strip().lower()
+    if mode not in COUNT_MODES:
+        raise InvalidCountMode(f'无效的count参数: {value}，可选 {"/".join(COUNT_MODES)}')
+    return mode
+
+
+def _estimate_threshold():
+    return getattr(settings, 'COUNT_ESTIMATE_THRESHOLD', 1000)
+
+
+def _table_rows(connection, table):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT TABLE_ROWS FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s',
+            [table],
+        )
+        row = cursor.fetchone()
+    return row[0] if row and row[0] is not None else None
+
+
+def _count_sql(queryset, connection):
+    """统计用的 SQL：去掉排序和 select_related 的 JOIN，与 COUNT(*) 扫描的行相同"""
+    query = queryset.query.chain()
+    query.clear_ordering(force=True)
+    query.select_related = False
+    return query.get_compiler(connection=connection).as_sql()
+
+
+def _explain_rows(connection, queryset):
+    sql, params = _count_sql(queryset, connection)
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN {sql}', params)
+        columns = [column[0].lower() for column in cursor.description]
+        row = cursor.fetchone()
+    if row is None or 'rows' not in columns:
+        return None
+    # 第一行是驱动表，rows 为扫描行数估计，filtered 为 WHERE 过滤后保留的百分比
+    plan = dict(zip(columns, row))
+    if plan['rows'] is None:
+        return None
+    filtered = plan.get('filtered')
+    return int(plan['rows'] * (float(filtered) if filtered is not None else 100.0) / 100)
+
+
+def estimate_count(queryset):
+    """
+    估算结果行数；无法估算或估算值较小时返回精确值
+    """
+    connection = connections[queryset.db]
+    estimate = None
+    if connection.vendor == 'mysql':
+        query = queryset.query
+        if not query.where and not query.distinct and not query.combinator:
+            estimate = _table_rows(connection, queryset.model._meta.db_table)
+        else:
+            estimate = _explain_rows(connection, queryset)
+    if estimate is None or estimate < _estimate_threshold():
+        return queryset.count()
+    return estimate
+
+
+def cached_count(queryset):
+    """
+    精确统计，结果缓存 COUNT_CACHE_TTL 秒（同一 SQL 和参数共用）
+    """
+    sql, params = _count_sql(queryset, connections[queryset.db])
+    key = 'count:' + hashlib.md5(f'{queryset.db}:{sql}:{params!r}'.encode(), usedforsecurity=False).hexdigest()
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, getattr(settings, 'COUNT_CACHE_TTL', 60))
+    return count
+
+
+def count_rows(queryset, mode=EXACT):
+    """按 mode 统计 queryset 的行数，mode 为 none 时返回 None"""
+    if mode == NONE:
+        return None
+    if mode == ESTIMATE:
+        return estimate_count(queryset)
+    if mode == CACHED:
+        return cached_count(queryset)
+    return queryset.count()
+
+
+async def acount_rows(queryset, mode=EXACT):
+    if mode == NONE:
+        return None
+    if mode == EXACT:
+        return await queryset.acount()
+    return await sync_to_async(count_rows)(queryset, mode)
+
+
+class CountingPaginator(Paginator):
+    """
+    按 count_mode（exact / estimate / cached）取总数的分页器
+    """
+
+    def __init__(self, *args, count_mode=EXACT, **kwargs):
+        super().__init__(*args, **kwargs)
+        if count_mode == NONE:
+            raise InvalidCountMode('分页器需要总数，不支持 none')
+        self.count_mode = count_mode
+
+    @cached_property
+    def count(self):
+        return count_rows(self.object_list, self.count_mode)
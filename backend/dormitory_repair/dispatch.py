@@ -0,0 +1,80 @@
+"""
+维修员领取工单
+
+claim_next_order() 为维修员领取一张待处理、未分配的工单：优先级最高、其次最早创建，
+可限定故障类型（技能）和楼栋。领取即分配维修员并把状态改为维修中。
+
+并发领取时：
+    - 支持 SKIP LOCKED 的数据库（MySQL 8、PostgreSQL）按优先级依次执行
+      SELECT ... FOR UPDATE SKIP LOCKED LIMIT 1，跳过其他事务正在领取的行，
+      几十个维修员同时领取也不会排队等锁，更不会领到同一张工单
+    - 其他数据库（如开发用的 SQLite）先读出候选工单，再用带条件的 UPDATE
+      （仍为待处理且未分配）抢占，抢占失败换下一张
+"""
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import Dormitory, RepairOrder
+from .signals import repair_orders_bulk_updated
+
+
+# 领取顺序：优先级从高到低，同优先级先创建的先领取
+CLAIM_PRIORITY_ORDER = ('urgent', 'high', 'medium', 'low')
+# 无 SKIP LOCKED 时每个优先级读出的候选工单数
+FALLBACK_CANDIDATES = 20
+# 领取时读出的列（同时作为批量更新信号的变更前数据）
+CLAIM_FIELDS = ('id', 'status', 'priority', 'repair_worker_id', 'fault_type', 'dormitory_id', 'created_at')
+
+
+def claimable_orders(fault_types=None, dormitory_ids=None):
+    """待领取的工单：待处理且未分配维修员"""
+    queryset = RepairOrder.objects.filter(status='pending', repair_worker__isnull=True)
+    if fault_types:
+        queryset = queryset.filter(fault_type__in=fault_types)
+    if dormitory_ids is not None:
+        queryset = queryset.filter(dormitory_id__in=dormitory_ids)
+    return queryset
+
+
+def _claim(row, worker, now):
+    """
+    把 row 对应的工单分配给 worker，返回是否成功；条件不满足（已被他人领取）时不修改
+    """
+    updates = {'status': 'processing', 'repair_worker_id': worker.pk}
+    claimed = RepairOrder.objects.filter(id=row['id'], status='pending', repair_worker__isnull=True).update(
+        updated_at=now, **updates
+    )
+    if claimed:
+        repair_orders_bulk_updated.send(sender=RepairOrder, changes=[(row, updates)])
+    return bool(claimed)
+
+
+def claim_next_order(worker, fault_types=None, buildings=None):
+    """
+    为 worker 领取下一张工单，返回工单 ID；没有可领取的工单时返回 None
+
+    fault_types 为可处理的故障类型，buildings 为负责的楼栋，为空表示不限
+    """
+    dormitory_ids = None
+    if buildings:
+        # 先查出宿舍 ID，领取时不与宿舍表 JOIN（FOR UPDATE 会连同宿舍行一起锁定）
+        dormitory_ids = list(Dormitory.objects.filter(building_name__in=buildings).values_list('id', flat=True))
+        if not dormitory_ids:
+            return None
+
+    queryset = claimable_orders(fault_types, dormitory_ids)
+    skip_locked = connection.features.has_select_for_update_skip_locked
+
+    with transaction.atomic():
+        now = timezone.now()
+        for priority in CLAIM_PRIORITY_ORDER:
+            candidates = queryset.filter(priority=priority).order_by('created_at', 'id')
+            if skip_locked:
+                row = candidates.select_for_update(skip_locked=True).values(*CLAIM_FIELDS).first()
+                if row is not None and _claim(row, worker, now):
+                    return row['id']
+                continue
+            for row in candidates.values(*CLAIM_FIELDS)[:FALLBACK_CANDIDATES]:
+                if _claim(row, worker, now):
+                    return row['id']
+    return None
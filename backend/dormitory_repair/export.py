@@ -0,0 +1,84 @@
+"""
+工单导出（CSV / NDJSON 流式输出）
+
+按 (created_at, id) 键集分批读取 values()，每批一条走索引的查询；
+MySQL 驱动不支持服务端游标，.iterator() 仍会把整个结果集读进内存，
+分批读取才能保证导出几十万条工单时内存占用恒定，并且第一批数据立即发出。
+"""
+import csv
+from datetime import datetime
+
+from .fieldsets import ORDER_EXPORT_FIELDS, lookups_for, serialize
+from .pagination import keyset_after
+from .responses import dumps
+
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson; charset=utf-8',
+}
+
+# 每次查询读取的工单数
+EXPORT_CHUNK_SIZE = 2000
+
+
+def iter_export_chunks(queryset, fields=ORDER_EXPORT_FIELDS, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    按 (created_at, id) 倒序分批产出导出记录列表
+    """
+    queryset = queryset.order_by('-created_at', '-id').values(*lookups_for(fields, extra=('id', 'created_at')))
+    page = queryset
+    while True:
+        rows = list(page[:chunk_size])
+        if not rows:
+            return
+        yield [serialize(row, fields) for row in rows]
+        if len(rows) < chunk_size:
+            return
+        last = rows[-1]
+        page = keyset_after(queryset, last['created_at'], last['id'])
+
+
+class _Echo:
+    """csv.writer 需要一个文件对象，直接返回写入的内容"""
+
+    def write(self, value):
+        return value
+
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def stream_csv(queryset, fields=ORDER_EXPORT_FIELDS):
+    writer = csv.writer(_Echo())
+    # BOM 便于 Excel 正确识别 UTF-8 中文
+    yield '\ufeff' + writer.writerow(fields)
+    for records in iter_export_chunks(queryset, fields):
+        yield ''.join(
+            writer.writerow([_csv_value(record[field]) for field in fields])
+            for record in records
+        )
+
+
+def stream_ndjson(queryset, fields=ORDER_EXPORT_FIELDS):
+    for records in iter_export_chunks(queryset, fields):
+        yield b''.join(dumps(record) + b'\n' for record in records)
+
+
+def stream_export(queryset, export_format, fields=ORDER_EXPORT_FIELDS):
+    """
+    返回流式响应的生成器
+
+    生成器在视图返回、中间件重置读写分离的请求上下文之后才执行，
+    这里先按当前请求确定读库（主库固定或本次请求选中的副本），
+    之后每一批查询都使用同一个库
+    """
+    queryset = queryset.using(queryset.db)
+    if export_format == 'ndjson':
+        return stream_ndjson(queryset, fields)
+    return stream_csv(queryset, fields)
@@ -0,0 +1,100 @@
+"""
+工单字段投影（?fields=）
+
+每个输出字段登记它需要的数据库列（values() 查询路径）和由查询行构造取值的函数。
+接口按请求的字段只查询需要的列，不再实例化 RepairOrder/User/Dormitory 对象；
+例如移动端列表 ?fields=id,order_number,title,status 不会读取 description 等 TextField。
+列表、详情和导出共用这里的定义。时间字段保留 datetime，由 ApiResponse 的编码器统一转换。
+"""
+
+
+class InvalidFields(ValueError):
+    """请求了不存在的字段"""
+
+
+class Field:
+    def __init__(self, lookups, build=None):
+        self.lookups = tuple(lookups)
+        # 默认直接取第一列的值
+        self.build = build or (lambda row, lookup=self.lookups[0]: row[lookup])
+
+
+def _student_name(row):
+    return f"{row['user__first_name']} {row['user__last_name']}".strip() or row['user__username']
+
+
+_STUDENT_NAME_LOOKUPS = ('user__first_name', 'user__last_name', 'user__username')
+
+
+ORDER_FIELDS = {
+    'id': Field(['id']),
+    'order_number': Field(['order_number']),
+    'title': Field(['title']),
+    'description': Field(['description']),
+    'status': Field(['status']),
+    'priority': Field(['priority']),
+    'fault_type': Field(['fault_type']),
+    'student_name': Field(_STUDENT_NAME_LOOKUPS, _student_name),
+    'student_id': Field(['user_id']),
+    'student': Field(['user_id', *_STUDENT_NAME_LOOKUPS, 'user__email'], lambda row: {
+        'id': row['user_id'],
+        'name': _student_name(row),
+        'username': row['user__username'],
+        'email': row['user__email'],
+    }),
+    'dormitory_name': Field(
+        ['dormitory__building_name', 'dormitory__room_number'],
+        lambda row: f"{row['dormitory__building_name']}-{row['dormitory__room_number']}",
+    ),
+    'dormitory_id': Field(['dormitory_id']),
+    'dormitory': Field(['dormitory_id', 'dormitory__building_name', 'dormitory__room_number'], lambda row: {
+        'id': row['dormitory_id'],
+        'building_name': row['dormitory__building_name'],
+        'room_number': row['dormitory__room_number'],
+    }),
+    'created_at': Field(['created_at']),
+    'updated_at': Field(['updated_at']),
+    'completed_at': Field(['completed_at']),
+    'repair_worker_id': Field(['repair_worker_id']),
+}
+
+# 导出为 CSV 时只能使用取值为标量的字段
+FLAT_ORDER_FIELDS = {name: field for name, field in ORDER_FIELDS.items() if name not in ('student', 'dormitory')}
+
+# 未指定 ?fields= 时各接口返回的字段
+ORDER_LIST_FIELDS = (
+    'id', 'order_number', 'title', 'description', 'status', 'priority', 'fault_type',
+    'student_name', 'student_id', 'dormitory_name', 'dormitory_id', 'created_at', 'updated_at',
+)
+ORDER_DETAIL_FIELDS = (
+    'id', 'order_number', 'title', 'description', 'status', 'priority', 'fault_type',
+    'student', 'dormitory', 'created_at', 'updated_at',
+)
+ORDER_EXPORT_FIELDS = ORDER_LIST_FIELDS + ('completed_at',)
+
+
+def parse_fields(param, default, registry=ORDER_FIELDS):
+    """
+    解析 ?fields=a,b,c，未传或为空时返回 default
+    """
+    if not param or not param.strip():
+        return tuple(default)
+    fields = tuple(dict.fromkeys(name.strip() for name in param.split(',') if name.strip()))
+    unknown = [name for name in fields if name not in registry]
+    if unknown:
+        raise InvalidFields(f"未知字段: {', '.join(unknown)}")
+    return fields
+
+
+def lookups_for(fields, extra=(), registry=ORDER_FIELDS):
+    """
+    输出这些字段需要查询的列，extra 为分页、排序另外需要的列
+    """
+    lookups = dict.fromkeys(extra)
+    for name in fields:
+        lookups.update(dict.fromkeys(registry[name].lookups))
+    return tuple(lookups)
+
+
+def serialize(row, fields, registry=ORDER_FIELDS):
+    return {name: registry[name].build(row) for name in fields}
@@ -0,0 +1,120 @@
+"""
+维修员自动分配耗时对比
+
+按随机生成的维修员（专长、已有的未完成工单）和待处理工单，分别用以下方式依次为每张工单
+挑选维修员，只统计挑选时间，不访问数据库:
+    - 逐个扫描：每张工单计算所有维修员的得分，O(维修员数 × 工单数)
+    - AssignmentEngine：按负载分组的最小堆，只比较四个堆顶
+
+两种方式得分规则相同，结果应完全一致。
+
+    python manage.py bench_assignment
+    python manage.py bench_assignment --orders 20000 --workers 1000 --buildings 60
+"""
+import random
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from dormitory_repair.assignment import PROXIMITY_BONUS, SPECIALTY_BONUS, AssignmentEngine
+from dormitory_repair.models import RepairOrder
+
+
+class Command(BaseCommand):
+    help = '对比逐个扫描维修员与 AssignmentEngine 的分配耗时'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--orders', type=int, default=10000, help='待分配工单数，默认10000')
+        parser.add_argument('--workers', type=int, default=500, help='维修员数，默认500')
+        parser.add_argument('--buildings', type=int, default=40, help='楼栋数，默认40')
+        parser.add_argument(
+            '--max-open', type=int, default=getattr(settings, 'REPAIR_WORKER_MAX_OPEN_ORDERS', 20),
+            help='每个维修员最多的未完成工单数，默认取 REPAIR_WORKER_MAX_OPEN_ORDERS'
+        )
+        parser.add_argument('--seed', type=int, default=1, help='随机数种子，默认1')
+
+    def handle(self, *args, **options):
+        if min(options['orders'], options['workers'], options['buildings'], options['max_open']) < 1:
+            raise CommandError('参数均应为正整数')
+        rng = random.Random(options['seed'])
+        fault_types = [value for value, _ in RepairOrder.FAULT_TYPE_CHOICES]
+        buildings = [f'{number}号楼' for number in range(1, options['buildings'] + 1)]
+        max_open = options['max_open']
+
+        workers = {
+            worker_id: set(rng.sample(fault_types, rng.randint(1, 2)))
+            for worker_id in range(1, options['workers'] + 1)
+        }
+        existing = [
+            (worker_id, rng.choice(buildings))
+            for worker_id in workers for _ in range(rng.randint(0, max_open // 4))
+        ]
+        orders = [(rng.choice(buildings), rng.choice(fault_types)) for _ in range(options['orders'])]
+
+        started = time.perf_counter()
+        engine = AssignmentEngine(max_open=max_open)
+        for worker_id, specialties in workers.items():
+            engine.add_worker(worker_id, specialties)
+        for worker_id, building_name in existing:
+            engine.add_order(worker_id, building_name)
+        build_time = time.perf_counter() - started
+
+        started = time.perf_counter()
+        heap_result = []
+        for building_name, fault_type in orders:
+            worker_id = engine.best_worker(building_name, fault_type)
+            if worker_id is not None:
+                engine.add_order(worker_id, building_name)
+            heap_result.append(worker_id)
+        heap_time = time.perf_counter() - started
+
+        started = time.perf_counter()
+        scan_result = self.scan(workers, existing, orders, max_open)
+        scan_time = time.perf_counter() - started
+
+        assigned = sum(worker_id is not None for worker_id in heap_result)
+        self.stdout.write(
+            f'{len(orders)} 张工单，{len(workers)} 名维修员，{len(buildings)} 栋楼，'
+            f'已有未完成工单 {len(existing)} 张，分配 {assigned} 张（其余因满负荷未分配）'
+        )
+        self.stdout.write(f'{"逐个扫描":18} {scan_time * 1000:10.1f} ms  {scan_time / len(orders) * 1e6:8.1f} µs/张')
+        self.stdout.write(
+            f'{"AssignmentEngine":18} {heap_time * 1000:10.1f} ms  {heap_time / len(orders) * 1e6:8.1f} µs/张'
+            f'  {scan_time / heap_time:6.1f}x（构建索引 {build_time * 1000:.1f} ms）'
+        )
+        if heap_result == scan_result:
+            self.stdout.write(self.style.SUCCESS('两种方式的分配结果一致'))
+        else:
+            mismatched = sum(a != b for a, b in zip(heap_result, scan_result))
+            self.stdout.write(self.style.ERROR(f'分配结果不一致：{mismatched} 张工单'))
+
+    def scan(self, workers, existing, orders, max_open):
+        """逐个扫描：每张工单计算所有未满负荷维修员的得分"""
+        loads = dict.fromkeys(workers, 0)
+        buildings = {worker_id: Counter() for worker_id in workers}
+        for worker_id, building_name in existing:
+            loads[worker_id] += 1
+            buildings[worker_id][building_name] += 1
+
+        result = []
+        for building_name, fault_type in orders:
+            best = None
+            for worker_id, specialties in workers.items():
+                load = loads[worker_id]
+                if load >= max_open:
+                    continue
+                score = load
+                if buildings[worker_id][building_name] > 0:
+                    score -= PROXIMITY_BONUS
+                if fault_type in specialties:
+                    score -= SPECIALTY_BONUS
+                if best is None or (score, worker_id) < best:
+                    best = (score, worker_id)
+            worker_id = best[1] if best is not None else None
+            if worker_id is not None:
+                loads[worker_id] += 1
+                buildings[worker_id][building_name] += 1
+            result.append(worker_id)
+        return result
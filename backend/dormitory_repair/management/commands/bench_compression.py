@@ -0,0 +1,68 @@
+"""
+响应压缩效果对比
+
+以管理员身份请求报修工单后台列表页（或 --path 指定的页面），分别以不压缩、gzip
+以及浏览器的 Accept-Encoding 各请求若干次，输出响应体大小、服务端耗时，以及按 --bandwidth 估算的传输时间:
+    python manage.py bench_compression
+    python manage.py bench_compression --path /api/repair-orders/?page_size=100 --bandwidth 5
+"""
+import statistics
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+
+from myproject import middleware
+
+
+class Command(BaseCommand):
+    help = '对比报修工单后台列表页在不同压缩方式下的响应大小和耗时'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path', default='/admin/dormitory_repair/repairorder/', help='请求路径，默认为报修工单后台列表页'
+        )
+        parser.add_argument('--username', help='登录用户，默认使用第一个超级用户')
+        parser.add_argument('--repeat', type=int, default=20, help='每种方式请求次数，默认20')
+        parser.add_argument('--bandwidth', type=float, default=10, help='估算传输时间用的带宽（Mbit/s），默认10')
+
+    def handle(self, *args, **options):
+        if options['username']:
+            user = User.objects.filter(username=options['username']).first()
+        else:
+            user = User.objects.filter(is_superuser=True).order_by('id').first()
+        if user is None:
+            raise CommandError('找不到可登录的用户')
+
+        client = Client(HTTP_HOST='localhost')
+        client.force_login(user)
+
+        # 最后一项与浏览器的请求头相同，实际编码由中间件协商（HTML 页面只用 gzip）
+        encodings = [('identity', 'identity'), ('gzip', 'gzip'), ('browser', 'gzip, deflate, br')]
+        if middleware.brotli is None:
+            self.stdout.write(self.style.WARNING('未安装 brotli，只能协商到 gzip'))
+
+        bytes_per_second = options['bandwidth'] * 1000 * 1000 / 8
+        self.stdout.write(f"{options['path']}（用户 {user.username}，{options['bandwidth']} Mbit/s）")
+        baseline = None
+        for name, accept in encodings:
+            timings = []
+            size = 0
+            actual = None
+            for _ in range(options['repeat']):
+                started = time.perf_counter()
+                response = client.get(options['path'], HTTP_ACCEPT_ENCODING=accept)
+                body = b''.join(response.streaming_content) if response.streaming else response.content
+                timings.append(time.perf_counter() - started)
+                if response.status_code != 200:
+                    raise CommandError(f'请求失败: HTTP {response.status_code}')
+                size = len(body)
+                actual = response.get('Content-Encoding', 'identity')
+            server_ms = statistics.median(timings) * 1000
+            transfer_ms = size / bytes_per_second * 1000
+            baseline = baseline or size
+            self.stdout.write(
+                f'{name:9} 实际编码 {actual:9} {size:9d} 字节 ({size / baseline:6.1%})  '
+                f'服务端 {server_ms:7.2f}ms  传输约 {transfer_ms:7.2f}ms  合计 {server_ms + transfer_ms:7.2f}ms'
+            )
@@ -0,0 +1,71 @@
+"""
+工单列表页 JSON 编码耗时对比
+
+取一页工单（默认 100 条，数据不足时循环补齐），分别用以下方式编码为响应体，
+只统计编码时间，不含查询:
+    - JsonResponse：原来的方式，时间字段先逐个 .isoformat()，再用 json + DjangoJSONEncoder 编码
+    - ApiResponse（json）：标准库回退实现
+    - ApiResponse（orjson）：安装 orjson 时
+
+    python manage.py bench_encoding
+    python manage.py bench_encoding --rows 500 --repeat 2000
+"""
+import time
+from itertools import cycle, islice
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse
+
+from dormitory_repair import responses
+from dormitory_repair.fieldsets import ORDER_LIST_FIELDS, lookups_for, serialize
+from dormitory_repair.models import RepairOrder
+
+
+class Command(BaseCommand):
+    help = '对比工单列表页在不同 JSON 编码器下的编码耗时'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100, help='每页工单数，默认100')
+        parser.add_argument('--repeat', type=int, default=1000, help='每种编码方式重复次数，默认1000')
+
+    def handle(self, *args, **options):
+        rows = list(RepairOrder.objects.order_by('-created_at', '-id').values(
+            *lookups_for(ORDER_LIST_FIELDS)
+        )[:options['rows']])
+        if not rows:
+            raise CommandError('没有工单数据，请先创建工单')
+        rows = list(islice(cycle(rows), options['rows']))
+        results = [serialize(row, ORDER_LIST_FIELDS) for row in rows]
+        page = {'count': len(results), 'next': 2, 'previous': None, 'results': results}
+
+        def legacy():
+            # 原实现：时间字段在构造数据时转换为字符串
+            converted = [
+                {key: value.isoformat() if hasattr(value, 'isoformat') else value for key, value in item.items()}
+                for item in results
+            ]
+            return JsonResponse({**page, 'results': converted}, encoder=DjangoJSONEncoder).content
+
+        candidates = [
+            ('JsonResponse', legacy),
+            ('ApiResponse(json)', lambda: responses.stdlib_dumps(page)),
+        ]
+        if responses.orjson is not None:
+            candidates.append(('ApiResponse(orjson)', lambda: responses.dumps(page)))
+        else:
+            self.stdout.write(self.style.WARNING('未安装 orjson，跳过 orjson 编码器'))
+
+        repeat = options['repeat']
+        self.stdout.write(f'{len(results)} 条/页，重复 {repeat} 次，当前 ApiResponse 使用 {responses.ENCODER}')
+        baseline = None
+        for name, encode in candidates:
+            size = len(encode())
+            started = time.perf_counter()
+            for _ in range(repeat):
+                encode()
+            per_page = (time.perf_counter() - started) / repeat * 1000
+            baseline = baseline or per_page
+            self.stdout.write(
+                f'{name:20} {per_page:8.3f} ms/页  {size:8d} 字节  {baseline / per_page:5.1f}x'
+            )
@@ -0,0 +1,178 @@
+"""
+WSGI / ASGI 吞吐量对比
+
+在进程内直接调用 myproject.wsgi 和 myproject.asgi 的 application（不经过网络），
+以相同的并发数反复请求读接口，输出吞吐量和延迟分位数:
+    python manage.py bench_http
+    python manage.py bench_http --requests 2000 --concurrency 50 --db-latency 5
+    python manage.py bench_http --path /api/repair-orders/?status=pending --mode asgi
+
+--db-latency 给每条 SQL 加上固定延迟，用来模拟网络另一端的 MySQL。
+"""
+import asyncio
+import io
+import statistics
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.db.backends.signals import connection_created
+
+
+DEFAULT_PATHS = [
+    '/api/system/info/',
+    '/api/repair-orders/',
+    '/api/repair-orders/?cursor=&page_size=20',
+    '/api/dormitories/',
+]
+
+
+class Command(BaseCommand):
+    help = '对比 WSGI 与 ASGI 下读接口的吞吐量'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path', action='append', dest='paths',
+            help='请求路径（可多次指定，轮流请求），默认为工单、宿舍列表和系统信息'
+        )
+        parser.add_argument('--requests', type=int, default=500, help='每种模式的请求总数，默认500')
+        parser.add_argument('--concurrency', type=int, default=20, help='并发数，默认20')
+        parser.add_argument(
+            '--db-latency', type=float, default=0,
+            help='给每条 SQL 增加的延迟（毫秒），模拟远程数据库'
+        )
+        parser.add_argument(
+            '--mode', choices=['wsgi', 'asgi', 'both'], default='both', help='测试的模式，默认两者都测'
+        )
+
+    def handle(self, *args, **options):
+        paths = options['paths'] or DEFAULT_PATHS
+        total = options['requests']
+        concurrency = options['concurrency']
+        latency = options['db_latency'] / 1000
+
+        if latency:
+            def add_latency(execute, sql, params, many, context):
+                time.sleep(latency)
+                return execute(sql, params, many, context)
+
+            def install(sender, connection, **kwargs):
+                connection.execute_wrappers.append(add_latency)
+
+            connection_created.connect(install, weak=False)
+
+        targets = [self._split(path) for path in paths]
+        modes = ['wsgi', 'asgi'] if options['mode'] == 'both' else [options['mode']]
+
+        self.stdout.write(
+            f'请求数 {total}，并发 {concurrency}，SQL 延迟 {options["db_latency"]}ms，路径 {", ".join(paths)}'
+        )
+        for mode in modes:
+            runner = self._run_wsgi if mode == 'wsgi' else self._run_asgi
+            # 预热：建立连接、加载路由
+            runner(targets, min(concurrency, total), concurrency)
+            started = time.perf_counter()
+            latencies, statuses = runner(targets, total, concurrency)
+            elapsed = time.perf_counter() - started
+            self._report(mode, elapsed, latencies, statuses)
+
+    @staticmethod
+    def _split(path):
+        parts = urlsplit(path)
+        return parts.path, parts.query
+
+    def _report(self, mode, elapsed, latencies, statuses):
+        latencies = sorted(latencies)
+        p50 = statistics.median(latencies) * 1000
+        p95 = latencies[int(len(latencies) * 0.95) - 1] * 1000
+        codes = ', '.join(f'{code}×{count}' for code, count in sorted(statuses.items()))
+        self.stdout.write(
+            f'{mode.upper():5} {len(latencies) / elapsed:8.1f} req/s  '
+            f'p50 {p50:7.2f}ms  p95 {p95:7.2f}ms  状态码 {codes}'
+        )
+
+    def _run_wsgi(self, targets, total, concurrency):
+        from myproject.wsgi import application
+
+        def call(index):
+            path, query = targets[index % len(targets)]
+            environ = {
+                'REQUEST_METHOD': 'GET',
+                'PATH_INFO': path,
+                'QUERY_STRING': query,
+                'SCRIPT_NAME': '',
+                'SERVER_NAME': 'localhost',
+                'SERVER_PORT': '80',
+                'SERVER_PROTOCOL': 'HTTP/1.1',
+                'HTTP_HOST': 'localhost',
+                'wsgi.version': (1, 0),
+                'wsgi.url_scheme': 'http',
+                'wsgi.input': io.BytesIO(),
+                'wsgi.errors': sys.stderr,
+                'wsgi.multithread': True,
+                'wsgi.multiprocess': False,
+                'wsgi.run_once': False,
+            }
+            status = []
+            started = time.perf_counter()
+            response = application(environ, lambda code, headers, exc_info=None: status.append(code))
+            try:
+                for _ in response:
+                    pass
+            finally:
+                response.close()
+            return time.perf_counter() - started, int(status[0].split()[0])
+
+        with ThreadPoolExecutor(max_workers=concurrency, initializer=close_old_connections) as executor:
+            results = list(executor.map(call, range(total)))
+        return [latency for latency, _ in results], Counter(code for _, code in results)
+
+    def _run_asgi(self, targets, total, concurrency):
+        from myproject.asgi import application
+
+        async def call(index, semaphore):
+            path, query = targets[index % len(targets)]
+            scope = {
+                'type': 'http',
+                'asgi': {'version': '3.0'},
+                'http_version': '1.1',
+                'method': 'GET',
+                'scheme': 'http',
+                'path': path,
+                'raw_path': path.encode(),
+                'query_string': query.encode(),
+                'root_path': '',
+                'headers': [(b'host', b'localhost')],
+                'client': ('127.0.0.1', 0),
+                'server': ('localhost', 80),
+            }
+            received = False
+            status = []
+
+            async def receive():
+                nonlocal received
+                if not received:
+                    received = True
+                    return {'type': 'http.request', 'body': b'', 'more_body': False}
+                # 客户端不主动断开
+                await asyncio.Event().wait()
+
+            async def send(message):
+                if message['type'] == 'http.response.start':
+                    status.append(message['status'])
+
+            async with semaphore:
+                started = time.perf_counter()
+                await application(scope, receive, send)
+                return time.perf_counter() - started, status[0]
+
+        async def run():
+            semaphore = asyncio.Semaphore(concurrency)
+            return await asyncio.gather(*(call(index, semaphore) for index in range(total)))
+
+        results = asyncio.run(run())
+        return [latency for latency, _ in results], Counter(code for _, code in results)
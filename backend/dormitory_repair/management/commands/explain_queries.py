@@ -0,0 +1,152 @@
+"""
+打印各个接口查询的执行计划，检查是否存在全表扫描
+
+用法:
+    python manage.py explain_queries
+    python manage.py explain_queries --fail-on-full-scan   # CI 中使用，发现全表扫描时返回非零
+"""
+import json
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Sum
+from django.http import QueryDict
+
+from dormitory_repair import counters, rollups
+from dormitory_repair.dispatch import CLAIM_FIELDS, CLAIM_PRIORITY_ORDER, claimable_orders
+from dormitory_repair.models import Dormitory, RepairOrder, StatisticCounter
+from dormitory_repair.pagination import cursor_page_queryset, encode_cursor
+from dormitory_repair.views import _filter_repair_orders, _statistics_date_range
+
+
+def _order_list(query_string=''):
+    queryset = RepairOrder.objects.select_related('user', 'dormitory').order_by('-created_at', '-id')
+    return _filter_repair_orders(queryset, QueryDict(query_string))
+
+
+def _count(queryset):
+    # COUNT(*) / exists() 不需要排序和关联字段
+    return queryset.order_by().values('pk')
+
+
+def endpoint_queries():
+    """
+    返回 [(名称, queryset)]，与各接口实际执行的查询保持一致
+    """
+    sample = RepairOrder.objects.order_by('-created_at', '-id').values('id', 'created_at', 'dormitory_id').first()
+    order_id = sample['id'] if sample else 0
+    dormitory_id = sample['dormitory_id'] if sample else 0
+    cursor = encode_cursor(sample['created_at'], sample['id']) if sample else ''
+
+    start_date, end_date = _statistics_date_range(QueryDict(''))
+
+    queries = [
+        ('工单列表 ETag', StatisticCounter.objects.filter(
+            name=counters.ORDERS_VERSION
+        ).values_list('value', flat=True)[:1]),
+        ('工单列表', _order_list()[:10]),
+        ('工单列表 count', _count(_order_list())),
+        ('工单列表 游标分页', cursor_page_queryset(_order_list(), cursor, 10)[0]),
+    ]
+    for name in ('status=pending', 'priority=urgent', 'fault_type=water', 'search=漏水'):
+        queries += [
+            (f'工单列表 {name}', _order_list(name)[:10]),
+            (f'工单列表 {name} count', _count(_order_list(name))),
+        ]
+    queries += [
+        ('工单详情 ETag', RepairOrder.objects.filter(id=order_id).values_list('updated_at', flat=True)[:1]),
+        ('工单详情', RepairOrder.objects.select_related('user', 'dormitory').filter(id=order_id)),
+        ('宿舍列表', Dormitory.objects.order_by('building_name', 'room_number')[:12]),
+        ('宿舍列表 报修统计', RepairOrder.objects.filter(
+            dormitory_id__in=[dormitory_id]
+        ).order_by().values('dormitory_id', 'status')),
+        ('宿舍详情 最近报修', RepairOrder.objects.filter(dormitory_id=dormitory_id).select_related('user')[:10]),
+        ('宿舍删除检查', _count(RepairOrder.objects.filter(
+            dormitory_id=dormitory_id, status__in=['pending', 'processing']
+        ))),
+        ('系统信息 计数器', StatisticCounter.objects.filter(
+            name__in=counters.ALL_KEYS
+        ).values_list('name', 'value')),
+    ]
+    for priority in CLAIM_PRIORITY_ORDER:
+        queries.append((f'领取工单 priority={priority}', claimable_orders().filter(
+            priority=priority
+        ).order_by('created_at', 'id').select_for_update(skip_locked=True).values(*CLAIM_FIELDS)[:1]))
+    for group_by in ('date', 'status', 'building_name'):
+        queries.append((f'工单统计 group_by={group_by}', rollups.grouped(
+            rollups.stats_queryset(start_date, end_date), group_by
+        )))
+    queries += [
+        ('宿舍统计 报修数', rollups.stats_queryset(start_date, end_date).order_by().values(
+            'building_name', 'status'
+        ).annotate(total=Sum('order_count'))),
+        ('后台工单列表', RepairOrder.objects.select_related(
+            'user', 'dormitory', 'repair_worker'
+        ).order_by('-created_at', '-pk')[:20]),
+        ('后台工单列表 status=pending', RepairOrder.objects.select_related(
+            'user', 'dormitory', 'repair_worker'
+        ).filter(status='pending').order_by('-created_at', '-pk')[:20]),
+    ]
+    return queries
+
+
+def find_full_scans(queryset):
+    """
+    返回执行计划文本和发生全表扫描的表名列表
+    """
+    vendor = connection.vendor
+    if vendor == 'mysql':
+        plan = queryset.explain(format='json')
+        tables = []
+
+        def walk(node):
+            if isinstance(node, dict):
+                if node.get('access_type') == 'ALL':
+                    tables.append(node.get('table_name'))
+                for value in node.values():
+                    walk(value)
+            elif isinstance(node, list):
+                for value in node:
+                    walk(value)
+
+        walk(json.loads(plan))
+        return plan, tables
+
+    plan = queryset.explain()
+    if vendor == 'postgresql':
+        return plan, re.findall(r'Seq Scan on (\w+)', plan)
+    if vendor == 'sqlite':
+        return plan, re.findall(r'\bSCAN (\w+)$', plan, flags=re.MULTILINE)
+    return plan, []
+
+
+class Command(BaseCommand):
+    help = '打印各接口查询的 EXPLAIN 执行计划，并标出全表扫描'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fail-on-full-scan', action='store_true',
+            help='存在全表扫描时以非零状态退出（用于 CI）'
+        )
+
+    def handle(self, *args, **options):
+        offenders = []
+        for name, queryset in endpoint_queries():
+            # SELECT ... FOR UPDATE 只能在事务中生成
+            with transaction.atomic():
+                plan, tables = find_full_scans(queryset)
+            self.stdout.write(self.style.MIGRATE_HEADING(f'== {name}'))
+            self.stdout.write(plan)
+            if tables:
+                offenders.append((name, tables))
+                self.stdout.write(self.style.WARNING(f'全表扫描: {", ".join(tables)}'))
+            self.stdout.write('')
+
+        if offenders:
+            summary = '; '.join(f'{name}({", ".join(tables)})' for name, tables in offenders)
+            if options['fail_on_full_scan']:
+                raise CommandError(f'以下查询存在全表扫描: {summary}')
+            self.stdout.write(self.style.WARNING(f'以下查询存在全表扫描: {summary}'))
+        else:
+            self.stdout.write(self.style.SUCCESS('所有接口查询均未出现全表扫描'))
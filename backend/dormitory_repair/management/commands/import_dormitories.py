@@ -0,0 +1,54 @@
+"""
+批量导入宿舍
+
+    python manage.py import_dormitories rooms.csv
+    python manage.py import_dormitories --building 1号楼 --floors 1-20 --rooms 1-40
+    python manage.py import_dormitories --building 1号楼 --floors 1-6 --rooms 1-30 --room-format "{floor}-{room:03d}"
+
+CSV 首行为表头，需包含 building_name,room_number,floor 三列。
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from dormitory_repair.provisioning import (
+    DEFAULT_ROOM_FORMAT, ProvisioningError, expand_room_spec, parse_dormitory_csv, provision_dormitories
+)
+
+
+class Command(BaseCommand):
+    help = '从 CSV 或楼层×房间范围批量开通宿舍'
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_file', nargs='?', help='CSV 文件路径（UTF-8）')
+        parser.add_argument('--building', help='楼栋名称（按范围开通时使用）')
+        parser.add_argument('--floors', help='楼层范围，如 1-20')
+        parser.add_argument('--rooms', help='每层房间范围，如 1-40')
+        parser.add_argument('--room-format', default=DEFAULT_ROOM_FORMAT,
+                            help=f'房间号格式，默认 {DEFAULT_ROOM_FORMAT}')
+        parser.add_argument('--batch-size', type=int, default=500, help='每条 INSERT 的行数')
+        parser.add_argument('--dry-run', action='store_true', help='只校验，不写入数据库')
+
+    def handle(self, *args, **options):
+        try:
+            if options['csv_file']:
+                with open(options['csv_file'], encoding='utf-8') as f:
+                    rows = parse_dormitory_csv(f.read())
+            elif options['building'] and options['floors'] and options['rooms']:
+                rows = expand_room_spec(
+                    options['building'], options['floors'], options['rooms'], options['room_format']
+                )
+            else:
+                raise CommandError('请指定 CSV 文件，或同时指定 --building --floors --rooms')
+
+            result = provision_dormitories(rows, batch_size=options['batch_size'], dry_run=options['dry_run'])
+        except (OSError, ProvisioningError) as e:
+            raise CommandError(str(e))
+
+        for error in result['errors']:
+            self.stdout.write(self.style.ERROR(f"第{error['row']}行: {error['error']}"))
+        for item in result['skipped']:
+            self.stdout.write(self.style.WARNING(f"跳过 {item['dormitory']}: {item['reason']}"))
+
+        action = '可开通' if options['dry_run'] else '已开通'
+        self.stdout.write(self.style.SUCCESS(
+            f"{action} {result['created']} 间宿舍，跳过 {len(result['skipped'])} 间，错误 {len(result['errors'])} 行"
+        ))
@@ -0,0 +1,20 @@
+"""
+全量重建工单检索索引
+
+首次部署检索功能、或批量导入/修改工单（绕过了 save 信号）之后执行:
+    python manage.py rebuild_search_index
+"""
+from django.core.management.base import BaseCommand
+
+from dormitory_repair import search
+
+
+class Command(BaseCommand):
+    help = '重建工单全文检索索引'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='每批处理的工单数')
+
+    def handle(self, *args, **options):
+        total = search.rebuild_index(batch_size=options['batch_size'], stdout=self.stdout)
+        self.stdout.write(self.style.SUCCESS(f'检索索引重建完成，共 {total} 条工单'))
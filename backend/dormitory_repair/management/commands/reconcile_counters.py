@@ -0,0 +1,41 @@
+"""
+统计计数器对账
+
+用业务表的精确 COUNT(*) 修正 StatisticCounter 的偏差（批量导入、update()
+等绕过信号的操作会造成偏差）。可由 cron 定期执行，也可常驻运行:
+    python manage.py reconcile_counters
+    python manage.py reconcile_counters --interval 300
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from dormitory_repair import counters
+
+
+class Command(BaseCommand):
+    help = '用精确统计值修正系统统计计数器'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=int, default=0,
+            help='常驻运行时每隔多少秒对账一次，默认只执行一次'
+        )
+
+    def handle(self, *args, **options):
+        interval = options['interval']
+        while True:
+            self.reconcile_once()
+            if interval <= 0:
+                break
+            time.sleep(interval)
+            close_old_connections()
+
+    def reconcile_once(self):
+        drift = counters.reconcile()
+        if not drift:
+            self.stdout.write(self.style.SUCCESS('计数器无偏差'))
+            return
+        for name, (old, new) in sorted(drift.items()):
+            self.stdout.write(self.style.WARNING(f'{name}: {old} -> {new}'))
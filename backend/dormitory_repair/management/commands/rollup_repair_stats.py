@@ -0,0 +1,66 @@
+"""
+工单每日汇总的回填与修正
+
+按天从工单表重算 RepairDailyStat（每天一个事务），修正批量操作等绕过信号造成的偏差:
+    python manage.py rollup_repair_stats --all                 # 首次部署：回填全部历史
+    python manage.py rollup_repair_stats                       # 修正最近2天（可由 cron 定期执行）
+    python manage.py rollup_repair_stats --since 2025-09-01
+    python manage.py rollup_repair_stats --days 7 --interval 600
+"""
+import datetime
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+from django.utils import timezone
+
+from dormitory_repair import rollups
+
+
+class Command(BaseCommand):
+    help = '回填并修正工单每日汇总'
+
+    def add_arguments(self, parser):
+        group = parser.add_mutually_exclusive_group()
+        group.add_argument('--all', action='store_true', help='从最早的工单开始重算全部历史')
+        group.add_argument('--since', help='从指定日期（YYYY-MM-DD）开始重算')
+        group.add_argument('--days', type=int, default=2, help='重算最近几天（含今天），默认2')
+        parser.add_argument(
+            '--interval', type=int, default=0,
+            help='常驻运行时每隔多少秒重算一次最近 --days 天，默认只执行一次'
+        )
+
+    def handle(self, *args, **options):
+        today = timezone.localdate()
+        if options['all']:
+            start_date = rollups.first_order_date() or today
+        elif options['since']:
+            try:
+                start_date = datetime.date.fromisoformat(options['since'])
+            except ValueError:
+                raise CommandError('日期格式应为 YYYY-MM-DD')
+        else:
+            if options['days'] < 1:
+                raise CommandError('--days 至少为1')
+            start_date = today - datetime.timedelta(days=options['days'] - 1)
+
+        interval = options['interval']
+        while True:
+            self.rebuild_once(start_date, timezone.localdate())
+            if interval <= 0:
+                break
+            time.sleep(interval)
+            close_old_connections()
+            # 常驻运行时之后只修正最近几天
+            start_date = timezone.localdate() - datetime.timedelta(days=max(options['days'], 1) - 1)
+
+    def rebuild_once(self, start_date, end_date):
+        started = time.perf_counter()
+        drift = rollups.rebuild(start_date, end_date)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f'已重算 {start_date} ~ {end_date}，耗时 {elapsed:.1f}s')
+        if not drift:
+            self.stdout.write(self.style.SUCCESS('汇总无偏差'))
+            return
+        for date, (old, new) in sorted(drift.items()):
+            self.stdout.write(self.style.WARNING(f'{date}: {old} -> {new}'))
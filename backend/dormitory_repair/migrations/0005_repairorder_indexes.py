@@ -0,0 +1,39 @@
+# Generated by Django 5.2.6 on 2026-10-18 19:49
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dormitory_repair', '0004_repairorder_updated_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='repairorder',
+            index=models.Index(fields=['-created_at', '-id'], name='repair_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='repairorder',
+            index=models.Index(fields=['status', '-created_at', '-id'], name='repair_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='repairorder',
+            index=models.Index(fields=['priority', '-created_at', '-id'], name='repair_priority_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='repairorder',
+            index=models.Index(fields=['fault_type', '-created_at', '-id'], name='repair_fault_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='repairorder',
+            index=models.Index(fields=['dormitory', 'status'], name='repair_dorm_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='repairorder',
+            index=models.Index(fields=['user', '-created_at'], name='repair_user_created_idx'),
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 5.2.6 on 2026-10-18 19:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+FULLTEXT_INDEX = 'repair_search_content_ft'
+
+
+def add_fulltext_index(apps, schema_editor):
+    # 仅 MySQL 使用 ngram 全文索引，其他数据库使用 RepairOrderSearchGram 倒排表
+    if schema_editor.connection.vendor != 'mysql':
+        return
+    table = schema_editor.quote_name('dormitory_repair_repairordersearchdocument')
+    schema_editor.execute(
+        f'ALTER TABLE {table} ADD FULLTEXT INDEX {FULLTEXT_INDEX} (content) WITH PARSER ngram'
+    )
+
+
+def drop_fulltext_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'mysql':
+        return
+    table = schema_editor.quote_name('dormitory_repair_repairordersearchdocument')
+    schema_editor.execute(f'ALTER TABLE {table} DROP INDEX {FULLTEXT_INDEX}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dormitory_repair', '0005_repairorder_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RepairOrderSearchDocument',
+            fields=[
+                ('order', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='search_document', serialize=False, to='dormitory_repair.repairorder', verbose_name='工单')),
+                ('content', models.TextField(verbose_name='检索内容')),
+            ],
+            options={
+                'verbose_name': '工单检索文档',
+                'verbose_name_plural': '工单检索文档',
+            },
+        ),
+        migrations.CreateModel(
+            name='RepairOrderSearchGram',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('gram', models.CharField(max_length=2, verbose_name='词元')),
+                ('weight', models.PositiveIntegerField(default=1, verbose_name='权重')),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_grams', to='dormitory_repair.repairorder', verbose_name='工单')),
+            ],
+            options={
+                'verbose_name': '工单检索词元',
+                'verbose_name_plural': '工单检索词元',
+                'unique_together': {('gram', 'order')},
+            },
+        ),
+        migrations.RunPython(add_fulltext_index, drop_fulltext_index),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.6 on 2026-10-18 19:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dormitory_repair', '0006_repairorder_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatisticCounter',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False, verbose_name='名称')),
+                ('value', models.BigIntegerField(default=0, verbose_name='数值')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='更新时间')),
+            ],
+            options={
+                'verbose_name': '统计计数器',
+                'verbose_name_plural': '统计计数器',
+            },
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.6 on 2026-10-18 20:05
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dormitory_repair', '0007_statisticcounter'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dormitory',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now, verbose_name='更新时间'),
+            preserve_default=False,
+        ),
+    ]
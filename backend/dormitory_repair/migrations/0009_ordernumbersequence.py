@@ -0,0 +1,24 @@
+# Generated by Django 5.2.6 on 2026-10-18 20:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dormitory_repair', '0008_dormitory_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderNumberSequence',
+            fields=[
+                ('day', models.CharField(max_length=8, primary_key=True, serialize=False, verbose_name='日期')),
+                ('next_value', models.BigIntegerField(default=1, verbose_name='下一个可分配序号')),
+            ],
+            options={
+                'verbose_name': '工单号序列',
+                'verbose_name_plural': '工单号序列',
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.6 on 2026-10-18 21:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dormitory_repair', '0009_ordernumbersequence'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RepairDailyStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='日期')),
+                ('building_name', models.CharField(max_length=50, verbose_name='楼栋名称')),
+                ('fault_type', models.CharField(choices=[('water', '水电故障'), ('furniture', '家具损坏'), ('door_window', '门窗问题'), ('network', '网络故障'), ('other', '其他问题')], max_length=20, verbose_name='故障类型')),
+                ('priority', models.CharField(choices=[('low', '低'), ('medium', '中'), ('high', '高'), ('urgent', '紧急')], max_length=10, verbose_name='优先级')),
+                ('status', models.CharField(choices=[('pending', '待处理'), ('processing', '维修中'), ('completed', '已完成'), ('cancelled', '已取消')], max_length=20, verbose_name='状态')),
+                ('order_count', models.IntegerField(default=0, verbose_name='工单数')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='更新时间')),
+            ],
+            options={
+                'verbose_name': '工单每日汇总',
+                'verbose_name_plural': '工单每日汇总',
+                'constraints': [models.UniqueConstraint(fields=('date', 'building_name', 'fault_type', 'priority', 'status'), name='repair_daily_stat_key')],
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.6 on 2026-10-18 21:40
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dormitory_repair', '0010_repairdailystat'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='repairorder',
+            index=models.Index(fields=['status', 'priority', 'created_at', 'id'], name='repair_claim_idx'),
+        ),
+    ]
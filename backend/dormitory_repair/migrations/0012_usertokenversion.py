@@ -0,0 +1,27 @@
+# Generated by Django 5.2.6 on 2026-10-18 20:53
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('dormitory_repair', '0011_repairorder_claim_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserTokenVersion',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='token_version', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='用户')),
+                ('version', models.PositiveIntegerField(default=0, verbose_name='版本')),
+            ],
+            options={
+                'verbose_name': 'API令牌版本',
+                'verbose_name_plural': 'API令牌版本',
+            },
+        ),
+    ]
@@ -8,6 +8,7 @@ class Dormitory(models.Model):
     building_name = models.CharField('楼栋名称', max_length=50)
     room_number = models.CharField('房间号', max_length=20)
     floor = models.IntegerField('楼层')
+    updated_at = models.DateTimeField('更新时间', auto_now=True)
     
     class Meta:
         verbose_name = '宿舍'
@@ -45,6 +46,14 @@ class RepairOrder(models.Model):
         ('urgent', '紧急'),
     ]
     
+    # 允许的状态流转：当前状态 -> 可变更为的状态
+    STATUS_TRANSITIONS = {
+        'pending': ('processing', 'completed', 'cancelled'),
+        'processing': ('pending', 'completed', 'cancelled'),
+        'completed': (),
+        'cancelled': ('pending',),
+    }
+    
     order_number = models.CharField('工单号', max_length=20, unique=True, blank=True)
     # 报修用户 - 直接使用Django用户系统
     user = models.ForeignKey(User, on_delete=models.CASCADE, verbose_name='报修用户')
@@ -74,17 +83,140 @@ class RepairOrder(models.Model):
         verbose_name = '报修工单'
         verbose_name_plural = '报修工单管理'
         ordering = ['-created_at']
+        indexes = [
+            # 列表默认排序 / 游标分页
+            models.Index(fields=['-created_at', '-id'], name='repair_created_idx'),
+            # 列表、统计和后台按状态/优先级/故障类型筛选后按时间倒序
+            models.Index(fields=['status', '-created_at', '-id'], name='repair_status_created_idx'),
+            models.Index(fields=['priority', '-created_at', '-id'], name='repair_priority_created_idx'),
+            models.Index(fields=['fault_type', '-created_at', '-id'], name='repair_fault_created_idx'),
+            # 宿舍报修统计、删除宿舍前的未完成工单检查
+            models.Index(fields=['dormitory', 'status'], name='repair_dorm_status_idx'),
+            # 用户的报修记录
+            models.Index(fields=['user', '-created_at'], name='repair_user_created_idx'),
+            # 维修员领取工单：待处理工单按优先级取最早创建的一张（见 dispatch.py）
+            models.Index(fields=['status', 'priority', 'created_at', 'id'], name='repair_claim_idx'),
+        ]
+    
+    # 信号处理需要知道修改前的值（统计计数、每日汇总、维修员负载等），从数据库加载时记录下来
+    TRACKED_FIELDS = ('status', 'priority', 'fault_type', 'dormitory_id', 'created_at', 'repair_worker_id')
     
     def __str__(self):
         return f"{self.order_number} - {self.title}"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._remember_tracked_values()
+        return instance
+    
+    def _remember_tracked_values(self):
+        deferred = self.get_deferred_fields()
+        self._loaded_values = {
+            name: getattr(self, name) for name in self.TRACKED_FIELDS if name not in deferred
+        }
+    
     def save(self, *args, **kwargs):
         if not self.order_number:
-            # 自动生成工单号
-            import datetime
-            now = datetime.datetime.now()
-            self.order_number = f"R{now.strftime('%Y%m%d%H%M%S')}"
+            # 自动生成工单号（分配器见 order_numbers.py）
+            from .order_numbers import next_order_number
+            self.order_number = next_order_number()
         super().save(*args, **kwargs)
+        self._remember_tracked_values()
+
+
+class RepairOrderSearchDocument(models.Model):
+    """工单检索文档 - 汇总标题、描述、工单号和报修人姓名，MySQL 上建 ngram 全文索引"""
+    order = models.OneToOneField(RepairOrder, on_delete=models.CASCADE, primary_key=True,
+                                 related_name='search_document', verbose_name='工单')
+    content = models.TextField('检索内容')
+
+    class Meta:
+        verbose_name = '工单检索文档'
+        verbose_name_plural = verbose_name
+
+
+class RepairOrderSearchGram(models.Model):
+    """工单 n-gram 倒排索引 - 非 MySQL 数据库使用"""
+    gram = models.CharField('词元', max_length=2)
+    order = models.ForeignKey(RepairOrder, on_delete=models.CASCADE,
+                              related_name='search_grams', verbose_name='工单')
+    weight = models.PositiveIntegerField('权重', default=1)
+
+    class Meta:
+        verbose_name = '工单检索词元'
+        verbose_name_plural = verbose_name
+        unique_together = ['gram', 'order']
+
+
+class StatisticCounter(models.Model):
+    """统计计数器 - 由信号实时维护，定期对账修正"""
+    name = models.CharField('名称', max_length=50, primary_key=True)
+    value = models.BigIntegerField('数值', default=0)
+    updated_at = models.DateTimeField('更新时间', auto_now=True)
+
+    class Meta:
+        verbose_name = '统计计数器'
+        verbose_name_plural = verbose_name
+
+    def __str__(self):
+        return f"{self.name}={self.value}"
+
+
+class RepairDailyStat(models.Model):
+    """
+    工单每日汇总 - 按创建日期、楼栋、故障类型、优先级、当前状态统计工单数
+
+    由信号增量维护，manage.py rollup_repair_stats 回填和修正，见 rollups.py
+    """
+    date = models.DateField('日期')
+    building_name = models.CharField('楼栋名称', max_length=50)
+    fault_type = models.CharField('故障类型', max_length=20, choices=RepairOrder.FAULT_TYPE_CHOICES)
+    priority = models.CharField('优先级', max_length=10, choices=RepairOrder.PRIORITY_CHOICES)
+    status = models.CharField('状态', max_length=20, choices=RepairOrder.STATUS_CHOICES)
+    order_count = models.IntegerField('工单数', default=0)
+    updated_at = models.DateTimeField('更新时间', auto_now=True)
+
+    class Meta:
+        verbose_name = '工单每日汇总'
+        verbose_name_plural = verbose_name
+        constraints = [
+            # 也是按日期范围查询时使用的索引
+            models.UniqueConstraint(
+                fields=['date', 'building_name', 'fault_type', 'priority', 'status'],
+                name='repair_daily_stat_key',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.building_name} {self.fault_type}/{self.priority}/{self.status}={self.order_count}"
+
+
+class OrderNumberSequence(models.Model):
+    """工单号序列 - 每天一行，各进程按号段从这里领取序号"""
+    day = models.CharField('日期', max_length=8, primary_key=True)
+    next_value = models.BigIntegerField('下一个可分配序号', default=1)
+
+    class Meta:
+        verbose_name = '工单号序列'
+        verbose_name_plural = verbose_name
+
+    def __str__(self):
+        return f"{self.day}:{self.next_value}"
 
 
 # RepairWorker模型已删除 - 维修员直接使用Django用户系统
+
+
+class UserTokenVersion(models.Model):
+    """API 令牌版本 - 令牌中带有签发时的版本，登出时加一，使该用户已签发的令牌全部失效"""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True,
+                                related_name='token_version', verbose_name='用户')
+    version = models.PositiveIntegerField('版本', default=0)
+
+    class Meta:
+        verbose_name = 'API令牌版本'
+        verbose_name_plural = verbose_name
+
+    def __str__(self):
+        return f"{self.user_id}:{self.version}"
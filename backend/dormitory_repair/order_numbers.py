@@ -0,0 +1,171 @@
+"""
+工单号分配
+
+原来的工单号精确到秒（R%Y%m%d%H%M%S），同一秒内的两次报修会撞唯一约束。
+分配器通过 settings.REPAIR_ORDER_NUMBER_ALLOCATOR（点分路径）配置：
+
+- BlockSequenceAllocator（默认）：R + 日期 + 7 位当日序号，如 R202610180000123。
+  每个进程一次从 OrderNumberSequence 领取一段号码（REPAIR_ORDER_NUMBER_BLOCK_SIZE），
+  段内分配只在内存中加锁，不需要额外的数据库往返；领取号段是一条对单行的 UPDATE，
+  不锁表，且不持有进程锁（并发的线程可能各领一段，多出的号段留给后续请求）。
+  号段在不经过连接池的独立连接上提交，连接池占满时也不会卡住报修；外层事务回滚
+  不会让号段被重复领取（进程重启或跨天时未用完的号码作废，序号可能不连续）。
+- TimestampNodeAllocator：R + 秒级时间 + 2 位节点号 + 3 位秒内序号，完全不访问
+  数据库，但要求每个进程配置不同的 REPAIR_ORDER_NUMBER_NODE。
+
+旧工单号为 15 位，新格式长度不同，不会与历史数据冲突。
+"""
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import (
+    DEFAULT_DB_ALIAS, IntegrityError, InterfaceError, OperationalError, connections, transaction,
+)
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import OrderNumberSequence
+
+
+DEFAULT_ALLOCATOR = 'dormitory_repair.order_numbers.BlockSequenceAllocator'
+
+PREFIX = 'R'
+
+
+class BlockSequenceAllocator:
+    """日期 + 号段序号"""
+
+    sequence_digits = 7
+
+    def __init__(self, block_size=None, using=DEFAULT_DB_ALIAS):
+        self.block_size = block_size or getattr(settings, 'REPAIR_ORDER_NUMBER_BLOCK_SIZE', 50)
+        self.using = using
+        self._lock = threading.Lock()
+        # 已领取的号段 [day, next, end]，按领取顺序使用
+        self._blocks = deque()
+
+    def __call__(self):
+        day = timezone.localdate().strftime('%Y%m%d')
+        with self._lock:
+            value = self._take(day)
+        while value is None:
+            # 领取号段要等数据库连接和行锁，放在进程锁之外，不阻塞还有号可用的线程
+            start, end = self._reserve(day, self.block_size)
+            with self._lock:
+                self._blocks.append([day, start, end])
+                value = self._take(day)
+        if value >= 10 ** self.sequence_digits:
+            raise OverflowError(f'{day} 的工单号已用完')
+        return f"{PREFIX}{day}{value:0{self.sequence_digits}d}"
+
+    def _take(self, day):
+        """从已领取的号段中取一个号码，没有可用号码时返回 None（调用方持有 self._lock）"""
+        while self._blocks:
+            block = self._blocks[0]
+            if block[0] == day and block[1] < block[2]:
+                block[1] += 1
+                return block[1] - 1
+            # 用完或已跨天的号段作废
+            self._blocks.popleft()
+        return None
+
+    def _reserve(self, day, size):
+        """领取 [start, end) 号段"""
+        if connections[self.using].vendor == 'sqlite':
+            # SQLite 同一时间只允许一个写连接，独立连接会被外层事务锁住，直接用当前连接
+            connection = connections[self.using]
+            for _ in range(3):
+                try:
+                    with transaction.atomic(using=self.using):
+                        return self._reserve_on(connection, day, size)
+                except IntegrityError:
+                    continue
+            raise RuntimeError('领取工单号段失败')
+
+        for _ in range(3):
+            # 每次领取新建一个连接，用完即关闭：不在线程上保留连接（ASGI、runserver 每个请求
+            # 可能换一个线程）；连接不经过连接池，池被请求占满时不会在这里等待后报错
+            connection = connections.create_connection(self.using)
+            connection.pooled = False
+            try:
+                connection.set_autocommit(False)
+                block = self._reserve_on(connection, day, size)
+                connection.commit()
+                return block
+            except (IntegrityError, OperationalError, InterfaceError):
+                # 并发插入当天第一行，或连接已失效：关闭连接（未提交的修改随之回滚）后重试
+                continue
+            finally:
+                try:
+                    connection.close()
+                except Exception:
+                    pass
+        raise RuntimeError('领取工单号段失败')
+
+    @staticmethod
+    def _reserve_on(connection, day, size):
+        quote = connection.ops.quote_name
+        table = quote(OrderNumberSequence._meta.db_table)
+        day_column, value_column = quote('day'), quote('next_value')
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'UPDATE {table} SET {value_column} = {value_column} + %s WHERE {day_column} = %s',
+                [size, day],
+            )
+            if cursor.rowcount == 0:
+                cursor.execute(
+                    f'INSERT INTO {table} ({day_column}, {value_column}) VALUES (%s, %s)', [day, 1 + size]
+                )
+                return 1, 1 + size
+            cursor.execute(f'SELECT {value_column} FROM {table} WHERE {day_column} = %s', [day])
+            end = cursor.fetchone()[0]
+        return end - size, end
+
+
+class TimestampNodeAllocator:
+    """秒级时间 + 节点号 + 秒内序号（类 Snowflake）"""
+
+    per_second = 1000
+
+    def __init__(self, node=None):
+        node = getattr(settings, 'REPAIR_ORDER_NUMBER_NODE', 0) if node is None else node
+        if not 0 <= int(node) < 100:
+            raise ValueError('REPAIR_ORDER_NUMBER_NODE 必须在 0-99 之间')
+        self.node = int(node)
+        self._lock = threading.Lock()
+        self._second = 0
+        self._sequence = 0
+
+    def __call__(self):
+        with self._lock:
+            now = int(time.time())
+            if now < self._second:
+                # 系统时钟回拨，沿用上一秒继续计数
+                now = self._second
+            if now == self._second:
+                self._sequence += 1
+                if self._sequence >= self.per_second:
+                    # 本秒号码用完，等到下一秒
+                    time.sleep(max(0, self._second + 1 - time.time()))
+                    now = self._second + 1
+                    self._sequence = 0
+            else:
+                self._sequence = 0
+            self._second = now
+            sequence = self._sequence
+        stamp = datetime.fromtimestamp(now, tz=timezone.get_current_timezone())
+        return f"{PREFIX}{stamp.strftime('%y%m%d%H%M%S')}{self.node:02d}{sequence:03d}"
+
+
+@lru_cache(maxsize=None)
+def get_allocator():
+    path = getattr(settings, 'REPAIR_ORDER_NUMBER_ALLOCATOR', DEFAULT_ALLOCATOR)
+    return import_string(path)()
+
+
+def next_order_number():
+    return get_allocator()()
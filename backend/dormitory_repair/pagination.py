@@ -0,0 +1,113 @@
+"""
+游标分页（键集分页）工具
+
+按 (created_at, id) 倒序定位，每一页只读取 page_size + 1 行，
+翻到第几页的代价都一样，不再依赖 OFFSET 和 COUNT(*)。
+"""
+import base64
+import binascii
+import json
+from datetime import datetime
+
+from django.db.models import Q
+
+
+# 游标方向
+NEXT = 'n'
+PREVIOUS = 'p'
+
+
+class InvalidCursor(ValueError):
+    """游标无法解析"""
+
+
+def encode_cursor(created_at, pk, direction=NEXT):
+    """
+    把 (created_at, id) 编码为不透明的游标字符串
+    """
+    payload = json.dumps({
+        't': created_at.isoformat(),
+        'i': pk,
+        'd': direction,
+    }, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """
+    解析游标，返回 (created_at, id, direction)
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        created_at = datetime.fromisoformat(payload['t'])
+        pk = int(payload['i'])
+        direction = payload.get('d', NEXT)
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError, KeyError):
+        raise InvalidCursor(cursor)
+
+    if direction not in (NEXT, PREVIOUS):
+        raise InvalidCursor(cursor)
+    return created_at, pk, direction
+
+
+def keyset_after(queryset, created_at, pk):
+    """
+    按 (created_at, id) 倒序排在给定行之后的记录
+    """
+    return queryset.filter(
+        Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)
+    ).order_by('-created_at', '-id')
+
+
+def cursor_page_queryset(queryset, cursor, page_size):
+    """
+    根据游标构造本页查询，多取一行用于判断是否还有更多数据
+
+    返回 (切片后的queryset, direction)，direction 为 None 表示第一页
+    """
+    if not cursor:
+        return queryset.order_by('-created_at', '-id')[:page_size + 1], None
+
+    created_at, pk, direction = decode_cursor(cursor)
+    if direction == NEXT:
+        queryset = keyset_after(queryset, created_at, pk)
+    else:
+        # 向前翻页时按正序取，再在内存中反转
+        queryset = queryset.filter(
+            Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=pk)
+        ).order_by('created_at', 'id')
+    return queryset[:page_size + 1], direction
+
+
+def build_cursor_page(rows, direction, page_size, get_key):
+    """
+    根据取回的行生成本页数据和前后游标
+
+    get_key(row) 需要返回该行的 (created_at, id)
+    返回 (本页行列表, next游标, previous游标)
+    """
+    rows = list(rows)
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+
+    if direction == PREVIOUS:
+        rows.reverse()
+
+    if not rows:
+        return rows, None, None
+
+    first_key = get_key(rows[0])
+    last_key = get_key(rows[-1])
+
+    if direction is None:
+        next_cursor = encode_cursor(*last_key, NEXT) if has_more else None
+        previous_cursor = None
+    elif direction == NEXT:
+        next_cursor = encode_cursor(*last_key, NEXT) if has_more else None
+        previous_cursor = encode_cursor(*first_key, PREVIOUS)
+    else:
+        next_cursor = encode_cursor(*last_key, NEXT)
+        previous_cursor = encode_cursor(*first_key, PREVIOUS) if has_more else None
+
+    return rows, next_cursor, previous_cursor
@@ -0,0 +1,202 @@
+"""
+宿舍批量开通
+
+支持 CSV（building_name,room_number,floor）或 楼层 × 房间号 范围描述，
+在内存中按 unique_together (building_name, room_number) 去重并排除已存在的宿舍，
+再用 bulk_create 分批插入。接口 POST /api/dormitories/bulk/ 和
+manage.py import_dormitories 共用这里的逻辑。
+"""
+import csv
+import io
+import re
+import string
+
+from django.db import transaction
+
+from . import counters
+from .models import Dormitory
+
+
+# 单次最多开通的宿舍数
+PROVISION_LIMIT = 20000
+
+DEFAULT_ROOM_FORMAT = '{floor}{room:02d}'
+
+CSV_FIELDS = ('building_name', 'room_number', 'floor')
+
+# 房间号格式只能引用 floor、room，格式说明限于补零宽度（如 02d），宽度不超过两位
+ROOM_FORMAT_FIELDS = ('floor', 'room')
+_ROOM_FORMAT_SPEC_RE = re.compile(r'0?[1-9]?d?')
+
+
+class ProvisioningError(ValueError):
+    """输入格式错误"""
+
+
+def parse_range(spec, limit=PROVISION_LIMIT):
+    """
+    解析 "1-20"、"1,3,5-8" 形式的整数范围
+
+    先按起止值计算总个数，超过 limit 时在展开前报错
+    """
+    bounds = []
+    size = 0
+    for part in str(spec).split(','):
+        part = part.strip()
+        if not part:
+            continue
+        try:
+            start, _, end = part.partition('-')
+            start = int(start)
+            end = int(end) if end else start
+        except ValueError:
+            raise ProvisioningError(f'无法解析的范围: {part}')
+        if start > end:
+            raise ProvisioningError(f'范围起止颠倒: {part}')
+        size += end - start + 1
+        if size > limit:
+            raise ProvisioningError(f'单次最多开通{limit}间宿舍')
+        bounds.append((start, end))
+    if not bounds:
+        raise ProvisioningError('范围不能为空')
+    return [value for start, end in bounds for value in range(start, end + 1)]
+
+
+def check_room_format(room_format):
+    """
+    校验房间号格式：只允许 {floor}、{room} 和有限宽度的整数格式，
+    不允许属性/下标访问和任意宽度，避免展开时生成超长字符串
+    """
+    if not isinstance(room_format, str):
+        raise ProvisioningError('房间号格式必须是字符串')
+    try:
+        parsed = list(string.Formatter().parse(room_format))
+    except ValueError:
+        raise ProvisioningError(f'无效的房间号格式: {room_format}')
+    if not any(field is not None for _, field, _, _ in parsed):
+        raise ProvisioningError(f'房间号格式至少需要包含 {{room}}: {room_format}')
+    for _, field, spec, conversion in parsed:
+        if field is None:
+            continue
+        if field not in ROOM_FORMAT_FIELDS or conversion or not _ROOM_FORMAT_SPEC_RE.fullmatch(spec):
+            raise ProvisioningError(f'无效的房间号格式: {room_format}')
+
+
+def expand_room_spec(building_name, floors, rooms, room_format=DEFAULT_ROOM_FORMAT):
+    """
+    按 楼层 × 房间 展开宿舍，例如 floors="1-20", rooms="1-40" 生成 800 间
+    """
+    if not isinstance(building_name, str):
+        raise ProvisioningError('楼栋名称必须是字符串')
+    check_room_format(room_format)
+    building_name = building_name.strip()
+    max_length = Dormitory._meta.get_field('room_number').max_length
+    floor_numbers = parse_range(floors)
+    room_numbers = parse_range(rooms)
+    if len(floor_numbers) * len(room_numbers) > PROVISION_LIMIT:
+        raise ProvisioningError(f'单次最多开通{PROVISION_LIMIT}间宿舍')
+
+    result = []
+    for floor in floor_numbers:
+        for room in room_numbers:
+            try:
+                room_number = room_format.format(floor=floor, room=room)
+            except (AttributeError, KeyError, IndexError, ValueError):
+                raise ProvisioningError(f'无效的房间号格式: {room_format}')
+            if len(room_number) > max_length:
+                raise ProvisioningError(f'房间号过长: {room_number}')
+            result.append({'building_name': building_name, 'room_number': room_number, 'floor': floor})
+    return result
+
+
+def parse_dormitory_csv(text):
+    """
+    解析 CSV，首行需为表头，至少包含 building_name,room_number,floor
+    """
+    reader = csv.DictReader(io.StringIO(text.lstrip('\ufeff')))
+    missing = [field for field in CSV_FIELDS if field not in (reader.fieldnames or [])]
+    if missing:
+        raise ProvisioningError(f'CSV 缺少列: {", ".join(missing)}')
+
+    rows = []
+    for row in reader:
+        rows.append({field: row[field] for field in CSV_FIELDS})
+        if len(rows) > PROVISION_LIMIT:
+            raise ProvisioningError(f'单次最多开通{PROVISION_LIMIT}间宿舍')
+    return rows
+
+
+def _clean_row(row):
+    if not isinstance(row, dict):
+        raise ProvisioningError('每行应为包含 building_name、room_number、floor 的对象')
+    building_name = row.get('building_name')
+    room_number = row.get('room_number')
+    if not isinstance(building_name, (str, type(None))) or not isinstance(room_number, (str, int, type(None))):
+        raise ProvisioningError('楼栋名称和房间号必须是字符串')
+    building_name = str(building_name or '').strip()
+    room_number = str(room_number if room_number is not None else '').strip()
+    if not building_name or not room_number:
+        raise ProvisioningError('楼栋名称和房间号不能为空')
+    if len(building_name) > Dormitory._meta.get_field('building_name').max_length:
+        raise ProvisioningError('楼栋名称过长')
+    if len(room_number) > Dormitory._meta.get_field('room_number').max_length:
+        raise ProvisioningError('房间号过长')
+    try:
+        floor = int(row.get('floor'))
+    except (TypeError, ValueError):
+        raise ProvisioningError('楼层必须是整数')
+    return building_name, room_number, floor
+
+
+def provision_dormitories(rows, batch_size=500, dry_run=False):
+    """
+    批量开通宿舍
+
+    返回 {'created': 新建数量, 'skipped': [已存在/重复的宿舍], 'errors': [{'row', 'error'}]}
+    """
+    if not isinstance(rows, list):
+        raise ProvisioningError('宿舍列表必须是数组')
+    if len(rows) > PROVISION_LIMIT:
+        raise ProvisioningError(f'单次最多开通{PROVISION_LIMIT}间宿舍')
+
+    errors = []
+    skipped = []
+    candidates = {}
+    for index, row in enumerate(rows, start=1):
+        try:
+            building_name, room_number, floor = _clean_row(row)
+        except ProvisioningError as e:
+            errors.append({'row': index, 'error': str(e)})
+            continue
+        key = (building_name, room_number)
+        if key in candidates:
+            skipped.append({'row': index, 'dormitory': f'{building_name}-{room_number}', 'reason': '重复'})
+            continue
+        candidates[key] = floor
+
+    # 一次查询取出涉及楼栋的已有房间（命中 unique_together 索引前缀）
+    buildings = {building_name for building_name, _ in candidates}
+    existing = set(Dormitory.objects.filter(
+        building_name__in=buildings
+    ).values_list('building_name', 'room_number')) if buildings else set()
+
+    new_dormitories = []
+    for (building_name, room_number), floor in candidates.items():
+        if (building_name, room_number) in existing:
+            skipped.append({'dormitory': f'{building_name}-{room_number}', 'reason': '已存在'})
+        else:
+            new_dormitories.append(Dormitory(building_name=building_name, room_number=room_number, floor=floor))
+
+    if new_dormitories and not dry_run:
+        with transaction.atomic():
+            # 并发开通同一房间时由唯一约束兜底
+            Dormitory.objects.bulk_create(new_dormitories, batch_size=batch_size, ignore_conflicts=True)
+            # bulk_create 不触发 post_save，手动更新计数（并发冲突的偏差由对账修正）
+            counters.adjust({counters.DORMITORIES_TOTAL: len(new_dormitories)})
+            counters.bump_version()
+
+    return {
+        'created': len(new_dormitories),
+        'skipped': skipped,
+        'errors': errors,
+    }
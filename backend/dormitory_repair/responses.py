@@ -0,0 +1,68 @@
+"""
+API 响应
+
+ApiResponse 替代 django.http.JsonResponse，安装了 orjson 时用它编码（datetime、
+date、UUID 等原生支持，不必逐个 .isoformat()），未安装时回退到标准库 json。
+两种编码器输出的 JSON 语义一致：非 ASCII 字符直接以 UTF-8 输出，
+datetime 统一为 isoformat() 的格式。
+"""
+import datetime
+import decimal
+import json
+import uuid
+
+from django.http import HttpResponse
+from django.utils.functional import Promise
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - 取决于部署环境
+    orjson = None
+
+
+def _default(value):
+    """两种编码器都不能直接处理的类型"""
+    if isinstance(value, decimal.Decimal):
+        return str(value)
+    if isinstance(value, Promise):
+        # gettext_lazy 等惰性字符串
+        return str(value)
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+def _stdlib_default(value):
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return _default(value)
+
+
+def stdlib_dumps(data):
+    """用标准库 json 编码为 UTF-8 字节串"""
+    return json.dumps(data, default=_stdlib_default, ensure_ascii=False, separators=(',', ':')).encode()
+
+
+if orjson is not None:
+    ENCODER = 'orjson'
+
+    def dumps(data):
+        """编码为 UTF-8 字节串"""
+        return orjson.dumps(data, default=_default, option=orjson.OPT_NON_STR_KEYS)
+else:
+    ENCODER = 'json'
+    dumps = stdlib_dumps
+
+
+class ApiResponse(HttpResponse):
+    """
+    JSON 响应，参数与 JsonResponse 相同（data、safe、status 等）
+    """
+
+    def __init__(self, data, safe=True, **kwargs):
+        if safe and not isinstance(data, dict):
+            raise TypeError('In order to allow non-dict objects to be serialized set the safe parameter to False.')
+        kwargs.setdefault('content_type', 'application/json')
+        super().__init__(content=dumps(data), **kwargs)
@@ -0,0 +1,155 @@
+"""
+工单每日汇总
+
+RepairDailyStat 按 (创建日期, 楼栋, 故障类型, 优先级, 当前状态) 保存工单数，
+统计接口（/api/repair-orders/statistics/、/api/dormitories/statistics/）只读这张表：
+一年的趋势图只需扫描几千行汇总，而不是对全部工单 GROUP BY。
+
+汇总由 signals.py 增量维护：工单创建、删除，以及状态、优先级、故障类型、宿舍变化时，
+旧维度 -1、新维度 +1（事务提交后执行）。绕过信号的批量操作、宿舍改楼栋名等造成的
+偏差由 rebuild()（manage.py rollup_repair_stats）按天重算修正；重算与并发增量之间
+不加全局锁，汇总为最终一致。
+
+日期按 settings.TIME_ZONE 的本地日期划分。
+"""
+import datetime
+
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, connections, transaction
+from django.db.models import Count, F, Sum
+from django.utils import timezone
+
+from .models import Dormitory, RepairDailyStat, RepairOrder
+
+
+DIMENSIONS = ('building_name', 'fault_type', 'priority', 'status')
+# RepairDailyStat 的唯一键
+KEY_FIELDS = ('date', *DIMENSIONS)
+
+
+def local_date(value):
+    """工单创建时间对应的本地日期"""
+    return timezone.localdate(value) if timezone.is_aware(value) else value.date()
+
+
+def day_bounds(date):
+    """本地日期 date 的 [开始, 结束) 时间"""
+    start = timezone.make_aware(datetime.datetime.combine(date, datetime.time.min))
+    return start, start + datetime.timedelta(days=1)
+
+
+def make_key(created_at, building_name, fault_type, priority, status):
+    return local_date(created_at), building_name, fault_type, priority, status
+
+
+def building_names(dormitory_ids):
+    """{宿舍ID: 楼栋名称}"""
+    ids = {dormitory_id for dormitory_id in dormitory_ids if dormitory_id is not None}
+    if not ids:
+        return {}
+    return dict(Dormitory.objects.filter(id__in=ids).values_list('id', 'building_name'))
+
+
+def adjust(deltas):
+    """
+    在当前事务提交后增减汇总行，deltas 为 {make_key(...): delta}
+    """
+    deltas = {key: delta for key, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    transaction.on_commit(lambda: _apply(deltas))
+
+
+def _apply(deltas):
+    now = timezone.now()
+    for (date, building_name, fault_type, priority, status), delta in deltas.items():
+        key = dict(date=date, building_name=building_name, fault_type=fault_type, priority=priority, status=status)
+        if RepairDailyStat.objects.filter(**key).update(order_count=F('order_count') + delta, updated_at=now):
+            continue
+        try:
+            with transaction.atomic():
+                RepairDailyStat.objects.create(order_count=delta, **key)
+        except IntegrityError:
+            # 并发插入了同一行，改为累加
+            RepairDailyStat.objects.filter(**key).update(order_count=F('order_count') + delta, updated_at=now)
+
+
+def add_change(deltas, before, after):
+    """
+    把一张工单从 before 维度移到 after 维度（None 表示新建或删除）累加到 deltas
+    """
+    if before == after:
+        return
+    if before is not None:
+        deltas[before] = deltas.get(before, 0) - 1
+    if after is not None:
+        deltas[after] = deltas.get(after, 0) + 1
+
+
+def rebuild(start_date, end_date, using=DEFAULT_DB_ALIAS):
+    """
+    按天重算 [start_date, end_date] 的汇总，每天一个事务，返回 {日期: (旧工单数, 新工单数)} 中有偏差的天
+
+    在主库上执行（不读副本），统计、删除和写入在同一事务中，并锁定当天已有的汇总行。
+    结果只保证最终一致：重算期间提交的工单可能既计入重算结果，又在提交后由 adjust 再累加一次
+    （或反之漏计），这类偏差由下一次重算修正。并发增量在重算删除后新建了同一维度的行时，
+    写入改为覆盖该行，不会因唯一约束冲突而中断
+    """
+    # 支持时用 INSERT ... ON CONFLICT / ON DUPLICATE KEY UPDATE 覆盖并发新建的行
+    features = connections[using].features
+    upsert = {'update_conflicts': True, 'update_fields': ['order_count', 'updated_at']}
+    if features.supports_update_conflicts_with_target:
+        upsert['unique_fields'] = KEY_FIELDS
+    drift = {}
+    date = start_date
+    while date <= end_date:
+        start, end = day_bounds(date)
+        with transaction.atomic(using=using):
+            current = list(RepairDailyStat.objects.using(using).select_for_update().filter(date=date))
+            old_total = sum(stat.order_count for stat in current)
+            rows = RepairOrder.objects.using(using).filter(created_at__gte=start, created_at__lt=end).order_by().values(
+                'fault_type', 'priority', 'status', building_name=F('dormitory__building_name')
+            ).annotate(order_count=Count('id'))
+            stats = [RepairDailyStat(date=date, **row) for row in rows]
+            RepairDailyStat.objects.using(using).filter(date=date).delete()
+            RepairDailyStat.objects.using(using).bulk_create(stats, **upsert)
+        new_total = sum(stat.order_count for stat in stats)
+        if old_total != new_total:
+            drift[date] = (old_total, new_total)
+        date += datetime.timedelta(days=1)
+    return drift
+
+
+def first_order_date():
+    created_at = RepairOrder.objects.order_by('created_at').values_list('created_at', flat=True).first()
+    return local_date(created_at) if created_at else None
+
+
+# ========================
+# 查询
+# ========================
+
+def stats_queryset(start_date, end_date, filters=None):
+    """
+    日期范围内（start_date/end_date 为 None 时不限）的汇总行，filters 为 {维度: 值}
+    """
+    queryset = RepairDailyStat.objects.filter(order_count__gt=0)
+    if start_date is not None:
+        queryset = queryset.filter(date__gte=start_date)
+    if end_date is not None:
+        queryset = queryset.filter(date__lte=end_date)
+    for name, value in (filters or {}).items():
+        if name in DIMENSIONS and value:
+            queryset = queryset.filter(**{name: value})
+    return queryset
+
+
+def group_counts(queryset, group_by):
+    """
+    按 group_by（date 或某个维度）汇总工单数，返回 [(值, 工单数)]，按值排序
+    """
+    return list(grouped(queryset, group_by).values_list(group_by, 'total'))
+
+
+def grouped(queryset, group_by):
+    """按 group_by 分组汇总的查询，total 为工单数"""
+    return queryset.order_by(group_by).values(group_by).annotate(total=Sum('order_count'))
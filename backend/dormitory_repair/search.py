@@ -0,0 +1,234 @@
+"""
+工单全文检索
+
+检索范围：标题、描述、工单号、报修人姓名/用户名。
+- MySQL：RepairOrderSearchDocument.content 上的 FULLTEXT ... WITH PARSER ngram 索引
+- 其他数据库：RepairOrderSearchGram 倒排表（二元组 n-gram）
+
+两种实现都返回带 search_rank 注解的 queryset，接口和后台搜索框共用。
+"""
+import re
+
+from django.db import connection, transaction
+from django.db.models import Count, F, FloatField, Func, OuterRef, Subquery, Sum, Value
+
+from .models import RepairOrder, RepairOrderSearchDocument, RepairOrderSearchGram
+
+
+# 与 MySQL ngram_token_size 默认值保持一致
+NGRAM_SIZE = 2
+
+# 各字段在倒排表中的权重
+FIELD_WEIGHTS = {
+    'order_number': 4,
+    'title': 3,
+    'reporter': 2,
+    'description': 1,
+}
+
+# 影响检索文档的字段
+INDEXED_ORDER_FIELDS = {'order_number', 'title', 'description', 'user'}
+INDEXED_USER_FIELDS = {'username', 'first_name', 'last_name'}
+
+_WORD_RE = re.compile(r'\w+')
+
+
+def use_fulltext():
+    return connection.vendor == 'mysql'
+
+
+def split_words(text):
+    """拆分出连续的文字/数字片段（中文按整段保留，由 n-gram 负责切分）"""
+    return _WORD_RE.findall((text or '').lower())
+
+
+def ngrams(word):
+    """
+    把一个片段切成二元组，末尾再补一个单字，
+    这样任意单字都能以前缀方式命中
+    """
+    if len(word) <= NGRAM_SIZE:
+        grams = [word]
+    else:
+        grams = [word[i:i + NGRAM_SIZE] for i in range(len(word) - NGRAM_SIZE + 1)]
+    if len(word) > 1:
+        grams.append(word[-1])
+    return grams
+
+
+def reporter_text(user):
+    """
+    报修人检索文本：名、姓、用户名，另加不带空格的“姓名”和“名姓”，
+    使“张三”这样跨姓和名的二元组也能命中
+    """
+    names = [user.first_name, user.last_name]
+    if user.first_name and user.last_name:
+        names += [user.last_name + user.first_name, user.first_name + user.last_name]
+    return ' '.join(dict.fromkeys(filter(None, names + [user.username])))
+
+
+def _order_fields(order):
+    reporter = reporter_text(order.user)
+    return {
+        'order_number': order.order_number,
+        'title': order.title,
+        'reporter': reporter,
+        'description': order.description,
+    }
+
+
+def build_content(order):
+    """生成检索文档内容"""
+    fields = _order_fields(order)
+    return '\n'.join(fields[name] or '' for name in FIELD_WEIGHTS)
+
+
+def build_grams(order):
+    """生成 {词元: 权重}"""
+    weights = {}
+    for name, text in _order_fields(order).items():
+        for word in split_words(text):
+            for gram in ngrams(word):
+                weights[gram] = weights.get(gram, 0) + FIELD_WEIGHTS[name]
+    return weights
+
+
+def index_orders(orders):
+    """
+    重建一批工单的检索文档（orders 需已加载 user）
+    """
+    orders = list(orders)
+    if not orders:
+        return
+    ids = [order.pk for order in orders]
+
+    with transaction.atomic():
+        RepairOrderSearchDocument.objects.filter(order_id__in=ids).delete()
+        RepairOrderSearchDocument.objects.bulk_create([
+            RepairOrderSearchDocument(order_id=order.pk, content=build_content(order))
+            for order in orders
+        ])
+
+        if use_fulltext():
+            return
+
+        RepairOrderSearchGram.objects.filter(order_id__in=ids).delete()
+        RepairOrderSearchGram.objects.bulk_create([
+            RepairOrderSearchGram(order_id=order.pk, gram=gram, weight=weight)
+            for order in orders
+            for gram, weight in build_grams(order).items()
+        ], batch_size=1000)
+
+
+def index_order(order):
+    index_orders([order])
+
+
+def is_indexed(order):
+    """检索文档是否已与工单当前内容一致"""
+    return RepairOrderSearchDocument.objects.filter(order_id=order.pk, content=build_content(order)).exists()
+
+
+def rebuild_index(batch_size=500, stdout=None):
+    """
+    全量重建检索索引，返回处理的工单数
+    """
+    queryset = RepairOrder.objects.select_related('user').order_by('pk')
+    total = 0
+    last_pk = 0
+    while True:
+        batch = list(queryset.filter(pk__gt=last_pk)[:batch_size])
+        if not batch:
+            break
+        index_orders(batch)
+        total += len(batch)
+        last_pk = batch[-1].pk
+        if stdout is not None:
+            stdout.write(f'已索引 {total} 条工单')
+    return total
+
+
+class MatchAgainst(Func):
+    """MySQL MATCH (...) AGAINST (... IN BOOLEAN MODE)"""
+    output_field = FloatField()
+
+    def __init__(self, expression, query, **extra):
+        self.query = query
+        super().__init__(expression, **extra)
+
+    def as_sql(self, compiler, connection, **extra_context):
+        sql, params = compiler.compile(self.source_expressions[0])
+        return f'MATCH ({sql}) AGAINST (%s IN BOOLEAN MODE)', [*params, self.query]
+
+
+def _boolean_query(words):
+    # 每个片段都必须出现；单字用前缀匹配（短于 ngram_token_size）
+    terms = []
+    for word in words:
+        if len(word) < NGRAM_SIZE:
+            terms.append(f'+{word}*')
+        else:
+            terms.append(f'+"{word}"')
+    return ' '.join(terms)
+
+
+def _query_grams(word):
+    # 查询时只需要二元组，末尾单字已被最后一个二元组覆盖
+    if len(word) <= NGRAM_SIZE:
+        return [word]
+    return [word[i:i + NGRAM_SIZE] for i in range(len(word) - NGRAM_SIZE + 1)]
+
+
+def _search_grams(queryset, words, rank):
+    """
+    倒排表检索：所有词元都命中才算匹配，相关度为命中词元的权重之和
+    """
+    grams = set()
+    prefixes = []
+    for word in words:
+        if len(word) < NGRAM_SIZE:
+            prefixes.append(word)
+        else:
+            grams.update(_query_grams(word))
+
+    if grams:
+        # (gram, order) 唯一，命中数等于词元数即为全部命中
+        matches = RepairOrderSearchGram.objects.filter(gram__in=grams)
+        required = len(grams)
+    else:
+        matches = RepairOrderSearchGram.objects.filter(gram__startswith=prefixes[0])
+        required = 1
+    matches = matches.values('order_id').annotate(
+        rank=Sum('weight'), hits=Count('gram')
+    ).filter(hits__gte=required)
+
+    queryset = queryset.filter(pk__in=matches.values('order_id'))
+    for prefix in prefixes:
+        queryset = queryset.filter(pk__in=RepairOrderSearchGram.objects.filter(
+            gram__startswith=prefix
+        ).values('order_id'))
+
+    if rank:
+        queryset = queryset.annotate(
+            search_rank=Subquery(matches.filter(order_id=OuterRef('pk')).values('rank')[:1])
+        )
+    return queryset
+
+
+def search_repair_orders(queryset, term, rank=True):
+    """
+    按关键词检索工单
+
+    rank=True 时附加 search_rank 注解（越大越相关），调用方可按其排序
+    """
+    words = list(dict.fromkeys(split_words(term)))
+    if not words:
+        if rank:
+            queryset = queryset.annotate(search_rank=Value(0, output_field=FloatField()))
+        return queryset.none()
+
+    if use_fulltext():
+        match = MatchAgainst(F('search_document__content'), _boolean_query(words))
+        return queryset.annotate(search_rank=match).filter(search_rank__gt=0)
+
+    return _search_grams(queryset, words, rank)
@@ -0,0 +1,252 @@
+"""
+信号处理 - 维护检索索引、统计计数等派生数据
+"""
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+
+from . import assignment, counters, rollups, search, tokens
+from .models import Dormitory, RepairOrder
+
+
+# QuerySet.update() 不触发 post_save，批量修改工单后手动发送
+# changes: [(修改前的字段值 dict，含 id), 本次写入的字段 dict]
+repair_orders_bulk_updated = Signal()
+
+
+@receiver(post_save, sender=RepairOrder, dispatch_uid='repair_order_search_index')
+def update_order_search_index(sender, instance, created, update_fields=None, **kwargs):
+    """工单标题、描述、工单号、报修人变化时重建其检索文档"""
+    if update_fields and not search.INDEXED_ORDER_FIELDS & set(update_fields):
+        return
+    # 只改了状态等字段的保存，检索文本不变时不重建
+    if not created and search.is_indexed(instance):
+        return
+    search.index_order(instance)
+
+
+@receiver(post_save, sender=User, dispatch_uid='repair_order_reporter_search_index')
+def update_reporter_search_index(sender, instance, created, update_fields=None, **kwargs):
+    """报修人姓名变化时重建其工单的检索文档（登录时只更新 last_login，会被跳过）"""
+    if created:
+        return
+    if update_fields and not search.INDEXED_USER_FIELDS & set(update_fields):
+        return
+    search.index_orders(RepairOrder.objects.filter(user=instance).select_related('user'))
+
+
+@receiver(post_save, sender=RepairOrder, dispatch_uid='repair_order_counters_save')
+def count_order_saved(sender, instance, created, update_fields=None, **kwargs):
+    if created:
+        counters.adjust({
+            counters.ORDERS_TOTAL: 1,
+            counters.order_status_key(instance.status): 1,
+        })
+        return
+    if update_fields and 'status' not in update_fields:
+        return
+    # 未从数据库加载过的实例无法得知原状态，交给对账修正
+    old_status = getattr(instance, '_loaded_values', {}).get('status')
+    if old_status is None or old_status == instance.status:
+        return
+    counters.adjust({
+        counters.order_status_key(old_status): -1,
+        counters.order_status_key(instance.status): 1,
+    })
+
+
+@receiver(post_delete, sender=RepairOrder, dispatch_uid='repair_order_counters_delete')
+def count_order_deleted(sender, instance, **kwargs):
+    status = getattr(instance, '_loaded_values', {}).get('status', instance.status)
+    counters.adjust({
+        counters.ORDERS_TOTAL: -1,
+        counters.order_status_key(status): -1,
+    })
+
+
+@receiver(repair_orders_bulk_updated, sender=RepairOrder, dispatch_uid='repair_order_counters_bulk')
+def count_orders_bulk_updated(sender, changes, **kwargs):
+    deltas = {}
+    for before, updates in changes:
+        new_status = updates.get('status')
+        if new_status is None or new_status == before['status']:
+            continue
+        old_key = counters.order_status_key(before['status'])
+        new_key = counters.order_status_key(new_status)
+        deltas[old_key] = deltas.get(old_key, 0) - 1
+        deltas[new_key] = deltas.get(new_key, 0) + 1
+    counters.adjust(deltas)
+
+
+@receiver(post_save, sender=Dormitory, dispatch_uid='dormitory_counters_save')
+def count_dormitory_saved(sender, instance, created, **kwargs):
+    if created:
+        counters.adjust({counters.DORMITORIES_TOTAL: 1})
+
+
+@receiver(post_delete, sender=Dormitory, dispatch_uid='dormitory_counters_delete')
+def count_dormitory_deleted(sender, instance, **kwargs):
+    counters.adjust({counters.DORMITORIES_TOTAL: -1})
+
+
+@receiver(post_save, sender=User, dispatch_uid='user_counters_save')
+def count_user_saved(sender, instance, created, **kwargs):
+    if created:
+        counters.adjust({counters.USERS_TOTAL: 1})
+
+
+@receiver(post_delete, sender=User, dispatch_uid='user_counters_delete')
+def count_user_deleted(sender, instance, **kwargs):
+    counters.adjust({counters.USERS_TOTAL: -1})
+
+
+# 工单列表内嵌报修人和宿舍信息，它们变化时同样递增工单列表的数据版本
+ORDER_LIST_USER_FIELDS = {'username', 'first_name', 'last_name', 'email'}
+
+
+@receiver(post_save, sender=RepairOrder, dispatch_uid='repair_order_version_save')
+@receiver(post_delete, sender=RepairOrder, dispatch_uid='repair_order_version_delete')
+@receiver(post_save, sender=Dormitory, dispatch_uid='dormitory_order_version_save')
+@receiver(post_delete, sender=Dormitory, dispatch_uid='dormitory_order_version_delete')
+def bump_orders_version(sender, **kwargs):
+    counters.bump_version()
+
+
+@receiver(repair_orders_bulk_updated, sender=RepairOrder, dispatch_uid='repair_order_version_bulk')
+def bump_orders_version_bulk(sender, changes, **kwargs):
+    if changes:
+        counters.bump_version()
+
+
+@receiver(post_save, sender=User, dispatch_uid='user_order_version_save')
+@receiver(post_delete, sender=User, dispatch_uid='user_order_version_delete')
+def bump_orders_version_user(sender, instance, created=False, update_fields=None, **kwargs):
+    """报修人资料变化（登录时只更新 last_login，会被跳过；新用户还没有工单）"""
+    if created or (update_fields and not ORDER_LIST_USER_FIELDS & set(update_fields)):
+        return
+    counters.bump_version()
+
+
+@receiver(post_save, sender=User, dispatch_uid='user_token_cache_save')
+@receiver(post_delete, sender=User, dispatch_uid='user_token_cache_delete')
+def forget_cached_user(sender, instance, **kwargs):
+    """用户资料、权限或密码变化后，令牌认证重新加载该用户"""
+    tokens.forget_user(instance.pk)
+
+
+# ========================
+# 工单每日汇总
+# ========================
+
+# 影响每日汇总的工单字段
+ROLLUP_FIELDS = ('status', 'priority', 'fault_type', 'dormitory_id', 'created_at')
+
+
+def _rollup_key(values, buildings):
+    building_name = buildings.get(values['dormitory_id'])
+    if building_name is None or values.get('created_at') is None:
+        return None
+    return rollups.make_key(
+        values['created_at'], building_name, values['fault_type'], values['priority'], values['status']
+    )
+
+
+def _order_values(instance, fields=RepairOrder.TRACKED_FIELDS):
+    return {name: getattr(instance, name) for name in fields}
+
+
+def _order_buildings(instance, *dormitory_ids):
+    """宿舍ID对应的楼栋名称，已加载的 instance.dormitory 不再查询"""
+    buildings = {}
+    if RepairOrder.dormitory.is_cached(instance):
+        buildings[instance.dormitory_id] = instance.dormitory.building_name
+    missing = [dormitory_id for dormitory_id in dormitory_ids if dormitory_id not in buildings]
+    buildings.update(rollups.building_names(missing))
+    return buildings
+
+
+@receiver(post_save, sender=RepairOrder, dispatch_uid='repair_order_rollup_save')
+def rollup_order_saved(sender, instance, created, update_fields=None, **kwargs):
+    after = _order_values(instance, ROLLUP_FIELDS)
+    if created:
+        buildings = _order_buildings(instance, instance.dormitory_id)
+        deltas = {}
+        rollups.add_change(deltas, None, _rollup_key(after, buildings))
+        rollups.adjust(deltas)
+        return
+    if update_fields and not set(ROLLUP_FIELDS) & {
+        RepairOrder._meta.get_field(name).attname for name in update_fields
+    }:
+        return
+    # 未从数据库加载过（或延迟加载了相关字段）的实例无法得知原值，交给 rollup_repair_stats 修正
+    loaded = getattr(instance, '_loaded_values', {})
+    before = {name: loaded[name] for name in ROLLUP_FIELDS if name in loaded}
+    if len(before) < len(ROLLUP_FIELDS) or before == after:
+        return
+    buildings = _order_buildings(instance, before['dormitory_id'], instance.dormitory_id)
+    deltas = {}
+    rollups.add_change(deltas, _rollup_key(before, buildings), _rollup_key(after, buildings))
+    rollups.adjust(deltas)
+
+
+@receiver(post_delete, sender=RepairOrder, dispatch_uid='repair_order_rollup_delete')
+def rollup_order_deleted(sender, instance, **kwargs):
+    values = {**_order_values(instance), **getattr(instance, '_loaded_values', {})}
+    buildings = _order_buildings(instance, values['dormitory_id'])
+    deltas = {}
+    rollups.add_change(deltas, _rollup_key(values, buildings), None)
+    rollups.adjust(deltas)
+
+
+@receiver(repair_orders_bulk_updated, sender=RepairOrder, dispatch_uid='repair_order_rollup_bulk')
+def rollup_orders_bulk_updated(sender, changes, **kwargs):
+    moved = [
+        (before, {**before, **updates}) for before, updates in changes
+        if any(name in updates and updates[name] != before.get(name) for name in ROLLUP_FIELDS)
+    ]
+    if not moved:
+        return
+    buildings = rollups.building_names(
+        values['dormitory_id'] for pair in moved for values in pair
+    )
+    deltas = {}
+    for before, after in moved:
+        rollups.add_change(deltas, _rollup_key(before, buildings), _rollup_key(after, buildings))
+    rollups.adjust(deltas)
+
+
+# ========================
+# 维修员负载（自动分配）
+# ========================
+
+def _assignment_slot(values):
+    """计入维修员负载的工单返回 (维修员ID, 宿舍ID)，否则返回 None"""
+    if values.get('repair_worker_id') is None or values.get('status') not in assignment.OPEN_STATUSES:
+        return None
+    return values['repair_worker_id'], values['dormitory_id']
+
+
+@receiver(post_save, sender=RepairOrder, dispatch_uid='repair_order_assignment_save')
+def track_assignment_saved(sender, instance, created, **kwargs):
+    after = _assignment_slot(_order_values(instance))
+    if created:
+        assignment.orders_moved([(None, after)])
+        return
+    # 未从数据库加载过的实例无法得知原值，由引擎定期重建修正
+    before = getattr(instance, '_loaded_values', {})
+    if len(before) < len(RepairOrder.TRACKED_FIELDS):
+        return
+    assignment.orders_moved([(_assignment_slot(before), after)])
+
+
+@receiver(post_delete, sender=RepairOrder, dispatch_uid='repair_order_assignment_delete')
+def track_assignment_deleted(sender, instance, **kwargs):
+    values = {**_order_values(instance), **getattr(instance, '_loaded_values', {})}
+    assignment.orders_moved([(_assignment_slot(values), None)])
+
+
+@receiver(repair_orders_bulk_updated, sender=RepairOrder, dispatch_uid='repair_order_assignment_bulk')
+def track_assignment_bulk_updated(sender, changes, **kwargs):
+    assignment.orders_moved([
+        (_assignment_slot(before), _assignment_slot({**before, **updates})) for before, updates in changes
+    ])
@@ -0,0 +1,39 @@
+"""
+测试公用的数据构造方法
+"""
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.test import Client
+from django.utils import timezone
+
+from dormitory_repair.models import Dormitory, RepairOrder
+
+
+def create_user(username, **extra):
+    return User.objects.create_user(username=username, password='password', **extra)
+
+
+def create_dormitory(building_name='1号楼', room_number='101', floor=1):
+    return Dormitory.objects.create(building_name=building_name, room_number=room_number, floor=floor)
+
+
+def create_order(user, dormitory, title='水龙头漏水', **extra):
+    extra.setdefault('fault_type', 'water')
+    extra.setdefault('description', '')
+    return RepairOrder.objects.create(user=user, dormitory=dormitory, title=title, **extra)
+
+
+def spread_created_at(orders, step=timedelta(minutes=1)):
+    """把工单的创建时间依次往前错开，orders[0] 最新"""
+    now = timezone.now()
+    for index, order in enumerate(orders):
+        order.created_at = now - step * index
+    RepairOrder.objects.bulk_update(orders, ['created_at'])
+
+
+def api_client(user=None):
+    client = Client(HTTP_HOST='localhost')
+    if user is not None:
+        client.force_login(user)
+    return client
@@ -0,0 +1,40 @@
+from django.test import TestCase
+
+from .base import api_client, create_dormitory, create_order, create_user
+
+
+class DormitoryAdminTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = create_user('admin', is_staff=True, is_superuser=True)
+        student = create_user('stu')
+        cls.pending = create_dormitory('1号楼', '101')
+        cls.processing = create_dormitory('1号楼', '102')
+        cls.completed = create_dormitory('1号楼', '103')
+        cls.empty = create_dormitory('1号楼', '104')
+        create_order(student, cls.pending)
+        create_order(student, cls.processing, status='processing')
+        create_order(student, cls.processing, status='completed')
+        create_order(student, cls.completed, status='completed')
+        create_order(student, cls.completed, status='cancelled')
+
+    def filtered(self, value):
+        response = api_client(self.admin).get('/admin/dormitory_repair/dormitory/', {'repair_record': value})
+        self.assertEqual(response.status_code, 200)
+        return {dormitory.pk for dormitory in response.context['cl'].result_list}
+
+    def test_repair_record_filter(self):
+        self.assertEqual(self.filtered('pending'), {self.pending.pk})
+        # 仍有维修中工单的宿舍不算全部处理
+        self.assertEqual(self.filtered('completed'), {self.completed.pk})
+        self.assertEqual(self.filtered('none'), {self.empty.pk})
+
+    def test_annotated_counts(self):
+        response = api_client(self.admin).get('/admin/dormitory_repair/dormitory/')
+        counts = {
+            dormitory.pk: (dormitory.repair_total, dormitory.repair_pending, dormitory.repair_open)
+            for dormitory in response.context['cl'].result_list
+        }
+        self.assertEqual(counts[self.processing.pk], (2, 0, 1))
+        self.assertEqual(counts[self.empty.pk], (0, 0, 0))
@@ -0,0 +1,131 @@
+import json
+import random
+
+from django.contrib.auth.models import Group
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from dormitory_repair import assignment
+from dormitory_repair.assignment import AssignmentEngine, AssignmentError
+from dormitory_repair.management.commands.bench_assignment import Command as BenchCommand
+from dormitory_repair.models import RepairOrder
+
+from .base import api_client, create_dormitory, create_order, create_user
+
+
+class AssignmentEngineTests(SimpleTestCase):
+
+    def make_engine(self, max_open=None, **specialties):
+        engine = AssignmentEngine(max_open=max_open)
+        for worker_id in (1, 2, 3):
+            engine.add_worker(worker_id, specialties.get(f'w{worker_id}', ()))
+        return engine
+
+    def test_prefers_least_loaded_then_lowest_id(self):
+        engine = self.make_engine()
+        self.assertEqual(engine.best_worker('1号楼', 'water'), 1)
+        engine.add_order(1, '2号楼')
+        engine.add_order(2, '2号楼')
+        self.assertEqual(engine.best_worker('1号楼', 'water'), 3)
+
+    def test_proximity_and_specialty_bonus(self):
+        engine = self.make_engine(w3=['network'])
+        engine.add_order(2, '1号楼')
+        # 维修员2 已在该楼栋有一张工单：1 - PROXIMITY_BONUS
+        self.assertEqual(engine.best_worker('1号楼', 'water'), 2)
+        # 维修员3 擅长网络故障：0 - SPECIALTY_BONUS
+        self.assertEqual(engine.best_worker('1号楼', 'network'), 3)
+
+    def test_remove_order_restores_load(self):
+        engine = self.make_engine()
+        engine.add_order(1, '1号楼')
+        engine.remove_order(1, '1号楼')
+        self.assertEqual(engine.loads[1], 0)
+        self.assertNotIn('1号楼', engine.buildings[1])
+        # 多余的 remove 和未知的维修员被忽略
+        engine.remove_order(1, '1号楼')
+        engine.add_order(99, '1号楼')
+        self.assertEqual(engine.loads[1], 0)
+
+    def test_full_workers_are_skipped(self):
+        engine = self.make_engine(max_open=1)
+        for worker_id in (1, 2):
+            engine.add_order(worker_id, '1号楼')
+        self.assertEqual(engine.best_worker('1号楼', 'water'), 3)
+        engine.add_order(3, '1号楼')
+        self.assertIsNone(engine.best_worker('1号楼', 'water'))
+
+    def test_matches_full_scan(self):
+        rng = random.Random(7)
+        fault_types = [value for value, _ in RepairOrder.FAULT_TYPE_CHOICES]
+        buildings = [f'{number}号楼' for number in range(1, 6)]
+        workers = {worker_id: set(rng.sample(fault_types, 2)) for worker_id in range(1, 31)}
+        existing = [(rng.choice(list(workers)), rng.choice(buildings)) for _ in range(40)]
+        orders = [(rng.choice(buildings), rng.choice(fault_types)) for _ in range(400)]
+
+        engine = AssignmentEngine(max_open=12)
+        for worker_id, specialties in workers.items():
+            engine.add_worker(worker_id, specialties)
+        for worker_id, building_name in existing:
+            engine.add_order(worker_id, building_name)
+        result = []
+        for building_name, fault_type in orders:
+            worker_id = engine.best_worker(building_name, fault_type)
+            if worker_id is not None:
+                engine.add_order(worker_id, building_name)
+            result.append(worker_id)
+
+        self.assertEqual(result, BenchCommand().scan(workers, existing, orders, 12))
+        self.assertIn(None, result)
+
+
+class AssignOrdersTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        group = Group.objects.create(name='维修员')
+        cls.workers = [create_user(f'worker{index}') for index in range(2)]
+        group.user_set.add(*cls.workers)
+        # 员工但不在维修员组内，不参与分配
+        cls.staff = create_user('staff', is_staff=True)
+        cls.student = student = create_user('stu')
+        dormitory = create_dormitory()
+        cls.orders = [create_order(student, dormitory) for _ in range(3)]
+
+    def setUp(self):
+        assignment._engine = None
+        self.addCleanup(setattr, assignment, '_engine', None)
+
+    @override_settings(REPAIR_WORKER_MAX_OPEN_ORDERS=1)
+    def test_stops_when_workers_are_full(self):
+        assigned, unassigned = assignment.assign_orders()
+        self.assertEqual(sorted(assigned.values()), [worker.pk for worker in self.workers])
+        self.assertEqual(len(unassigned), 1)
+        for order_id, worker_id in assigned.items():
+            order = RepairOrder.objects.get(pk=order_id)
+            self.assertEqual((order.status, order.repair_worker_id), ('processing', worker_id))
+
+    def test_assign_order(self):
+        order = self.orders[0]
+        self.assertEqual(assignment.assign_order(order.pk), self.workers[0].pk)
+        with self.assertRaises(AssignmentError):
+            assignment.assign_order(order.pk)
+        RepairOrder.objects.filter(pk=order.pk).update(status='completed')
+        with self.assertRaises(AssignmentError):
+            assignment.assign_order(order.pk, self.workers[1].pk)
+
+    def assign_worker(self, order, data):
+        return api_client(self.staff).post(
+            f'/api/repair-orders/{order.pk}/assign-worker/', json.dumps(data), content_type='application/json'
+        )
+
+    def test_assign_worker_api(self):
+        order = self.orders[0]
+        response = self.assign_worker(order, {'worker_id': self.workers[1].pk})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['order']['repair_worker_id'], self.workers[1].pk)
+
+    def test_assign_worker_api_rejects_non_workers(self):
+        order = self.orders[0]
+        for worker_id in (self.student.pk, self.staff.pk, 'abc'):
+            self.assertEqual(self.assign_worker(order, {'worker_id': worker_id}).status_code, 400, worker_id)
+        self.assertIsNone(RepairOrder.objects.get(pk=order.pk).repair_worker_id)
@@ -0,0 +1,44 @@
+from asgiref.sync import sync_to_async
+from django.test import AsyncClient, TestCase, override_settings
+
+from .base import api_client, create_dormitory, create_order, create_user, spread_created_at
+
+
+@override_settings(ROOT_URLCONF='myproject.asgi_urls')
+class AsyncReadViewTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = create_user('stu', first_name='三', last_name='张')
+        dormitories = [create_dormitory('1号楼', f'10{index}', 1) for index in range(3)]
+        orders = [create_order(cls.student, dormitories[index % 3], title=f'水管漏水{index}') for index in range(5)]
+        spread_created_at(orders)
+
+    async def assert_same_as_sync(self, path, params=None):
+        response = await AsyncClient(HTTP_HOST='localhost').get(path, params or {})
+        expected = await sync_to_async(self.sync_get)(path, params)
+        self.assertEqual(response.status_code, expected.status_code, params)
+        self.assertEqual(response.content, expected.content, params)
+        return response
+
+    @override_settings(ROOT_URLCONF='myproject.urls')
+    def sync_get(self, path, params):
+        return api_client().get(path, params or {})
+
+    async def test_order_list(self):
+        for params in (
+            {}, {'page': 2, 'page_size': 2}, {'count': 'none'}, {'search': '漏水'},
+            {'cursor': '', 'page_size': 2}, {'fields': 'id,title'},
+            {'cursor': 'bad'}, {'count': 'bad'}, {'fields': 'bad'},
+        ):
+            await self.assert_same_as_sync('/api/repair-orders/', params)
+
+    async def test_cursor_pages_follow(self):
+        response = await self.assert_same_as_sync('/api/repair-orders/', {'cursor': '', 'page_size': 2})
+        next_cursor = response.json()['next']
+        response = await self.assert_same_as_sync('/api/repair-orders/', {'cursor': next_cursor, 'page_size': 2})
+        self.assertEqual(len(response.json()['results']), 2)
+
+    async def test_dormitory_list(self):
+        for params in ({}, {'page': 2, 'page_size': 2}, {'search': '101'}):
+            await self.assert_same_as_sync('/api/dormitories/', params)
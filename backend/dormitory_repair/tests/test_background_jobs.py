@@ -0,0 +1,74 @@
+import time
+from unittest import mock
+
+from django.contrib import admin
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from simpleui import admin as simpleui_admin
+from simpleui.apps import check_background_cache
+
+from dormitory_repair.models import Dormitory
+
+from .base import create_dormitory
+
+
+def make_job(**extra):
+    return {
+        'id': 'job-1', 'action': 'touch', 'description': '批量处理', 'user': 1,
+        'status': 'running', 'total': None, 'processed': 0, 'msg': '', **extra,
+    }
+
+
+@mock.patch.object(simpleui_admin, 'connections', mock.Mock())
+@mock.patch.object(simpleui_admin, 'close_old_connections', mock.Mock())
+class BackgroundJobTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        for room in range(101, 106):
+            create_dormitory('1号楼', str(room))
+
+    def setUp(self):
+        self.model_admin = simpleui_admin.AjaxAdmin(Dormitory, admin.site)
+        self.addCleanup(caches['shared'].clear)
+
+    def test_job_state_is_stored_in_shared_cache(self):
+        simpleui_admin.save_job(make_job())
+        self.assertEqual(caches['shared'].get('simpleui:action-job:job-1')['status'], 'running')
+        self.assertIsNone(caches['default'].get('simpleui:action-job:job-1'))
+
+    def test_job_without_progress_is_failed(self):
+        simpleui_admin.save_job(make_job(processed=3))
+        with mock.patch('time.time', return_value=time.time() + 15 * 60 + 1):
+            job = simpleui_admin.get_job('job-1')
+        self.assertEqual(job['status'], 'error')
+        self.assertIn('处理3条后中断', job['msg'])
+        self.assertEqual(caches['shared'].get('simpleui:action-job:job-1')['status'], 'error')
+
+    def test_run_job_processes_all_chunks(self):
+        seen = []
+
+        def touch(modeladmin, request, queryset):
+            seen.append(sorted(queryset.values_list('pk', flat=True)))
+
+        job = make_job()
+        simpleui_admin.save_job(job)
+        self.model_admin._run_job(job, None, touch, Dormitory.objects.all(), 2)
+        self.assertEqual([len(chunk) for chunk in seen], [2, 2, 1])
+        stored = simpleui_admin.get_job('job-1')
+        self.assertEqual((stored['status'], stored['total'], stored['processed']), ('success', 5, 5))
+
+    def test_failed_job_is_not_resumed(self):
+        # 已判定中断的任务（例如排队过久）不再执行，也不覆盖失败状态
+        touch = mock.Mock()
+        job = make_job()
+        simpleui_admin.save_job(make_job(status='error', msg='已中断'))
+        with self.assertLogs(level='WARNING'):
+            self.model_admin._run_job(job, None, touch, Dormitory.objects.all(), 2)
+        touch.assert_not_called()
+        self.assertEqual(simpleui_admin.get_job('job-1')['msg'], '已中断')
+
+    def test_check_warns_about_process_local_cache(self):
+        self.assertEqual(check_background_cache(None), [])
+        with override_settings(SIMPLEUI_BACKGROUND_CACHE='default'):
+            self.assertEqual([warning.id for warning in check_background_cache(None)], ['simpleui.W001'])
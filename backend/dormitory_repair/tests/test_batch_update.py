@@ -0,0 +1,70 @@
+import json
+
+from django.contrib.auth.models import Group
+from django.test import TestCase
+
+from dormitory_repair.models import RepairOrder
+
+from .base import api_client, create_dormitory, create_order, create_user
+
+
+class BatchUpdateTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = create_user('staff', is_staff=True)
+        cls.worker = create_user('worker')
+        Group.objects.create(name='维修员').user_set.add(cls.worker)
+        cls.student = create_user('stu')
+        dormitory = create_dormitory()
+        cls.pending = create_order(cls.student, dormitory)
+        cls.completed = create_order(cls.student, dormitory, status='completed')
+
+    def post(self, user, data):
+        return api_client(user).post(
+            '/api/repair-orders/batch-update/', json.dumps(data), content_type='application/json'
+        )
+
+    def test_reports_errors_per_order(self):
+        missing_id = self.completed.pk + 100
+        response = self.post(self.staff, {
+            'ids': [self.pending.pk, self.completed.pk, missing_id], 'status': 'processing',
+        })
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual((data['updated'], data['failed']), (1, 2))
+
+        results = {item['id']: item for item in data['results']}
+        self.assertTrue(results[self.pending.pk]['success'])
+        self.assertEqual(results[self.completed.pk]['error'], '工单状态不能从已完成变更为维修中')
+        self.assertEqual(results[missing_id]['error'], '工单不存在')
+
+        self.assertEqual(RepairOrder.objects.get(pk=self.pending.pk).status, 'processing')
+        self.assertEqual(RepairOrder.objects.get(pk=self.completed.pk).status, 'completed')
+
+    def test_completing_sets_completed_at(self):
+        self.post(self.staff, {'ids': [self.pending.pk], 'status': 'completed'})
+        self.assertIsNotNone(RepairOrder.objects.get(pk=self.pending.pk).completed_at)
+
+    def test_rejects_invalid_input(self):
+        for data in ({'ids': [], 'status': 'processing'}, {'ids': [self.pending.pk], 'status': 'unknown'},
+                     {'ids': [self.pending.pk]}, {'ids': ['x'], 'status': 'processing'}):
+            self.assertEqual(self.post(self.staff, data).status_code, 400, data)
+
+    def test_assigns_workers_only(self):
+        for worker_id in (self.student.pk, self.staff.pk, 'abc'):
+            response = self.post(self.staff, {'ids': [self.pending.pk], 'worker_id': worker_id})
+            self.assertEqual(response.status_code, 400, worker_id)
+        self.assertIsNone(RepairOrder.objects.get(pk=self.pending.pk).repair_worker_id)
+
+        response = self.post(self.staff, {'ids': [self.pending.pk], 'worker_id': str(self.worker.pk)})
+        self.assertEqual(response.json()['updated'], 1)
+        self.assertEqual(RepairOrder.objects.get(pk=self.pending.pk).repair_worker_id, self.worker.pk)
+        self.post(self.staff, {'ids': [self.pending.pk], 'worker_id': None})
+        self.assertIsNone(RepairOrder.objects.get(pk=self.pending.pk).repair_worker_id)
+
+    def test_requires_staff(self):
+        data = {'ids': [self.pending.pk], 'status': 'cancelled'}
+        self.assertEqual(self.post(None, data).status_code, 401)
+        self.assertEqual(self.post(self.student, data).status_code, 403)
+        self.assertEqual(RepairOrder.objects.get(pk=self.pending.pk).status, 'pending')
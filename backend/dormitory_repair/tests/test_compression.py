@@ -0,0 +1,90 @@
+import gzip
+import zlib
+
+from asgiref.sync import async_to_sync
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from myproject.middleware import CompressionMiddleware, parse_accept_encoding
+
+
+BODY = b'{"data": [' + b'{"status": "pending", "title": "\\u6c34\\u9f99\\u5934"},' * 200 + b'{}]}'
+
+
+class CompressionMiddlewareTests(SimpleTestCase):
+
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def process(self, response, accept='gzip'):
+        request = self.factory.get('/api/repair-orders/', HTTP_ACCEPT_ENCODING=accept)
+        return CompressionMiddleware(lambda request: response)(request)
+
+    def json_response(self, content=BODY, **headers):
+        return HttpResponse(content, content_type='application/json', headers=headers)
+
+    def test_parse_accept_encoding(self):
+        self.assertEqual(
+            parse_accept_encoding('gzip;q=0.5, br, identity;q=bad, ,*;q=0'),
+            {'gzip': 0.5, 'br': 1.0, 'identity': 0.0, '*': 0.0},
+        )
+
+    def test_gzip_response(self):
+        response = self.process(self.json_response(ETag='"abc"'))
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), BODY)
+        self.assertEqual(response['Content-Length'], str(len(response.content)))
+        self.assertEqual(response['ETag'], 'W/"abc"')
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+    def test_uncompressed_responses(self):
+        cases = [
+            (self.json_response(b'{}'), 'gzip'),
+            (self.json_response(), 'identity'),
+            (self.json_response(), 'gzip;q=0'),
+            (HttpResponse(BODY, content_type='image/png'), 'gzip'),
+            (self.json_response(**{'Cache-Control': 'no-transform'}), 'gzip'),
+            (self.json_response(**{'Content-Encoding': 'br'}), 'gzip'),
+        ]
+        for response, accept in cases:
+            with self.subTest(content_type=response['Content-Type'], accept=accept):
+                content = response.content
+                processed = self.process(response, accept)
+                self.assertEqual(processed.content, content)
+                self.assertNotEqual(processed.get('Content-Encoding'), 'gzip')
+
+    @override_settings(COMPRESSION_MIN_SIZE=10)
+    def test_incompressible_content_is_sent_as_is(self):
+        content = bytes(range(256))
+        response = self.process(self.json_response(content))
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response.content, content)
+
+    def test_html_is_never_brotli(self):
+        middleware = CompressionMiddleware(lambda request: None)
+        self.assertEqual(middleware.choose_encoding('br, gzip;q=0.5', 'text/html'), 'gzip')
+
+    def test_streaming_response_is_compressed_chunk_by_chunk(self):
+        chunks = [b'id,title\n'] + [b'%d,leak\n' % index for index in range(100)]
+        response = self.process(StreamingHttpResponse(iter(chunks), content_type='text/csv'))
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertFalse(response.has_header('Content-Length'))
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        # 每块单独可解压，客户端无需等待整个响应
+        first = next(iter(response.streaming_content))
+        self.assertEqual(decompressor.decompress(first), chunks[0])
+        rest = b''.join(response.streaming_content)
+        self.assertEqual(decompressor.decompress(rest), b''.join(chunks[1:]))
+
+    def test_async_streaming_response(self):
+        async def content():
+            for index in range(50):
+                yield b'{"id": %d}\n' % index
+
+        response = self.process(StreamingHttpResponse(content(), content_type='application/x-ndjson'))
+
+        async def collect():
+            return b''.join([chunk async for chunk in response.streaming_content])
+
+        body = gzip.decompress(async_to_sync(collect)())
+        self.assertEqual(body.count(b'\n'), 50)
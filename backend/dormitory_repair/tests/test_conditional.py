@@ -0,0 +1,118 @@
+from django.test import AsyncClient, TestCase, override_settings
+
+from dormitory_repair.models import Dormitory, RepairOrder
+
+from .base import api_client, create_dormitory, create_order, create_user
+
+
+class ConditionalGetTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = create_user('stu', first_name='三', last_name='张')
+        cls.dormitory = create_dormitory()
+        cls.order = create_order(cls.student, cls.dormitory)
+
+    def setUp(self):
+        self.client = api_client(self.student)
+
+    def assert_revalidates(self, path, change):
+        response = self.client.get(path)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+
+        response = self.client.get(path, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+        # 计数器在事务提交后递增
+        with self.captureOnCommitCallbacks(execute=True):
+            change()
+        response = self.client.get(path, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_order_list(self):
+        def change():
+            self.order.status = 'processing'
+            self.order.save()
+        self.assert_revalidates('/api/repair-orders/', change)
+
+    def test_order_list_reporter_rename(self):
+        def change():
+            self.student.first_name = '四'
+            self.student.save()
+        self.assert_revalidates('/api/repair-orders/', change)
+
+    def test_order_list_skips_count(self):
+        etag = self.client.get('/api/repair-orders/')['ETag']
+        # 未变化时只读取数据版本
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/repair-orders/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def rename_dormitory(self):
+        dormitory = Dormitory.objects.get(pk=self.dormitory.pk)
+        dormitory.building_name = '2号楼'
+        dormitory.save()
+
+    def rename_student(self):
+        self.student.email = 'zhangsan@example.com'
+        self.student.save()
+
+    def complete_order(self):
+        order = RepairOrder.objects.get(pk=self.order.pk)
+        order.status = 'completed'
+        order.save()
+
+    def test_order_detail(self):
+        path = f'/api/repair-orders/{self.order.pk}/'
+        self.assert_revalidates(path, self.complete_order)
+        self.assert_revalidates(path, self.rename_dormitory)
+        self.assert_revalidates(path, self.rename_student)
+
+    def test_dormitory_list(self):
+        self.assert_revalidates('/api/dormitories/', self.rename_dormitory)
+        self.assert_revalidates('/api/dormitories/', self.complete_order)
+
+    def test_dormitory_detail(self):
+        path = f'/api/dormitories/{self.dormitory.pk}/'
+        self.assert_revalidates(path, self.complete_order)
+        self.assert_revalidates(path, self.rename_student)
+
+    def test_dormitory_validators_skip_payload(self):
+        for path in ('/api/dormitories/', f'/api/dormitories/{self.dormitory.pk}/'):
+            etag = self.client.get(path)['ETag']
+            # 宿舍详情：宿舍更新时间 + 数据版本；列表只读数据版本
+            with self.assertNumQueries(1 if path == '/api/dormitories/' else 2):
+                self.assertEqual(self.client.get(path, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_query_parameters_change_etag(self):
+        first = self.client.get('/api/repair-orders/', {'page_size': 5})['ETag']
+        second = self.client.get('/api/repair-orders/', {'page_size': 6})['ETag']
+        self.assertNotEqual(first, second)
+
+
+@override_settings(ROOT_URLCONF='myproject.asgi_urls')
+class AsyncConditionalGetTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        student = create_user('stu')
+        cls.dormitory = create_dormitory()
+        cls.order = create_order(student, cls.dormitory)
+
+    async def test_matches_sync_views(self):
+        client = AsyncClient(HTTP_HOST='localhost')
+        for path in ('/api/repair-orders/', f'/api/repair-orders/{self.order.pk}/',
+                     '/api/dormitories/', f'/api/dormitories/{self.dormitory.pk}/'):
+            response = await client.get(path)
+            self.assertEqual(response.status_code, 200)
+            with override_settings(ROOT_URLCONF='myproject.urls'):
+                self.assertEqual((await client.get(path))['ETag'], response['ETag'], path)
+            response = await client.get(path, headers={'If-None-Match': response['ETag']})
+            self.assertEqual(response.status_code, 304, path)
+
+    async def test_missing_dormitory(self):
+        response = await AsyncClient(HTTP_HOST='localhost').get('/api/dormitories/999999/')
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,75 @@
+from django.test import TestCase
+
+from dormitory_repair import counters
+from dormitory_repair.models import RepairOrder, StatisticCounter
+
+from .base import api_client, create_dormitory, create_order, create_user
+
+
+class CounterTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = create_user('stu')
+        cls.dormitory = create_dormitory()
+        create_order(cls.student, cls.dormitory)
+        create_order(cls.student, cls.dormitory, status='completed')
+        counters.reconcile()
+
+    def value(self, name):
+        return StatisticCounter.objects.get(name=name).value
+
+    def test_reconcile_writes_exact_counts(self):
+        values = counters.read()
+        self.assertEqual(values[counters.ORDERS_TOTAL], 2)
+        self.assertEqual(values[counters.order_status_key('pending')], 1)
+        self.assertEqual(values[counters.order_status_key('completed')], 1)
+        self.assertEqual(values[counters.DORMITORIES_TOTAL], 1)
+        self.assertEqual(values[counters.USERS_TOTAL], 1)
+
+    def test_signals_adjust_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            order = create_order(self.student, self.dormitory)
+            # 事务提交前不修改计数
+            self.assertEqual(self.value(counters.ORDERS_TOTAL), 2)
+        self.assertTrue(callbacks)
+        self.assertEqual(self.value(counters.ORDERS_TOTAL), 3)
+        self.assertEqual(self.value(counters.order_status_key('pending')), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            order.status = 'processing'
+            order.save()
+        self.assertEqual(self.value(counters.order_status_key('pending')), 1)
+        self.assertEqual(self.value(counters.order_status_key('processing')), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            order.delete()
+        self.assertEqual(self.value(counters.ORDERS_TOTAL), 2)
+        self.assertEqual(self.value(counters.order_status_key('processing')), 0)
+
+    def test_reconcile_fixes_drift(self):
+        # update() 绕过信号
+        RepairOrder.objects.filter(status='pending').update(status='cancelled')
+        drift = counters.reconcile()
+        self.assertEqual(drift, {
+            counters.order_status_key('pending'): (1, 0),
+            counters.order_status_key('cancelled'): (0, 1),
+        })
+        self.assertEqual(counters.reconcile(), {})
+
+    def test_read_creates_missing_rows(self):
+        StatisticCounter.objects.all().delete()
+        self.assertEqual(counters.read()[counters.ORDERS_TOTAL], 2)
+        self.assertEqual(StatisticCounter.objects.filter(name__in=counters.ALL_KEYS).count(), len(counters.ALL_KEYS))
+
+    def test_version_bumps_after_commit(self):
+        version = counters.read_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.dormitory.save()
+        self.assertEqual(counters.read_version(), version + 1)
+
+    def test_system_info(self):
+        with self.assertNumQueries(1):
+            response = api_client().get('/api/system/info/')
+        stats = response.json()['statistics']
+        self.assertEqual((stats['total_orders'], stats['pending_orders'], stats['completed_orders']), (2, 1, 1))
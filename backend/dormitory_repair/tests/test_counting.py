@@ -0,0 +1,54 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from dormitory_repair import counting
+from dormitory_repair.models import RepairOrder
+
+from .base import api_client, create_dormitory, create_order, create_user
+
+
+class CountingTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = create_user('stu')
+        cls.dormitory = create_dormitory()
+        for _ in range(3):
+            create_order(cls.student, cls.dormitory)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_parse_count_mode(self):
+        self.assertEqual(counting.parse_count_mode(None), counting.EXACT)
+        self.assertEqual(counting.parse_count_mode('', default=counting.NONE), counting.NONE)
+        self.assertEqual(counting.parse_count_mode(' Cached '), counting.CACHED)
+        with self.assertRaises(counting.InvalidCountMode):
+            counting.parse_count_mode('fast')
+
+    def test_count_modes(self):
+        queryset = RepairOrder.objects.all()
+        self.assertEqual(counting.count_rows(queryset), 3)
+        self.assertIsNone(counting.count_rows(queryset, counting.NONE))
+        # 不支持估算的数据库精确统计
+        self.assertEqual(counting.count_rows(queryset, counting.ESTIMATE), 3)
+
+    def test_cached_count(self):
+        queryset = RepairOrder.objects.filter(status='pending')
+        self.assertEqual(counting.count_rows(queryset, counting.CACHED), 3)
+        create_order(self.student, self.dormitory)
+        with self.assertNumQueries(0):
+            self.assertEqual(counting.count_rows(queryset, counting.CACHED), 3)
+        self.assertEqual(counting.count_rows(queryset, counting.EXACT), 4)
+
+    def test_paginator_requires_count(self):
+        with self.assertRaises(counting.InvalidCountMode):
+            counting.CountingPaginator(RepairOrder.objects.all(), 10, count_mode=counting.NONE)
+
+    def test_list_count_parameter(self):
+        client = api_client(self.student)
+        self.assertEqual(client.get('/api/repair-orders/', {'count': 'exact'}).json()['count'], 3)
+        response = client.get('/api/repair-orders/', {'count': 'none', 'page_size': 2})
+        self.assertIsNone(response.json()['count'])
+        self.assertEqual(response.json()['next'], 2)
+        self.assertEqual(client.get('/api/repair-orders/', {'count': 'fast'}).status_code, 400)
@@ -0,0 +1,83 @@
+import time
+from unittest import mock
+
+from django.contrib.sessions.models import Session
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from dormitory_repair.models import RepairOrder
+from myproject import db_routers
+
+
+@override_settings(DATABASE_REPLICAS=['replica1', 'replica2'])
+class ReplicaRouterTests(SimpleTestCase):
+
+    def setUp(self):
+        self.router = db_routers.ReplicaRouter()
+        self.factory = RequestFactory()
+        # SimpleTestCase 不开启事务，这里固定主库连接不在事务中
+        patcher = mock.patch.object(db_routers, 'connections', {'default': mock.Mock(in_atomic_block=False)})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def run_request(self, request, view):
+        middleware = db_routers.read_your_writes_middleware(lambda request: view(request) or HttpResponse())
+        return middleware(request)
+
+    def test_reads_stick_to_one_replica_per_request(self):
+        seen = []
+
+        def view(request):
+            seen.extend(self.router.db_for_read(RepairOrder) for _ in range(5))
+
+        self.run_request(self.factory.get('/api/repair-orders/'), view)
+        self.assertEqual(len(set(seen)), 1)
+        self.assertIn(seen[0], ['replica1', 'replica2'])
+
+    def test_write_pins_later_reads_with_cookie(self):
+        def view(request):
+            self.assertEqual(self.router.db_for_write(RepairOrder), 'default')
+
+        response = self.run_request(self.factory.get('/api/repair-orders/'), view)
+        cookie = response.cookies[db_routers.PIN_COOKIE]
+        self.assertGreater(float(cookie.value), time.time())
+
+        request = self.factory.get('/api/repair-orders/')
+        request.COOKIES[db_routers.PIN_COOKIE] = cookie.value
+        self.run_request(request, lambda request: self.assertEqual(self.router.db_for_read(RepairOrder), 'default'))
+
+    def test_reads_without_writes_set_no_cookie(self):
+        response = self.run_request(self.factory.get('/api/repair-orders/'), lambda request: None)
+        self.assertNotIn(db_routers.PIN_COOKIE, response.cookies)
+
+    def test_expired_or_bad_cookie_reads_replica(self):
+        for value in (str(time.time() - 1), 'garbage'):
+            request = self.factory.get('/api/repair-orders/')
+            request.COOKIES[db_routers.PIN_COOKIE] = value
+            self.run_request(request, lambda request: self.assertNotEqual(
+                self.router.db_for_read(RepairOrder), 'default'))
+
+    def test_unsafe_methods_read_primary(self):
+        response = self.run_request(
+            self.factory.post('/api/repair-orders/'),
+            lambda request: self.assertEqual(self.router.db_for_read(RepairOrder), 'default'),
+        )
+        self.assertIn(db_routers.PIN_COOKIE, response.cookies)
+
+    def test_primary_reads(self):
+        self.assertEqual(self.router.db_for_read(Session), 'default')
+        with db_routers.use_primary():
+            self.assertEqual(self.router.db_for_read(RepairOrder), 'default')
+        self.assertNotEqual(self.router.db_for_read(RepairOrder), 'default')
+        db_routers.connections['default'].in_atomic_block = True
+        self.assertEqual(self.router.db_for_read(RepairOrder), 'default')
+
+    def test_replicas_are_not_migrated(self):
+        self.assertIs(self.router.allow_migrate('replica1', 'dormitory_repair'), False)
+        self.assertIsNone(self.router.allow_migrate('default', 'dormitory_repair'))
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_no_replicas(self):
+        self.assertEqual(self.router.db_for_read(RepairOrder), 'default')
+        response = self.run_request(self.factory.post('/api/repair-orders/'), lambda request: None)
+        self.assertNotIn(db_routers.PIN_COOKIE, response.cookies)
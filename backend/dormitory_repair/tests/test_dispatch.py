@@ -0,0 +1,101 @@
+import json
+
+from django.contrib.auth.models import Group
+from django.db import connection
+from django.test import TestCase, skipUnlessDBFeature
+from django.test.utils import CaptureQueriesContext
+
+from dormitory_repair.dispatch import claim_next_order
+from dormitory_repair.models import RepairOrder
+
+from .base import api_client, create_dormitory, create_order, create_user, spread_created_at
+
+
+class ClaimNextOrderTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = create_user('stu')
+        cls.worker = create_user('worker', is_staff=True)
+        cls.other_worker = create_user('worker2', is_staff=True)
+        cls.dormitory = create_dormitory()
+        cls.north = create_dormitory('2号楼', '201', 2)
+        cls.oldest = create_order(cls.student, cls.dormitory, priority='medium')
+        cls.newer = create_order(cls.student, cls.dormitory, priority='medium')
+        cls.urgent = create_order(cls.student, cls.north, priority='urgent', fault_type='network')
+        spread_created_at([cls.urgent, cls.newer, cls.oldest])
+
+    def test_claims_by_priority_then_age(self):
+        claimed = [claim_next_order(self.worker) for _ in range(4)]
+        self.assertEqual(claimed, [self.urgent.pk, self.oldest.pk, self.newer.pk, None])
+        order = RepairOrder.objects.get(pk=self.urgent.pk)
+        self.assertEqual((order.status, order.repair_worker_id), ('processing', self.worker.pk))
+
+    def test_workers_never_share_an_order(self):
+        first = claim_next_order(self.worker)
+        second = claim_next_order(self.other_worker)
+        self.assertNotEqual(first, second)
+        self.assertEqual(RepairOrder.objects.get(pk=second).repair_worker_id, self.other_worker.pk)
+
+    def test_skips_assigned_orders(self):
+        RepairOrder.objects.filter(pk=self.urgent.pk).update(repair_worker=self.other_worker)
+        self.assertEqual(claim_next_order(self.worker), self.oldest.pk)
+
+    def test_filters_by_fault_type_and_building(self):
+        self.assertEqual(claim_next_order(self.worker, fault_types=['water']), self.oldest.pk)
+        self.assertEqual(claim_next_order(self.worker, buildings=['2号楼']), self.urgent.pk)
+        self.assertIsNone(claim_next_order(self.worker, buildings=['不存在的楼']))
+
+    @skipUnlessDBFeature('has_select_for_update_skip_locked')
+    def test_uses_skip_locked(self):
+        with CaptureQueriesContext(connection) as queries:
+            claim_next_order(self.worker)
+        self.assertTrue(any('SKIP LOCKED' in query['sql'] for query in queries))
+
+
+class ClaimNextApiTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        group = Group.objects.create(name='维修员')
+        cls.worker = create_user('worker')
+        cls.worker.groups.add(group)
+        cls.staff = create_user('staff', is_staff=True)
+        cls.student = create_user('stu')
+        cls.order = create_order(cls.student, create_dormitory())
+
+    def post(self, user, data=None):
+        return api_client(user).post(
+            '/api/repair-orders/claim-next/', json.dumps(data or {}), content_type='application/json'
+        )
+
+    def test_worker_claims(self):
+        response = self.post(self.worker)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['order']['id'], self.order.pk)
+        response = self.post(self.worker)
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.json()['order'])
+
+    def test_only_workers_may_claim(self):
+        self.assertEqual(self.post(None).status_code, 401)
+        self.assertEqual(self.post(self.student).status_code, 403)
+        # 不在维修员组内的管理员也不能为自己领取
+        self.assertEqual(self.post(self.staff).status_code, 403)
+        self.assertIsNone(RepairOrder.objects.get(pk=self.order.pk).repair_worker_id)
+
+    def test_staff_claims_for_worker(self):
+        response = self.post(self.staff, {'worker_id': str(self.worker.pk)})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(RepairOrder.objects.get(pk=self.order.pk).repair_worker_id, self.worker.pk)
+
+    def test_worker_id_checks(self):
+        self.assertEqual(self.post(self.staff, {'worker_id': 'abc'}).status_code, 400)
+        self.assertEqual(self.post(self.staff, {'worker_id': self.student.pk}).status_code, 404)
+        self.assertEqual(self.post(self.worker, {'worker_id': self.staff.pk}).status_code, 403)
+
+    def test_rejects_invalid_body(self):
+        self.assertEqual(self.post(self.worker, {'fault_types': 'water'}).status_code, 400)
+        self.assertEqual(self.post(self.worker, {'fault_types': ['fire']}).status_code, 400)
+        response = api_client(self.worker).post('/api/repair-orders/claim-next/', '[]', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
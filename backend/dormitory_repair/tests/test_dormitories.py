@@ -0,0 +1,48 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from .base import api_client, create_dormitory, create_order, create_user
+
+
+class DormitoryRepairCountTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = create_user('stu')
+        cls.dormitories = [create_dormitory('1号楼', f'{room}') for room in range(101, 111)]
+        first, second = cls.dormitories[:2]
+        create_order(cls.student, first)
+        create_order(cls.student, first, status='processing')
+        create_order(cls.student, first, status='completed')
+        create_order(cls.student, second, status='cancelled')
+
+    def get(self, url, params=None):
+        response = api_client(self.student).get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_list_counts_per_status(self):
+        results = self.get('/api/dormitories/', {'page_size': 3})['results']
+        self.assertEqual([row['repair_count'] for row in results], [3, 1, 0])
+        self.assertEqual(results[0]['repair_status_counts'], {
+            'pending': 1, 'processing': 1, 'completed': 1, 'cancelled': 0,
+        })
+        self.assertEqual(results[1]['repair_status_counts']['cancelled'], 1)
+
+    def test_query_count_does_not_depend_on_page_size(self):
+        client = api_client(self.student)
+        # 第一次请求会创建数据版本计数器，不计入
+        client.get('/api/dormitories/')
+        counts = []
+        for page_size in (2, 10):
+            with CaptureQueriesContext(connection) as queries:
+                response = client.get('/api/dormitories/', {'page_size': page_size})
+            self.assertEqual(len(response.json()['results']), page_size)
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
+
+    def test_detail_counts(self):
+        data = self.get(f'/api/dormitories/{self.dormitories[0].id}/')
+        self.assertEqual(data['repair_count'], 3)
+        self.assertEqual(data['repair_status_counts']['processing'], 1)
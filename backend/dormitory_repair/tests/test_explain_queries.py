@@ -0,0 +1,27 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from dormitory_repair.management.commands.explain_queries import endpoint_queries, find_full_scans
+from dormitory_repair.models import Dormitory
+
+from .base import create_dormitory, create_order, create_user
+
+
+class ExplainQueriesTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        create_order(create_user('stu'), create_dormitory())
+
+    def test_endpoint_queries_use_indexes(self):
+        out = StringIO()
+        call_command('explain_queries', '--fail-on-full-scan', stdout=out)
+        self.assertIn('所有接口查询均未出现全表扫描', out.getvalue())
+        self.assertIn('== 工单列表', out.getvalue())
+        self.assertTrue(endpoint_queries())
+
+    def test_detects_full_scan(self):
+        _, tables = find_full_scans(Dormitory.objects.order_by().filter(floor=1))
+        self.assertEqual(tables, ['dormitory_repair_dormitory'])
@@ -0,0 +1,60 @@
+import csv
+import io
+import json
+
+from django.test import TestCase
+
+from dormitory_repair.export import iter_export_chunks
+from dormitory_repair.models import RepairOrder
+
+from .base import api_client, create_dormitory, create_order, create_user, spread_created_at
+
+
+class ExportTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = create_user('admin', is_staff=True)
+        student = create_user('stu', first_name='三', last_name='张')
+        dormitory = create_dormitory('2号楼', '305')
+        orders = [
+            create_order(student, dormitory, title=f'工单{index}', order_number=f'T{index:05d}',
+                         status='completed' if index % 2 else 'pending')
+            for index in range(5)
+        ]
+        orders.reverse()
+        spread_created_at(orders)
+        # 从新到旧
+        cls.order_ids = [order.id for order in orders]
+
+    def export(self, **params):
+        response = api_client(self.staff).get('/api/repair-orders/export/', params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode()
+
+    def test_chunks_walk_all_orders_newest_first(self):
+        chunks = list(iter_export_chunks(RepairOrder.objects.all(), fields=('id',), chunk_size=2))
+        self.assertEqual([len(chunk) for chunk in chunks], [2, 2, 1])
+        self.assertEqual([record['id'] for chunk in chunks for record in chunk], self.order_ids)
+
+    def test_csv(self):
+        content = self.export()
+        self.assertTrue(content.startswith('\ufeff'))
+        rows = list(csv.DictReader(io.StringIO(content[1:])))
+        self.assertEqual([int(row['id']) for row in rows], self.order_ids)
+        self.assertEqual(rows[0]['dormitory_name'], '2号楼-305')
+        self.assertEqual(rows[0]['student_name'], '三 张')
+        self.assertEqual(rows[0]['completed_at'], '')
+
+    def test_ndjson_with_filter_and_fields(self):
+        content = self.export(format='ndjson', status='completed', fields='id,status')
+        records = [json.loads(line) for line in content.splitlines()]
+        # 奇数序号的工单已完成
+        self.assertEqual(records, [{'id': order_id, 'status': 'completed'} for order_id in self.order_ids[1::2]])
+
+    def test_invalid_parameters(self):
+        client = api_client(self.staff)
+        for params in ({'format': 'xlsx'}, {'fields': 'id,password'}, {'fields': 'student'}):
+            with self.subTest(params=params):
+                self.assertEqual(client.get('/api/repair-orders/export/', params).status_code, 400)
@@ -0,0 +1,61 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from dormitory_repair.fieldsets import (
+    ORDER_LIST_FIELDS, InvalidFields, lookups_for, parse_fields,
+)
+
+from .base import api_client, create_dormitory, create_order, create_user
+
+
+class ParseFieldsTests(TestCase):
+
+    def test_default_and_duplicates(self):
+        self.assertEqual(parse_fields(None, ORDER_LIST_FIELDS), ORDER_LIST_FIELDS)
+        self.assertEqual(parse_fields(' ', ORDER_LIST_FIELDS), ORDER_LIST_FIELDS)
+        self.assertEqual(parse_fields('title, id,title,', ORDER_LIST_FIELDS), ('title', 'id'))
+
+    def test_unknown_field(self):
+        with self.assertRaisesMessage(InvalidFields, 'password'):
+            parse_fields('id,password', ORDER_LIST_FIELDS)
+
+    def test_lookups_only_cover_requested_fields(self):
+        self.assertEqual(
+            lookups_for(('title', 'dormitory_name'), extra=('id',)),
+            ('id', 'title', 'dormitory__building_name', 'dormitory__room_number'),
+        )
+
+
+class FieldsApiTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = create_user('stu', email='stu@example.com')
+        cls.order = create_order(cls.student, create_dormitory('3号楼', '201'), description='很长的描述')
+
+    def test_list_returns_only_requested_fields(self):
+        response = api_client(self.student).get('/api/repair-orders/', {'fields': 'id,title,dormitory_name'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'], [
+            {'id': self.order.id, 'title': '水龙头漏水', 'dormitory_name': '3号楼-201'},
+        ])
+
+    def test_list_query_skips_unrequested_columns(self):
+        client = api_client(self.student)
+        with CaptureQueriesContext(connection) as queries:
+            client.get('/api/repair-orders/', {'fields': 'id,title', 'count': 'none'})
+        selects = [query['sql'] for query in queries if 'dormitory_repair_repairorder' in query['sql']]
+        self.assertTrue(any('"title"' in sql for sql in selects))
+        self.assertFalse(any('"description"' in sql for sql in selects))
+
+    def test_detail_fields(self):
+        response = api_client(self.student).get(f'/api/repair-orders/{self.order.id}/', {'fields': 'id,student'})
+        self.assertEqual(response.json(), {'id': self.order.id, 'student': {
+            'id': self.student.id, 'name': 'stu', 'username': 'stu', 'email': 'stu@example.com',
+        }})
+
+    def test_unknown_field_returns_400(self):
+        client = api_client(self.student)
+        self.assertEqual(client.get('/api/repair-orders/', {'fields': 'nope'}).status_code, 400)
+        self.assertEqual(client.get(f'/api/repair-orders/{self.order.id}/', {'fields': 'nope'}).status_code, 400)
@@ -0,0 +1,95 @@
+import datetime
+from unittest import mock
+
+from django.test import TestCase
+
+from dormitory_repair.models import OrderNumberSequence
+from dormitory_repair.order_numbers import BlockSequenceAllocator, TimestampNodeAllocator
+
+from .base import create_dormitory, create_order, create_user
+
+
+class BlockSequenceAllocatorTests(TestCase):
+
+    def test_numbers_within_block_use_no_queries(self):
+        allocator = BlockSequenceAllocator(block_size=5)
+        first = allocator()
+        with self.assertNumQueries(0):
+            rest = [allocator() for _ in range(4)]
+        numbers = [first, *rest]
+        self.assertEqual(len(set(numbers)), 5)
+        self.assertEqual([int(number[9:]) for number in numbers], [1, 2, 3, 4, 5])
+        day = numbers[0][1:9]
+        self.assertEqual(OrderNumberSequence.objects.get(day=day).next_value, 6)
+
+    def test_allocators_get_disjoint_blocks(self):
+        # 两个分配器相当于两个进程，各自领取的号段不重叠
+        first, second = BlockSequenceAllocator(block_size=3), BlockSequenceAllocator(block_size=3)
+        numbers = [first(), second(), first(), second(), first(), second(), first()]
+        self.assertEqual(len(set(numbers)), len(numbers))
+        self.assertEqual(sorted(int(number[9:]) for number in numbers), [1, 2, 3, 4, 5, 6, 7])
+
+    def test_new_day_starts_new_sequence(self):
+        allocator = BlockSequenceAllocator(block_size=10)
+        with mock.patch('django.utils.timezone.localdate', return_value=datetime.date(2026, 10, 17)):
+            self.assertEqual(allocator(), 'R202610170000001')
+            self.assertEqual(allocator(), 'R202610170000002')
+        with mock.patch('django.utils.timezone.localdate', return_value=datetime.date(2026, 10, 18)):
+            self.assertEqual(allocator(), 'R202610180000001')
+
+    def test_reserve_runs_without_process_lock(self):
+        allocator = BlockSequenceAllocator(block_size=2)
+        reserve = allocator._reserve
+        held = []
+
+        def spy(day, size):
+            held.append(allocator._lock.locked())
+            return reserve(day, size)
+
+        with mock.patch.object(allocator, '_reserve', side_effect=spy):
+            for _ in range(5):
+                allocator()
+        self.assertEqual(held, [False, False, False])
+
+    def test_spare_block_is_used_before_reserving_again(self):
+        # 并发的线程各领了一段时，多出的号段留给后续调用
+        allocator = BlockSequenceAllocator(block_size=2)
+        today = datetime.date(2026, 10, 18)
+        day = today.strftime('%Y%m%d')
+        with mock.patch('django.utils.timezone.localdate', return_value=today):
+            allocator._blocks.extend([[day, 1, 3], [day, 3, 5]])
+            with self.assertNumQueries(0):
+                numbers = [allocator() for _ in range(4)]
+        self.assertEqual([int(number[9:]) for number in numbers], [1, 2, 3, 4])
+
+    def test_orders_get_unique_numbers(self):
+        student = create_user('stu')
+        dormitory = create_dormitory()
+        orders = [create_order(student, dormitory) for _ in range(3)]
+        self.assertEqual(len({order.order_number for order in orders}), 3)
+
+
+class TimestampNodeAllocatorTests(TestCase):
+
+    def test_format_and_uniqueness(self):
+        allocator = TimestampNodeAllocator(node=7)
+        with mock.patch('time.time', return_value=1_790_000_000.5):
+            numbers = [allocator() for _ in range(3)]
+        self.assertEqual(len(set(numbers)), 3)
+        for sequence, number in enumerate(numbers):
+            self.assertEqual(len(number), 18)
+            self.assertEqual(number[13:15], '07')
+            self.assertEqual(int(number[15:]), sequence)
+
+    def test_clock_going_back_keeps_counting(self):
+        allocator = TimestampNodeAllocator(node=1)
+        with mock.patch('time.time', return_value=1_790_000_010):
+            first = allocator()
+        with mock.patch('time.time', return_value=1_790_000_000):
+            second = allocator()
+        self.assertEqual(first[:15], second[:15])
+        self.assertEqual(int(second[15:]), 1)
+
+    def test_node_must_be_two_digits(self):
+        with self.assertRaises(ValueError):
+            TimestampNodeAllocator(node=100)
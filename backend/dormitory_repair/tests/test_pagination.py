@@ -0,0 +1,61 @@
+from datetime import datetime
+
+from django.test import TestCase
+
+from dormitory_repair.pagination import InvalidCursor, PREVIOUS, decode_cursor, encode_cursor
+
+from .base import api_client, create_dormitory, create_order, create_user, spread_created_at
+
+
+class CursorTests(TestCase):
+
+    def test_encode_decode_round_trip(self):
+        created_at = datetime(2024, 5, 1, 8, 30, 15, 123456)
+        cursor = encode_cursor(created_at, 42, PREVIOUS)
+        self.assertEqual(decode_cursor(cursor), (created_at, 42, PREVIOUS))
+
+    def test_invalid_cursor(self):
+        for cursor in ('not-a-cursor', encode_cursor(datetime(2024, 5, 1), 1, 'x')):
+            with self.assertRaises(InvalidCursor):
+                decode_cursor(cursor)
+
+
+class CursorPagingApiTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = create_user('stu')
+        dormitory = create_dormitory()
+        orders = [create_order(cls.student, dormitory, title=f'工单{index}', order_number=f'T{index:05d}') for index in range(5)]
+        orders.reverse()
+        spread_created_at(orders)
+        # 从新到旧
+        cls.order_ids = [order.id for order in orders]
+
+    def get_page(self, cursor):
+        response = api_client(self.student).get('/api/repair-orders/', {
+            'cursor': cursor, 'page_size': 2,
+        })
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_walks_forward_and_back(self):
+        first = self.get_page('')
+        self.assertIsNone(first['count'])
+        self.assertIsNone(first['previous'])
+        self.assertEqual([row['id'] for row in first['results']], self.order_ids[:2])
+
+        second = self.get_page(first['next'])
+        self.assertEqual([row['id'] for row in second['results']], self.order_ids[2:4])
+
+        last = self.get_page(second['next'])
+        self.assertEqual([row['id'] for row in last['results']], self.order_ids[4:])
+        self.assertIsNone(last['next'])
+
+        back = self.get_page(last['previous'])
+        self.assertEqual([row['id'] for row in back['results']], self.order_ids[2:4])
+        self.assertIsNotNone(back['previous'])
+
+    def test_invalid_cursor_returns_400(self):
+        response = api_client(self.student).get('/api/repair-orders/', {'cursor': '!!!'})
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,101 @@
+import threading
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from myproject.db.mysql_pool.pool import ConnectionPool, PoolTimeout
+
+
+class FakeConnection:
+
+    def __init__(self):
+        self.alive = True
+        self.closed = False
+
+    def ping(self):
+        if not self.alive:
+            raise OSError('gone away')
+
+
+class ConnectionPoolTests(SimpleTestCase):
+
+    def make_pool(self, **options):
+        options.setdefault('health_check_idle', None)
+        return ConnectionPool(
+            connect=FakeConnection,
+            ping=lambda conn: conn.ping(),
+            close=lambda conn: setattr(conn, 'closed', True),
+            **options,
+        )
+
+    def test_released_connection_is_reused(self):
+        pool = self.make_pool()
+        conn = pool.acquire()
+        pool.release(conn)
+        self.assertIs(pool.acquire(), conn)
+        stats = pool.stats()
+        self.assertEqual((stats['opened'], stats['reused'], stats['in_use']), (1, 1, 1))
+
+    def test_full_pool_times_out_with_holders(self):
+        pool = self.make_pool(max_size=1, timeout=0.01)
+        pool.acquire()
+        with self.assertRaisesMessage(PoolTimeout, threading.current_thread().name):
+            pool.acquire()
+        self.assertEqual(pool.stats()['timeouts'], 1)
+
+    def test_waiter_gets_released_connection(self):
+        pool = self.make_pool(max_size=1, timeout=5)
+        conn = pool.acquire()
+        timer = threading.Timer(0.05, pool.release, [conn])
+        timer.start()
+        self.addCleanup(timer.cancel)
+        self.assertIs(pool.acquire(), conn)
+
+    def test_dead_connection_is_replaced(self):
+        pool = self.make_pool(health_check_idle=0)
+        conn = pool.acquire()
+        pool.release(conn)
+        conn.alive = False
+        replacement = pool.acquire()
+        self.assertIsNot(replacement, conn)
+        self.assertTrue(conn.closed)
+        self.assertEqual(pool.stats()['health_check_failures'], 1)
+
+    def test_old_connections_are_recycled(self):
+        pool = self.make_pool(max_lifetime=60)
+        conn = pool.acquire()
+        pool.release(conn)
+        with mock.patch('time.monotonic', return_value=10 ** 9):
+            self.assertIsNot(pool.acquire(), conn)
+        self.assertTrue(conn.closed)
+        self.assertEqual(pool.stats()['recycled'], 1)
+
+    def test_discarded_and_foreign_connections_are_closed(self):
+        pool = self.make_pool()
+        conn = pool.acquire()
+        pool.release(conn, discard=True)
+        foreign = FakeConnection()
+        pool.release(foreign)
+        self.assertTrue(conn.closed and foreign.closed)
+        self.assertEqual(pool.stats()['size'], 0)
+
+    def test_connection_of_finished_thread_is_reclaimed(self):
+        pool = self.make_pool(max_size=1, timeout=0.01)
+        leaked = []
+        thread = threading.Thread(target=lambda: leaked.append(pool.acquire()))
+        thread.start()
+        thread.join()
+        self.assertIsNot(pool.acquire(), leaked[0])
+        self.assertTrue(leaked[0].closed)
+        self.assertEqual(pool.stats()['reclaimed'], 1)
+
+    def test_long_checkout_gives_up_its_slot(self):
+        pool = self.make_pool(max_size=1, timeout=0.01, max_checkout=0)
+        held = pool.acquire()
+        other = pool.acquire()
+        self.assertIsNot(other, held)
+        self.assertFalse(held.closed)
+        # 原持有者归还时连接已不属于本池，直接关闭
+        pool.release(held)
+        self.assertTrue(held.closed)
+        self.assertEqual(pool.stats()['size'], 1)
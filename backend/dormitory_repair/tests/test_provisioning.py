@@ -0,0 +1,124 @@
+import json
+
+from django.test import SimpleTestCase, TestCase
+
+from dormitory_repair.models import Dormitory
+from dormitory_repair.provisioning import (
+    PROVISION_LIMIT, ProvisioningError, expand_room_spec, parse_dormitory_csv, parse_range,
+    provision_dormitories,
+)
+
+from .base import api_client, create_dormitory, create_user
+
+
+class ParseTests(SimpleTestCase):
+
+    def test_parse_range(self):
+        self.assertEqual(parse_range('1,3, 5-7'), [1, 3, 5, 6, 7])
+        for spec in ('', '3-1', 'a-b'):
+            with self.assertRaises(ProvisioningError):
+                parse_range(spec)
+
+    def test_limit_checked_before_expanding(self):
+        # 按起止值计算总数，不会先生成一亿个元素
+        with self.assertRaisesMessage(ProvisioningError, f'单次最多开通{PROVISION_LIMIT}间宿舍'):
+            parse_range('1-100000000')
+        with self.assertRaises(ProvisioningError):
+            parse_range('1-10,1-100000000')
+
+    def test_expand_room_spec(self):
+        rows = expand_room_spec(' 1号楼 ', '1-2', '1-3')
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(rows[0], {'building_name': '1号楼', 'room_number': '101', 'floor': 1})
+        self.assertEqual(rows[-1]['room_number'], '203')
+
+    def test_expand_room_spec_limits(self):
+        with self.assertRaises(ProvisioningError):
+            expand_room_spec('1号楼', '1-200', '1-200')
+        with self.assertRaises(ProvisioningError):
+            expand_room_spec('1号楼', '1', '1', room_format='{unknown}')
+        with self.assertRaises(ProvisioningError):
+            expand_room_spec(['1号楼'], '1', '1')
+
+    def test_room_format_is_restricted(self):
+        rows = expand_room_spec('1号楼', '3', '7', room_format='{floor}-{room:03d}')
+        self.assertEqual(rows[0]['room_number'], '3-007')
+        for room_format in ('{room:0100000d}', '{floor.real.x}', '{floor[0]}', '{room!r}', '{0}', '{room:>5}',
+                            '{room', '固定房间'):
+            with self.assertRaises(ProvisioningError, msg=room_format):
+                expand_room_spec('1号楼', '1', '1', room_format=room_format)
+
+    def test_room_number_length_checked_while_expanding(self):
+        with self.assertRaisesMessage(ProvisioningError, '房间号过长'):
+            expand_room_spec('1号楼', '1', '1', room_format='{floor:09d}{room:09d}{room:09d}')
+
+    def test_parse_csv(self):
+        rows = parse_dormitory_csv('\ufeffbuilding_name,room_number,floor\n1号楼,101,1\n')
+        self.assertEqual(rows, [{'building_name': '1号楼', 'room_number': '101', 'floor': '1'}])
+        with self.assertRaisesMessage(ProvisioningError, 'CSV 缺少列: floor'):
+            parse_dormitory_csv('building_name,room_number\n1号楼,101\n')
+
+
+class ProvisionDormitoriesTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        create_dormitory('1号楼', '101', 1)
+
+    def test_skips_existing_duplicates_and_bad_rows(self):
+        result = provision_dormitories([
+            {'building_name': '1号楼', 'room_number': '101', 'floor': 1},
+            {'building_name': '1号楼', 'room_number': '102', 'floor': 1},
+            {'building_name': '1号楼', 'room_number': '102', 'floor': 1},
+            {'building_name': '1号楼', 'room_number': '103', 'floor': 'x'},
+            {'building_name': ['1号楼'], 'room_number': '104', 'floor': 1},
+            'not a row',
+        ])
+        self.assertEqual(result['created'], 1)
+        self.assertEqual(sorted(item['reason'] for item in result['skipped']), ['已存在', '重复'])
+        self.assertEqual([item['row'] for item in result['errors']], [4, 5, 6])
+        self.assertTrue(Dormitory.objects.filter(building_name='1号楼', room_number='102').exists())
+
+    def test_dry_run_writes_nothing(self):
+        result = provision_dormitories([{'building_name': '2号楼', 'room_number': '201', 'floor': 2}], dry_run=True)
+        self.assertEqual(result['created'], 1)
+        self.assertFalse(Dormitory.objects.filter(building_name='2号楼').exists())
+
+    def test_rejects_non_list(self):
+        with self.assertRaises(ProvisioningError):
+            provision_dormitories({'building_name': '2号楼'})
+
+
+class BulkApiTests(TestCase):
+
+    def setUp(self):
+        self.client = api_client(create_user('staff', is_staff=True))
+        self.student = create_user('stu')
+
+    def post(self, data):
+        return self.client.post('/api/dormitories/bulk/', json.dumps(data), content_type='application/json')
+
+    def test_range_spec(self):
+        response = self.post({'building_name': '3号楼', 'floors': '1-2', 'rooms': '1-5'})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['created'], 10)
+        self.assertEqual(Dormitory.objects.filter(building_name='3号楼').count(), 10)
+
+    def test_rejects_oversized_and_malformed_input(self):
+        for data in (
+            {'building_name': '3号楼', 'floors': '1-100000000', 'rooms': '1'},
+            {'csv': ['building_name']},
+            {'dormitories': 'x'},
+            {'building_name': '3号楼', 'floors': '1', 'rooms': '1', 'room_format': '{floor.real.x}'},
+            {'building_name': '3号楼', 'floors': '1-20', 'rooms': '1-40', 'room_format': '{room:0100000d}'},
+            [],
+        ):
+            self.assertEqual(self.post(data).status_code, 400, data)
+        self.assertFalse(Dormitory.objects.exists())
+
+    def test_requires_staff(self):
+        data = json.dumps({'building_name': '3号楼', 'floors': '1', 'rooms': '1'})
+        for client, status in ((api_client(), 401), (api_client(self.student), 403)):
+            response = client.post('/api/dormitories/bulk/', data, content_type='application/json')
+            self.assertEqual(response.status_code, status)
+        self.assertFalse(Dormitory.objects.exists())
@@ -0,0 +1,54 @@
+import datetime
+import decimal
+import json
+import unittest
+import uuid
+
+from django.test import SimpleTestCase
+from django.utils.translation import gettext_lazy
+
+from dormitory_repair import responses
+from dormitory_repair.responses import ApiResponse, stdlib_dumps
+
+
+SAMPLE = {
+    'title': '水龙头漏水',
+    'created_at': datetime.datetime(2026, 10, 18, 8, 30, 15, 123456, tzinfo=datetime.timezone.utc),
+    'day': datetime.date(2026, 10, 18),
+    'id': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+    'cost': decimal.Decimal('12.50'),
+    'label': gettext_lazy('状态'),
+    'tags': ('a', 'b'),
+    'count': None,
+}
+
+
+class ApiResponseTests(SimpleTestCase):
+
+    def test_stdlib_encoding(self):
+        data = json.loads(stdlib_dumps(SAMPLE))
+        self.assertEqual(data['created_at'], '2026-10-18T08:30:15.123456+00:00')
+        self.assertEqual(data['day'], '2026-10-18')
+        self.assertEqual(data['id'], '12345678-1234-5678-1234-567812345678')
+        self.assertEqual(data['cost'], '12.50')
+        self.assertEqual(data['label'], '状态')
+        self.assertEqual(data['tags'], ['a', 'b'])
+        # 非 ASCII 字符不转义
+        self.assertIn('水龙头漏水'.encode(), stdlib_dumps(SAMPLE))
+
+    def test_unsupported_type(self):
+        with self.assertRaises(TypeError):
+            stdlib_dumps({'value': object()})
+
+    @unittest.skipUnless(responses.orjson, 'orjson 未安装')
+    def test_orjson_matches_stdlib(self):
+        self.assertEqual(json.loads(responses.dumps(SAMPLE)), json.loads(stdlib_dumps(SAMPLE)))
+
+    def test_response(self):
+        response = ApiResponse({'status': 'ok'}, status=201)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertEqual(json.loads(response.content), {'status': 'ok'})
+        self.assertEqual(json.loads(ApiResponse([1, 2], safe=False).content), [1, 2])
+        with self.assertRaises(TypeError):
+            ApiResponse([1, 2])
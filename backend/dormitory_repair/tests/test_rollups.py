@@ -0,0 +1,65 @@
+from unittest import mock
+
+from django.db.models import QuerySet
+from django.test import TestCase
+from django.utils import timezone
+
+from dormitory_repair import rollups
+from dormitory_repair.models import RepairDailyStat, RepairOrder
+
+from .base import api_client, create_dormitory, create_order, create_user
+
+
+class RollupTests(TestCase):
+
+    def setUp(self):
+        self.student = create_user('stu')
+        self.north = create_dormitory('1号楼', '101')
+        self.south = create_dormitory('2号楼', '201')
+        self.today = timezone.localdate()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.order = create_order(self.student, self.north)
+            create_order(self.student, self.north, fault_type='network')
+            create_order(self.student, self.south, status='completed')
+
+    def counts(self, group_by):
+        return dict(rollups.group_counts(rollups.stats_queryset(self.today, self.today), group_by))
+
+    def test_signals_maintain_rollups(self):
+        self.assertEqual(self.counts('building_name'), {'1号楼': 2, '2号楼': 1})
+        with self.captureOnCommitCallbacks(execute=True):
+            self.order.status = 'completed'
+            self.order.save()
+        self.assertEqual(self.counts('status'), {'pending': 1, 'completed': 2})
+        with self.captureOnCommitCallbacks(execute=True):
+            self.order.delete()
+        self.assertEqual(self.counts('status'), {'pending': 1, 'completed': 1})
+
+    def test_rebuild_fixes_drift(self):
+        # update() 绕过信号
+        RepairOrder.objects.filter(fault_type='network').update(status='cancelled')
+        self.assertEqual(rollups.rebuild(self.today, self.today), {})
+        self.assertEqual(self.counts('status'), {'pending': 1, 'cancelled': 1, 'completed': 1})
+
+        RepairDailyStat.objects.filter(status='pending').update(order_count=5)
+        self.assertEqual(rollups.rebuild(self.today, self.today), {self.today: (7, 3)})
+        self.assertEqual(rollups.rebuild(self.today, self.today), {})
+
+    def test_rebuild_overwrites_rows_created_concurrently(self):
+        # 模拟重算删除后、写入前，并发增量新建了同一维度的行
+        RepairDailyStat.objects.filter(date=self.today).update(order_count=9)
+        with mock.patch.object(QuerySet, 'delete', return_value=(0, {})):
+            rollups.rebuild(self.today, self.today)
+        self.assertEqual(self.counts('building_name'), {'1号楼': 2, '2号楼': 1})
+
+    def test_statistics_api(self):
+        response = api_client().get('/api/repair-orders/statistics/', {'group_by': 'building_name'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['total'], 3)
+        self.assertEqual(
+            {item['key']: item['count'] for item in response.json()['results']}, {'1号楼': 2, '2号楼': 1}
+        )
+        response = api_client().get('/api/repair-orders/statistics/', {'group_by': 'date'})
+        self.assertEqual(len(response.json()['results']), 30)
+        self.assertEqual(response.json()['results'][-1]['count'], 3)
+        self.assertEqual(api_client().get('/api/repair-orders/statistics/', {'group_by': 'x'}).status_code, 400)
@@ -0,0 +1,70 @@
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase
+
+from dormitory_repair import search
+from dormitory_repair.models import RepairOrder, RepairOrderSearchGram
+
+from .base import api_client, create_dormitory, create_order, create_user
+
+
+class NgramTests(SimpleTestCase):
+
+    def test_ngrams(self):
+        self.assertEqual(search.ngrams('水龙头'), ['水龙', '龙头', '头'])
+        self.assertEqual(search.ngrams('水'), ['水'])
+        self.assertEqual(search.split_words('A栋 水龙头-漏水'), ['a栋', '水龙头', '漏水'])
+
+    def test_reporter_text_joins_names(self):
+        user = User(username='zs01', first_name='三', last_name='张')
+        self.assertEqual(search.reporter_text(user), '三 张 张三 三张 zs01')
+
+
+class SearchTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.zhang = create_user('zs01', first_name='三', last_name='张')
+        cls.li = create_user('ls01', first_name='四', last_name='李')
+        dormitory = create_dormitory()
+        cls.leak = create_order(cls.zhang, dormitory, title='卫生间水龙头漏水')
+        cls.network = create_order(cls.li, dormitory, title='宿舍网络断开', fault_type='network')
+
+    def search(self, term):
+        return set(search.search_repair_orders(RepairOrder.objects.all(), term).values_list('id', flat=True))
+
+    def test_matches_all_bigrams(self):
+        self.assertEqual(self.search('水龙头'), {self.leak.pk})
+        self.assertEqual(self.search('网络'), {self.network.pk})
+        self.assertEqual(self.search('龙网'), set())
+        self.assertEqual(self.search('  '), set())
+
+    def test_single_character_prefix(self):
+        self.assertEqual(self.search('网'), {self.network.pk})
+
+    def test_reporter_full_name(self):
+        self.assertEqual(self.search('张三'), {self.leak.pk})
+        self.assertEqual(self.search('ls01'), {self.network.pk})
+
+    def test_ranks_title_above_description(self):
+        other = create_order(self.li, self.leak.dormitory, title='其他', description='水龙头')
+        ranked = list(search.search_repair_orders(RepairOrder.objects.all(), '水龙头').order_by('-search_rank'))
+        self.assertEqual([order.pk for order in ranked], [self.leak.pk, other.pk])
+
+    def test_reindexes_on_change_only(self):
+        order = RepairOrder.objects.select_related('user').get(pk=self.leak.pk)
+        self.assertTrue(search.is_indexed(order))
+        order.title = '门锁损坏'
+        self.assertFalse(search.is_indexed(order))
+        order.save()
+        self.assertEqual(self.search('门锁'), {order.pk})
+        self.assertEqual(self.search('水龙头'), set())
+
+    def test_reporter_rename_reindexes(self):
+        self.zhang.first_name = '丰'
+        self.zhang.save()
+        self.assertEqual(self.search('张丰'), {self.leak.pk})
+        self.assertFalse(RepairOrderSearchGram.objects.filter(order_id=self.leak.pk, gram='张三').exists())
+
+    def test_list_search_parameter(self):
+        response = api_client(self.zhang).get('/api/repair-orders/', {'search': '漏水', 'fields': 'id'})
+        self.assertEqual([row['id'] for row in response.json()['results']], [self.leak.pk])
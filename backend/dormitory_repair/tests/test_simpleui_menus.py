@@ -0,0 +1,44 @@
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from simpleui.templatetags import simpletags
+
+from .base import api_client, create_user
+
+
+class MenusCacheTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = create_user('admin', is_staff=True, is_superuser=True)
+
+    def setUp(self):
+        simpletags._menus_cache.clear()
+        self.addCleanup(simpletags._menus_cache.clear)
+        self.client = api_client(self.admin)
+
+    def get_index(self):
+        response = self.client.get('/admin/')
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_menus_are_built_once(self):
+        with mock.patch.object(simpletags, 'build_menus', wraps=simpletags.build_menus) as build:
+            self.get_index()
+            second = self.get_index()
+        self.assertEqual(build.call_count, 1)
+        self.assertIn('var menus=', second.content.decode())
+        # 菜单没有变化，第二次请求不再写会话
+        self.assertNotIn('sessionid', second.cookies)
+
+    def test_config_change_rebuilds_menus(self):
+        config = {'system_keep': True, 'menus': [{'name': '报表', 'url': '/report/'}]}
+        with mock.patch.object(simpletags, 'build_menus', wraps=simpletags.build_menus) as build:
+            with override_settings(SIMPLEUI_CONFIG=config):
+                self.get_index()
+                # 原地修改配置同样使缓存失效
+                config['menus'][0]['name'] = '统计报表'
+                response = self.get_index()
+        self.assertEqual(build.call_count, 2)
+        # 菜单以 JSON 输出，中文为 \u 转义
+        self.assertIn('统计报表'.encode('unicode_escape').decode(), response.content.decode())
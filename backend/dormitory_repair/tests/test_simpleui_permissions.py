@@ -0,0 +1,24 @@
+from django.contrib.auth.models import Permission
+from django.contrib.contenttypes.models import ContentType
+from django.test import TestCase
+from simpleui.templatetags import simpletags
+
+from dormitory_repair.models import RepairOrder
+
+
+class PermissionCacheTests(TestCase):
+
+    def setUp(self):
+        simpletags.clear_permission_cache()
+        self.addCleanup(simpletags.clear_permission_cache)
+
+    def test_codenames_are_cached_until_permissions_change(self):
+        codenames = simpletags.get_permission_codenames('dormitory_repair', 'repairorder')
+        self.assertIn('change_repairorder', codenames)
+        with self.assertNumQueries(0):
+            simpletags.get_permission_codenames('dormitory_repair', 'repairorder')
+
+        Permission.objects.create(
+            codename='export_orders', name='导出工单', content_type=ContentType.objects.get_for_model(RepairOrder)
+        )
+        self.assertIn('export_orders', simpletags.get_permission_codenames('dormitory_repair', 'repairorder'))
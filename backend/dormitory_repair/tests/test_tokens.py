@@ -0,0 +1,66 @@
+from django.test import TestCase
+
+from dormitory_repair import tokens
+
+from .base import api_client, create_user
+
+
+class TokenTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = create_user('stu')
+
+    def setUp(self):
+        self.client = api_client()
+        self.addCleanup(tokens.forget_user, self.student.pk)
+
+    def login(self):
+        response = self.client.post(
+            '/api/auth/login/', {'username': 'stu', 'password': 'password'}, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def current_user(self, token):
+        return self.client.get('/api/auth/user/', headers={'Authorization': f'Bearer {token}'})
+
+    def refresh(self, token):
+        return self.client.post('/api/auth/refresh/', {'refresh': token}, content_type='application/json')
+
+    def test_access_token_authenticates_from_cache(self):
+        issued = self.login()
+        self.assertEqual(self.current_user(issued['token']).json()['data']['username'], 'stu')
+        with self.assertNumQueries(0):
+            tokens.authenticate_token(issued['token'])
+
+    def test_refresh_issues_working_tokens(self):
+        issued = self.refresh(self.login()['refresh']).json()
+        self.assertEqual(self.current_user(issued['token']).status_code, 200)
+        self.assertEqual(self.refresh('garbage').status_code, 401)
+
+    def test_logout_revokes_access_and_refresh_tokens(self):
+        issued = self.login()
+        response = self.client.post('/api/auth/logout/', headers={'Authorization': f"Bearer {issued['token']}"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.current_user(issued['token']).status_code, 401)
+        self.assertEqual(self.refresh(issued['refresh']).status_code, 401)
+        with self.assertRaisesMessage(tokens.TokenError, '令牌已注销'):
+            tokens.authenticate_token(issued['token'])
+        # 重新登录后签发的令牌可以使用
+        self.assertEqual(self.current_user(self.login()['token']).status_code, 200)
+
+    def test_password_change_revokes_tokens(self):
+        issued = self.login()
+        self.student.set_password('changed')
+        self.student.save()
+        with self.assertRaisesMessage(tokens.TokenError, '密码已修改'):
+            tokens.authenticate_token(issued['token'])
+
+    def test_requests_get_separate_user_instances(self):
+        token = self.login()['token']
+        first = tokens.authenticate_token(token)
+        first.is_staff = True
+        second = tokens.authenticate_token(token)
+        self.assertIsNot(first, second)
+        self.assertFalse(second.is_staff)
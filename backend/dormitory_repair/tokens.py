@@ -0,0 +1,226 @@
+"""
+API 令牌认证
+
+登录后签发两个令牌（django.core.signing，HMAC 签名 + 时间戳，无需存库）：
+    - access：有效期 API_ACCESS_TOKEN_LIFETIME 秒，请求时放在 Authorization: Bearer <token> 头中
+    - refresh：有效期 API_REFRESH_TOKEN_LIFETIME 秒，只用于 POST /api/auth/refresh/ 换取新令牌
+
+携带 access 令牌的请求由 bearer_token_middleware 验证签名，并从进程内的用户缓存
+取得用户，不再查询 django_session 和 auth_user；会话也不再因 API 登录而写入。
+
+令牌中带有用户密码的摘要（同 get_session_auth_hash），修改密码后旧令牌失效；
+还带有签发时的令牌版本（UserTokenVersion），登出时版本加一，该用户已签发的
+access / refresh 令牌全部失效。
+缓存的用户记录 API_TOKEN_USER_CACHE_TTL 秒后重新加载，停用账户、修改权限、在其他
+进程登出最迟在这段时间后对 access 令牌生效（本进程内立即失效，见 signals.py）；
+refresh 令牌每次都从数据库验证。每个请求拿到的是缓存用户的副本，请求间互不影响。
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser, User
+from django.core import signing
+from django.db import transaction
+from django.db.models import F
+from django.utils.crypto import constant_time_compare
+from django.utils.decorators import sync_and_async_middleware
+
+from .models import UserTokenVersion
+
+
+ACCESS_SALT = 'dormitory_repair.tokens.access'
+REFRESH_SALT = 'dormitory_repair.tokens.refresh'
+
+
+class TokenError(Exception):
+    """令牌无效、过期或对应的用户不可用"""
+
+
+def access_lifetime():
+    return getattr(settings, 'API_ACCESS_TOKEN_LIFETIME', 15 * 60)
+
+
+def refresh_lifetime():
+    return getattr(settings, 'API_REFRESH_TOKEN_LIFETIME', 7 * 24 * 3600)
+
+
+def _auth_hash(user):
+    # 只取一段即可识别密码是否变化，令牌更短
+    return user.get_session_auth_hash()[:16]
+
+
+def _token_version(user):
+    # 用户从未登出过时没有版本记录，即版本 0
+    record = getattr(user, 'token_version', None)
+    return record.version if record is not None else 0
+
+
+def issue_tokens(user):
+    """为用户签发 access / refresh 令牌"""
+    payload = {'u': user.pk, 'h': _auth_hash(user), 'v': _token_version(user)}
+    return {
+        'token': signing.dumps(payload, salt=ACCESS_SALT),
+        'refresh': signing.dumps(payload, salt=REFRESH_SALT),
+        'expires_in': access_lifetime(),
+    }
+
+
+def _load(token, salt, max_age):
+    try:
+        payload = signing.loads(token, salt=salt, max_age=max_age)
+    except signing.SignatureExpired:
+        raise TokenError('令牌已过期')
+    except signing.BadSignature:
+        raise TokenError('无效的令牌')
+    if not isinstance(payload, dict) or 'u' not in payload:
+        raise TokenError('无效的令牌')
+    return payload
+
+
+def _check_user(user, payload):
+    if user is None or not user.is_active:
+        raise TokenError('用户不存在或已被禁用')
+    if not constant_time_compare(_auth_hash(user), payload.get('h', '')):
+        raise TokenError('密码已修改，请重新登录')
+    if payload.get('v', 0) != _token_version(user):
+        raise TokenError('令牌已注销，请重新登录')
+    return user
+
+
+def revoke_tokens(user):
+    """
+    使用户已签发的全部令牌失效（登出时调用）
+    """
+    with transaction.atomic():
+        record, created = UserTokenVersion.objects.get_or_create(user_id=user.pk, defaults={'version': 1})
+        if not created:
+            UserTokenVersion.objects.filter(pk=record.pk).update(version=F('version') + 1)
+    forget_user(user.pk)
+
+
+def refresh_tokens(token):
+    """
+    用 refresh 令牌换取新令牌，从数据库重新读取用户
+    """
+    payload = _load(token, REFRESH_SALT, refresh_lifetime())
+    user = _load_user(payload['u'])
+    _check_user(user, payload)
+    forget_user(user.pk)
+    return issue_tokens(user), user
+
+
+# ========================
+# 用户缓存
+# ========================
+
+_users = OrderedDict()
+_users_lock = threading.Lock()
+
+
+def _cached_user(user_id):
+    with _users_lock:
+        entry = _users.get(user_id)
+        if entry is None:
+            return None
+        user, loaded_at = entry
+        if time.monotonic() - loaded_at > getattr(settings, 'API_TOKEN_USER_CACHE_TTL', 60):
+            del _users[user_id]
+            return None
+        _users.move_to_end(user_id)
+    # 缓存中的实例不交给请求，请求修改 request.user 不会影响其他请求
+    return copy.deepcopy(user)
+
+
+def _remember_user(user):
+    with _users_lock:
+        _users[user.pk] = (user, time.monotonic())
+        _users.move_to_end(user.pk)
+        while len(_users) > getattr(settings, 'API_TOKEN_USER_CACHE_SIZE', 1024):
+            _users.popitem(last=False)
+
+
+def forget_user(user_id):
+    """用户资料变化后移除缓存"""
+    with _users_lock:
+        _users.pop(user_id, None)
+
+
+def _load_user(user_id):
+    return User.objects.select_related('token_version').filter(pk=user_id).first()
+
+
+def _fetch_user(user_id):
+    user = _load_user(user_id)
+    if user is not None:
+        _remember_user(copy.deepcopy(user))
+    return user
+
+
+def authenticate_token(token):
+    """
+    验证 access 令牌，返回用户；缓存命中时不查询数据库
+    """
+    payload = _load(token, ACCESS_SALT, access_lifetime())
+    user = _cached_user(payload['u']) or _fetch_user(payload['u'])
+    return _check_user(user, payload)
+
+
+async def aauthenticate_token(token):
+    payload = _load(token, ACCESS_SALT, access_lifetime())
+    user = _cached_user(payload['u']) or await sync_to_async(_fetch_user)(payload['u'])
+    return _check_user(user, payload)
+
+
+# ========================
+# 中间件
+# ========================
+
+def _bearer_token(request):
+    scheme, _, token = request.META.get('HTTP_AUTHORIZATION', '').partition(' ')
+    if scheme.lower() != 'bearer' or not token.strip():
+        return None
+    return token.strip()
+
+
+def _set_user(request, user):
+    request.user = user
+
+    async def auser():
+        return user
+
+    request.auser = auser
+
+
+@sync_and_async_middleware
+def bearer_token_middleware(get_response):
+    """
+    带 Authorization: Bearer 头的请求使用令牌认证，替换 AuthenticationMiddleware 设置的
+    request.user（不会再去读会话）；令牌无效时为匿名用户，接口返回 401 后由前端刷新令牌
+
+    需放在 AuthenticationMiddleware 之后
+    """
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            token = _bearer_token(request)
+            if token is not None:
+                try:
+                    user = await aauthenticate_token(token)
+                except TokenError:
+                    user = AnonymousUser()
+                _set_user(request, user)
+            return await get_response(request)
+    else:
+        def middleware(request):
+            token = _bearer_token(request)
+            if token is not None:
+                try:
+                    user = authenticate_token(token)
+                except TokenError:
+                    user = AnonymousUser()
+                _set_user(request, user)
+            return get_response(request)
+    return middleware
@@ -10,19 +10,29 @@ urlpatterns = [
     # API 路由
     path('health/', views.api_health_check, name='api_health_check'),
     path('system/info/', views.api_system_info, name='api_system_info'),
+    path('system/db-pool/', views.api_db_pool_stats, name='api_db_pool_stats'),
     
     # 认证相关API
     path('auth/login/', views.api_login, name='api_login'),
+    path('auth/refresh/', views.api_refresh_token, name='api_refresh_token'),
     path('auth/logout/', views.api_logout, name='api_logout'),
     path('auth/user/', views.api_current_user, name='api_current_user'),
     
     # 报修工单API
     path('repair-orders/', views.api_repair_orders, name='api_repair_orders'),
+    path('repair-orders/export/', views.api_repair_orders_export, name='api_repair_orders_export'),
+    path('repair-orders/statistics/', views.api_repair_orders_statistics, name='api_repair_orders_statistics'),
+    path('repair-orders/claim-next/', views.api_repair_orders_claim_next, name='api_repair_orders_claim_next'),
+    path('repair-orders/auto-assign/', views.api_repair_orders_auto_assign, name='api_repair_orders_auto_assign'),
+    path('repair-orders/batch-update/', views.api_repair_orders_batch_update, name='api_repair_orders_batch_update'),
     path('repair-orders/<int:order_id>/', views.api_repair_order_detail, name='api_repair_order_detail'),
+    path('repair-orders/<int:order_id>/assign-worker/', views.api_repair_order_assign_worker, name='api_repair_order_assign_worker'),
     
     # 学生管理API已移除 - 现在直接使用Django用户系统
     
     # 宿舍管理API
     path('dormitories/', views.api_dormitories, name='api_dormitories'),
+    path('dormitories/statistics/', views.api_dormitories_statistics, name='api_dormitories_statistics'),
+    path('dormitories/bulk/', views.api_dormitories_bulk, name='api_dormitories_bulk'),
     path('dormitories/<int:dormitory_id>/', views.api_dormitory_detail, name='api_dormitory_detail'),
 ]
\ No newline at end of file
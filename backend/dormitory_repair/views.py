@@ -1,12 +1,33 @@
+from django.conf import settings
 from django.shortcuts import render
-from django.http import HttpResponse, JsonResponse
+from django.http import StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
-from django.contrib.auth import authenticate, login, logout
+from django.contrib.auth import authenticate, logout, user_logged_in
 from django.contrib.auth.models import User
-from django.db.models import Q
+from django.db import transaction
+from django.db.models import Count, Q, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from myproject.db.mysql_pool.pool import pool_stats
+from . import assignment, counters, counting, dispatch, rollups, tokens
+from .conditional import conditional_get, make_etag, query_params
+from .export import EXPORT_FORMATS, stream_export
+from .fieldsets import (
+    FLAT_ORDER_FIELDS, ORDER_DETAIL_FIELDS, ORDER_EXPORT_FIELDS, ORDER_LIST_FIELDS,
+    InvalidFields, lookups_for, parse_fields, serialize,
+)
 from .models import Dormitory, RepairOrder
+from .pagination import InvalidCursor, build_cursor_page, cursor_page_queryset
+from .provisioning import (
+    DEFAULT_ROOM_FORMAT, ProvisioningError, expand_room_spec, parse_dormitory_csv, provision_dormitories
+)
+from .responses import ApiResponse
+from .search import search_repair_orders
+from .signals import repair_orders_bulk_updated
 import json
+import os
+from datetime import date, timedelta
 
 
 def index(request):
@@ -28,7 +49,7 @@ def api_health_check(request):
     """
     健康检查API - 用于前端测试连接
     """
-    return JsonResponse({
+    return ApiResponse({
         'status': 'success',
         'message': '后端连接正常',
         'code': 200,
@@ -47,26 +68,41 @@ def api_system_info(request):
     """
     系统信息API
     """
-    # 简单的统计数据
-    total_orders = RepairOrder.objects.count()
-    pending_orders = RepairOrder.objects.filter(status='pending').count()
-    completed_orders = RepairOrder.objects.filter(status='completed').count()
-    total_dormitories = Dormitory.objects.count()
-    total_users = User.objects.count()
-    
-    return JsonResponse({
+    # 统计数据读取自计数器表，不再逐表 COUNT(*)
+    return ApiResponse(_system_info_payload(counters.read()))
+
+
+def _system_info_payload(values):
+    return {
         'statistics': {
-            'total_orders': total_orders,
-            'pending_orders': pending_orders,
-            'completed_orders': completed_orders,
-            'total_dormitories': total_dormitories,
-            'total_users': total_users
+            'total_orders': values[counters.ORDERS_TOTAL],
+            'pending_orders': values[counters.order_status_key('pending')],
+            'completed_orders': values[counters.order_status_key('completed')],
+            'total_dormitories': values[counters.DORMITORIES_TOTAL],
+            'total_users': values[counters.USERS_TOTAL]
         },
         'system': {
             'name': '宿舍报修管理系统',
             'version': '1.0.0',
             'backend': 'Django 5.2.6'
         }
+    }
+
+
+@csrf_exempt
+@require_http_methods(["GET"])
+def api_db_pool_stats(request):
+    """
+    数据库连接池统计API（仅管理员）- 用于评估连接池大小
+
+    统计的是处理本请求的进程，多进程部署时各进程分别统计
+    """
+    if not request.user.is_staff:
+        return ApiResponse({'error': '没有权限'}, status=403)
+    
+    return ApiResponse({
+        'pid': os.getpid(),
+        'pools': pool_stats()
     })
 
 
@@ -88,7 +124,7 @@ def api_login(request):
         
         # 验证输入
         if not username or not password:
-            return JsonResponse({
+            return ApiResponse({
                 'error': '请输入用户名和密码'
             }, status=400)
         
@@ -97,38 +133,65 @@ def api_login(request):
         
         if user is not None:
             if user.is_active:
-                # 登录用户
-                login(request, user)
+                # 签发令牌，不创建会话；信号照常发送以更新 last_login
+                user_logged_in.send(sender=user.__class__, request=request, user=user)
                 
                 # 返回成功响应
-                return JsonResponse({
+                return ApiResponse({
                     'message': '登录成功',
-                    'token': request.session.session_key,  # 使用session作为token
-                    'user': {
-                        'id': user.id,
-                        'username': user.username,
-                        'email': user.email or '',
-                        'first_name': user.first_name or '',
-                        'last_name': user.last_name or '',
-                        'is_staff': user.is_staff,
-                        'is_superuser': user.is_superuser,
-                    }
+                    **tokens.issue_tokens(user),
+                    'user': _serialize_user(user)
                 })
             else:
-                return JsonResponse({
+                return ApiResponse({
                     'error': '账户被禁用，请联系管理员'
                 }, status=403)
         else:
-            return JsonResponse({
+            return ApiResponse({
                 'error': '用户名或密码错误'
             }, status=401)
             
     except json.JSONDecodeError:
-        return JsonResponse({
+        return ApiResponse({
+            'error': '请求数据格式错误'
+        }, status=400)
+    except Exception as e:
+        return ApiResponse({
+            'error': f'服务器内部错误: {str(e)}'
+        }, status=500)
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def api_refresh_token(request):
+    """
+    刷新令牌API - 用 refresh 令牌换取新的 access / refresh 令牌
+    """
+    try:
+        data = json.loads(request.body)
+        refresh = data.get('refresh', '') if isinstance(data, dict) else ''
+        if not refresh:
+            return ApiResponse({
+                'error': '缺少refresh令牌'
+            }, status=400)
+        
+        issued, user = tokens.refresh_tokens(refresh)
+        return ApiResponse({
+            'message': '刷新成功',
+            **issued,
+            'user': _serialize_user(user)
+        })
+        
+    except tokens.TokenError as e:
+        return ApiResponse({
+            'error': str(e)
+        }, status=401)
+    except json.JSONDecodeError:
+        return ApiResponse({
             'error': '请求数据格式错误'
         }, status=400)
     except Exception as e:
-        return JsonResponse({
+        return ApiResponse({
             'error': f'服务器内部错误: {str(e)}'
         }, status=500)
 
@@ -137,17 +200,19 @@ def api_login(request):
 @require_http_methods(["POST"])
 def api_logout(request):
     """
-    用户登出API
+    用户登出API - 同时注销该用户已签发的 API 令牌
     """
     try:
+        if request.user.is_authenticated:
+            tokens.revoke_tokens(request.user)
         logout(request)
-        return JsonResponse({
+        return ApiResponse({
             'status': 'success',
             'code': 200,
             'message': '登出成功'
         })
     except Exception as e:
-        return JsonResponse({
+        return ApiResponse({
             'status': 'error',
             'code': 500,
             'message': '登出失败',
@@ -162,41 +227,97 @@ def api_current_user(request):
     获取当前用户信息API
     """
     try:
-        if request.user.is_authenticated:
-            return JsonResponse({
-                'status': 'success',
-                'code': 200,
-                'data': {
-                    'id': request.user.id,
-                    'username': request.user.username,
-                    'email': request.user.email or '',
-                    'first_name': request.user.first_name or '',
-                    'last_name': request.user.last_name or '',
-                    'is_staff': request.user.is_staff,
-                    'is_superuser': request.user.is_superuser,
-                }
-            })
-        else:
-            return JsonResponse({
-                'status': 'error',
-                'code': 401,
-                'message': '未登录',
-                'error': '用户未登录'
-            }, status=401)
+        return _current_user_response(request.user)
     except Exception as e:
-        return JsonResponse({
+        return _current_user_error(e)
+
+
+def _serialize_user(user):
+    return {
+        'id': user.id,
+        'username': user.username,
+        'email': user.email or '',
+        'first_name': user.first_name or '',
+        'last_name': user.last_name or '',
+        'is_staff': user.is_staff,
+        'is_superuser': user.is_superuser,
+    }
+
+
+def _current_user_response(user):
+    if user.is_authenticated:
+        return ApiResponse({
+            'status': 'success',
+            'code': 200,
+            'data': _serialize_user(user)
+        })
+    else:
+        return ApiResponse({
             'status': 'error',
-            'code': 500,
-            'message': '获取用户信息失败',
-            'error': str(e)
-        }, status=500)
+            'code': 401,
+            'message': '未登录',
+            'error': '用户未登录'
+        }, status=401)
+
+
+def _current_user_error(e):
+    return ApiResponse({
+        'status': 'error',
+        'code': 500,
+        'message': '获取用户信息失败',
+        'error': str(e)
+    }, status=500)
 
 
 # ========================
 # 报修工单相关API
 # ========================
 
+def _repair_orders_validators(request):
+    """
+    工单列表的校验值：查询参数和工单列表的数据版本（一次主键查询，不扫描工单表）
+
+    工单、宿舍或报修人资料变化后版本递增，见 signals.bump_orders_version
+    """
+    return _repair_orders_etag(request, counters.read_version()), None
+
+
+def _repair_orders_etag(request, version):
+    return make_etag('repair-orders', query_params(request), version)
+
+
+def _repair_orders_count_mode(request):
+    """
+    工单列表的总数统计方式（?count=exact|estimate|cached|none），参数无效时抛出 InvalidCountMode
+    """
+    default = getattr(settings, 'REPAIR_ORDER_API_COUNT_MODE', counting.EXACT)
+    return counting.parse_count_mode(request.GET.get('count'), default)
+
+
+def _repair_order_validators(request, order_id):
+    """
+    工单详情的校验值：工单和宿舍的更新时间、报修人资料（一次按主键的 JOIN 查询）
+
+    报修人没有更新时间，改名只能由 ETag 发现，因此不提供 Last-Modified
+    """
+    return _repair_order_etag(request, order_id, _repair_order_validator_rows(order_id).first())
+
+
+def _repair_order_validator_rows(order_id):
+    return RepairOrder.objects.filter(id=order_id).values_list(
+        'updated_at', 'dormitory__updated_at', 'user__username', 'user__first_name', 'user__last_name', 'user__email'
+    )
+
+
+def _repair_order_etag(request, order_id, row):
+    if row is None:
+        return None, None
+    # 不同 ?fields= 的响应内容不同，ETag 也要区分
+    return make_etag('repair-order', order_id, query_params(request), row), None
+
+
 @csrf_exempt
+@conditional_get(_repair_orders_validators)
 def api_repair_orders(request):
     """
     报修工单API - 支持GET(列表)和POST(创建)
@@ -206,81 +327,111 @@ def api_repair_orders(request):
     elif request.method == 'POST':
         return _create_repair_order(request)
     else:
-        return JsonResponse({'error': '不支持的请求方法'}, status=405)
+        return ApiResponse({'error': '不支持的请求方法'}, status=405)
 
 
 def _get_repair_orders_list(request):
     """
     获取报修工单列表
+    
+    默认按页码分页；传入 ?cursor= 时切换为游标分页，
+    返回的 next/previous 为不透明游标而不是页码；
+    ?fields=id,title,... 只返回（并只查询）指定字段；
+    ?count=exact|estimate|cached|none 指定总数的统计方式（见 counting.py）
     """
     try:
-        # 获取查询参数
-        page = int(request.GET.get('page', 1))
-        page_size = int(request.GET.get('page_size', 10))
-        search = request.GET.get('search', '').strip()
-        status = request.GET.get('status', '').strip()
-        priority = request.GET.get('priority', '').strip()
-        fault_type = request.GET.get('fault_type', '').strip()
-        
-        # 获取所有工单
-        queryset = RepairOrder.objects.select_related(
-            'user', 'dormitory'
-        ).order_by('-created_at')
-        
-        # 应用筛选
-        if search:
-            queryset = queryset.filter(
-                Q(order_number__icontains=search) |
-                Q(title__icontains=search) |
-                Q(user__first_name__icontains=search) |
-                Q(user__last_name__icontains=search) |
-                Q(user__username__icontains=search)
-            )
+        page_queryset, count_query, build = _repair_orders_page(request)
+        total_count = counting.count_rows(*count_query) if count_query else None
+        return ApiResponse(build(list(page_queryset), total_count))
         
-        if status:
-            queryset = queryset.filter(status=status)
-            
-        if priority:
-            queryset = queryset.filter(priority=priority)
-            
-        if fault_type:
-            queryset = queryset.filter(fault_type=fault_type)
-        
-        total_count = queryset.count()
-        start_index = (page - 1) * page_size
-        end_index = start_index + page_size
-        page_orders = queryset[start_index:end_index]
-        
-        # 构造返回数据
-        results = []
-        for order in page_orders:
-            results.append({
-                'id': order.id,
-                'order_number': order.order_number,
-                'title': order.title,
-                'description': order.description,
-                'status': order.status,
-                'priority': order.priority,
-                'fault_type': order.fault_type,
-                'student_name': f"{order.user.first_name} {order.user.last_name}".strip() or order.user.username,
-                'student_id': order.user.id,
-                'dormitory_name': f"{order.dormitory.building_name}-{order.dormitory.room_number}",
-                'dormitory_id': order.dormitory.id,
-                'created_at': order.created_at.isoformat(),
-                'updated_at': order.updated_at.isoformat()
-            })
+    except InvalidCursor:
+        return ApiResponse({'error': '无效的分页游标'}, status=400)
+    except (InvalidFields, counting.InvalidCountMode) as e:
+        return ApiResponse({'error': str(e)}, status=400)
+    except Exception as e:
+        return ApiResponse({
+            'error': f'获取工单列表失败: {str(e)}'
+        }, status=500)
+
+
+def _repair_orders_page(request):
+    """
+    解析工单列表的查询参数，返回 (本页查询, 总数查询, build)
+    
+    本页查询已切片（多取一行判断是否有下一页）；总数查询为 (queryset, 统计方式)，
+    游标分页时为 None；build(本页的行, 总数) 生成响应数据。同步和异步视图共用，
+    只是执行查询的方式不同。参数无效时抛出 InvalidFields、InvalidCursor 或 InvalidCountMode
+    """
+    page = int(request.GET.get('page', 1))
+    page_size = int(request.GET.get('page_size', 10))
+    fields = parse_fields(request.GET.get('fields'), ORDER_LIST_FIELDS)
+    
+    # 应用筛选，只查询输出字段需要的列，分页另外需要 (created_at, id)
+    queryset = _filter_repair_orders(RepairOrder.objects.order_by('-created_at', '-id'), request.GET)
+    queryset = queryset.values(*lookups_for(fields, extra=('id', 'created_at')))
+    
+    # 游标分页模式：?cursor= 时按 (created_at, id) 定位，不做 COUNT(*)
+    if 'cursor' in request.GET:
+        page_queryset, direction = cursor_page_queryset(queryset, request.GET.get('cursor', '').strip(), page_size)
+        
+        def build(rows, total_count):
+            page_rows, next_cursor, previous_cursor = build_cursor_page(
+                rows, direction, page_size,
+                get_key=lambda row: (row['created_at'], row['id'])
+            )
+            return {
+                'count': None,
+                'next': next_cursor,
+                'previous': previous_cursor,
+                'results': [serialize(row, fields) for row in page_rows]
+            }
         
-        return JsonResponse({
+        return page_queryset, None, build
+    
+    # 关键词检索时按相关度排序
+    if request.GET.get('search', '').strip():
+        queryset = queryset.order_by('-search_rank', '-created_at', '-id')
+    
+    # 总数按 ?count= 精确统计、估算、缓存或不统计（count 为 null）
+    count_query = (queryset, _repair_orders_count_mode(request))
+    start_index = (page - 1) * page_size
+    end_index = start_index + page_size
+    
+    def build(rows, total_count):
+        # 多取的一条只用于判断是否有下一页，不依赖总数
+        return {
             'count': total_count,
-            'next': page + 1 if end_index < total_count else None,
+            'next': page + 1 if len(rows) > page_size else None,
             'previous': page - 1 if page > 1 else None,
-            'results': results
-        })
+            'results': [serialize(row, fields) for row in rows[:page_size]]
+        }
+    
+    return queryset[start_index:end_index + 1], count_query, build
+
+
+def _filter_repair_orders(queryset, params):
+    """
+    按列表接口的查询参数（search/status/priority/fault_type）筛选工单
+    """
+    search = params.get('search', '').strip()
+    status = params.get('status', '').strip()
+    priority = params.get('priority', '').strip()
+    fault_type = params.get('fault_type', '').strip()
+    
+    if search:
+        # n-gram 全文检索，附带 search_rank 相关度注解
+        queryset = search_repair_orders(queryset, search)
+    
+    if status:
+        queryset = queryset.filter(status=status)
         
-    except Exception as e:
-        return JsonResponse({
-            'error': f'获取工单列表失败: {str(e)}'
-        }, status=500)
+    if priority:
+        queryset = queryset.filter(priority=priority)
+        
+    if fault_type:
+        queryset = queryset.filter(fault_type=fault_type)
+    
+    return queryset
 
 
 def _create_repair_order(request):
@@ -304,7 +455,7 @@ def _create_repair_order(request):
             dormitory=dormitory
         )
         
-        return JsonResponse({
+        return ApiResponse({
             'message': '工单创建成功',
             'data': {
                 'id': order.id,
@@ -315,48 +466,32 @@ def _create_repair_order(request):
         }, status=201)
         
     except User.DoesNotExist:
-        return JsonResponse({'error': '用户不存在'}, status=404)
+        return ApiResponse({'error': '用户不存在'}, status=404)
     except Dormitory.DoesNotExist:
-        return JsonResponse({'error': '宿舍不存在'}, status=404)
+        return ApiResponse({'error': '宿舍不存在'}, status=404)
     except Exception as e:
-        return JsonResponse({
+        return ApiResponse({
             'error': f'创建工单失败: {str(e)}'
         }, status=500)
 
 
 @csrf_exempt
+@conditional_get(_repair_order_validators)
 def api_repair_order_detail(request, order_id):
     """
     工单详情API - 支持GET(详情)、PUT/PATCH(更新)、DELETE(删除)
+    
+    GET 支持 ?fields= 指定返回字段
     """
     try:
+        if request.method == 'GET':
+            fields = parse_fields(request.GET.get('fields'), ORDER_DETAIL_FIELDS)
+            row = RepairOrder.objects.values(*lookups_for(fields)).get(id=order_id)
+            return ApiResponse(serialize(row, fields))
+        
         order = RepairOrder.objects.select_related('user', 'dormitory').get(id=order_id)
         
-        if request.method == 'GET':
-            return JsonResponse({
-                'id': order.id,
-                'order_number': order.order_number,
-                'title': order.title,
-                'description': order.description,
-                'status': order.status,
-                'priority': order.priority,
-                'fault_type': order.fault_type,
-                'student': {
-                    'id': order.user.id,
-                    'name': f"{order.user.first_name} {order.user.last_name}".strip() or order.user.username,
-                    'username': order.user.username,
-                    'email': order.user.email
-                },
-                'dormitory': {
-                    'id': order.dormitory.id,
-                    'building_name': order.dormitory.building_name,
-                    'room_number': order.dormitory.room_number
-                },
-                'created_at': order.created_at.isoformat(),
-                'updated_at': order.updated_at.isoformat()
-            })
-            
-        elif request.method in ['PUT', 'PATCH']:
+        if request.method in ['PUT', 'PATCH']:
             data = json.loads(request.body)
             
             # 更新字段
@@ -373,7 +508,7 @@ def api_repair_order_detail(request, order_id):
                 
             order.save()
             
-            return JsonResponse({
+            return ApiResponse({
                 'message': '工单更新成功',
                 'data': {
                     'id': order.id,
@@ -384,16 +519,398 @@ def api_repair_order_detail(request, order_id):
             
         elif request.method == 'DELETE':
             order.delete()
-            return JsonResponse({'message': '工单删除成功'})
+            return ApiResponse({'message': '工单删除成功'})
             
     except RepairOrder.DoesNotExist:
-        return JsonResponse({'error': '工单不存在'}, status=404)
+        return ApiResponse({'error': '工单不存在'}, status=404)
+    except InvalidFields as e:
+        return ApiResponse({'error': str(e)}, status=400)
     except Exception as e:
-        return JsonResponse({
+        return ApiResponse({
             'error': f'操作失败: {str(e)}'
         }, status=500)
 
 
+@csrf_exempt
+@require_http_methods(["GET"])
+def api_repair_orders_export(request):
+    """
+    工单导出API - 支持与列表相同的筛选参数，?format=csv|ndjson，?fields= 指定导出列
+    
+    以流式响应逐批输出，不在内存中构造完整文件
+    """
+    export_format = request.GET.get('format', 'csv').strip().lower()
+    if export_format not in EXPORT_FORMATS:
+        return ApiResponse({'error': '不支持的导出格式'}, status=400)
+    try:
+        fields = parse_fields(request.GET.get('fields'), ORDER_EXPORT_FIELDS, registry=FLAT_ORDER_FIELDS)
+    except InvalidFields as e:
+        return ApiResponse({'error': str(e)}, status=400)
+    
+    queryset = _filter_repair_orders(RepairOrder.objects.all(), request.GET)
+    
+    response = StreamingHttpResponse(
+        stream_export(queryset, export_format, fields),
+        content_type=EXPORT_FORMATS[export_format]
+    )
+    filename = f"repair_orders_{timezone.localtime().strftime('%Y%m%d%H%M%S')}.{export_format}"
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+# 批量更新单次最多处理的工单数，以及每条 UPDATE 覆盖的工单数
+BATCH_UPDATE_LIMIT = 5000
+BATCH_UPDATE_CHUNK_SIZE = 500
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def api_repair_orders_batch_update(request):
+    """
+    批量更新工单API - 修改状态、优先级或维修员
+    
+    每批工单只执行一次 SELECT ... FOR UPDATE 和一次带状态条件的 UPDATE，
+    非法的状态流转逐个返回失败原因。仅管理员可用
+    """
+    try:
+        if not request.user.is_authenticated:
+            return ApiResponse({'error': '用户未登录'}, status=401)
+        if not request.user.is_staff:
+            return ApiResponse({'error': '没有权限'}, status=403)
+        
+        data = json.loads(request.body)
+        ids = list(dict.fromkeys(int(order_id) for order_id in data.get('ids') or []))
+        status = data.get('status')
+        priority = data.get('priority')
+        
+        if not ids:
+            return ApiResponse({'error': '请选择要更新的工单'}, status=400)
+        if len(ids) > BATCH_UPDATE_LIMIT:
+            return ApiResponse({'error': f'单次最多更新{BATCH_UPDATE_LIMIT}个工单'}, status=400)
+        if status is not None and status not in RepairOrder.STATUS_TRANSITIONS:
+            return ApiResponse({'error': '无效的工单状态'}, status=400)
+        if priority is not None and priority not in dict(RepairOrder.PRIORITY_CHOICES):
+            return ApiResponse({'error': '无效的优先级'}, status=400)
+        
+        now = timezone.now()
+        updates = {}
+        if status is not None:
+            updates['status'] = status
+        if priority is not None:
+            updates['priority'] = priority
+        if 'worker_id' in data:
+            worker_id = data['worker_id']
+            if worker_id is not None:
+                worker_id = int(worker_id)
+                # 只能分配给维修员（REPAIR_WORKER_GROUP），null 表示取消分配
+                if not assignment.is_worker(worker_id):
+                    return ApiResponse({'error': '该用户不是维修员'}, status=400)
+            updates['repair_worker_id'] = worker_id
+        if not updates:
+            return ApiResponse({'error': '请指定要修改的内容'}, status=400)
+        
+        # 可以流转到目标状态的原状态（目标状态与原状态相同视为无变化）
+        allowed_from = None
+        if status is not None:
+            allowed_from = [
+                current for current, targets in RepairOrder.STATUS_TRANSITIONS.items()
+                if current == status or status in targets
+            ]
+        status_labels = dict(RepairOrder.STATUS_CHOICES)
+        
+        results = {}
+        for start in range(0, len(ids), BATCH_UPDATE_CHUNK_SIZE):
+            chunk = ids[start:start + BATCH_UPDATE_CHUNK_SIZE]
+            with transaction.atomic():
+                rows = {
+                    row['id']: row
+                    for row in RepairOrder.objects.select_for_update().filter(id__in=chunk).values(
+                        'id', 'status', 'priority', 'repair_worker_id', 'fault_type', 'dormitory_id', 'created_at'
+                    )
+                }
+                
+                changes = []
+                for order_id in chunk:
+                    row = rows.get(order_id)
+                    if row is None:
+                        results[order_id] = '工单不存在'
+                    elif status is not None and row['status'] not in allowed_from:
+                        results[order_id] = (
+                            f"工单状态不能从{status_labels[row['status']]}变更为{status_labels[status]}"
+                        )
+                    else:
+                        results[order_id] = None
+                        changes.append((row, updates))
+                
+                if not changes:
+                    continue
+                
+                queryset = RepairOrder.objects.filter(id__in=[row['id'] for row, _ in changes])
+                values = dict(updates, updated_at=now)
+                if status is not None:
+                    queryset = queryset.filter(status__in=allowed_from)
+                    if status == 'completed':
+                        # 已完成的工单保留原完成时间
+                        values['completed_at'] = Coalesce('completed_at', Value(now))
+                queryset.update(**values)
+                
+                repair_orders_bulk_updated.send(sender=RepairOrder, changes=changes)
+        
+        failed = [order_id for order_id in ids if results[order_id]]
+        return ApiResponse({
+            'message': '批量更新完成',
+            'updated': len(ids) - len(failed),
+            'failed': len(failed),
+            'results': [
+                {'id': order_id, 'success': True} if results[order_id] is None
+                else {'id': order_id, 'success': False, 'error': results[order_id]}
+                for order_id in ids
+            ]
+        })
+        
+    except (json.JSONDecodeError, TypeError, ValueError):
+        return ApiResponse({'error': '请求数据格式错误'}, status=400)
+    except Exception as e:
+        return ApiResponse({
+            'error': f'批量更新失败: {str(e)}'
+        }, status=500)
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def api_repair_orders_claim_next(request):
+    """
+    领取工单API - 维修员领取下一张待处理工单（优先级最高、最早创建）
+    
+    只有维修员（assignment.worker_queryset()）可以领取。请求体（均可省略）：fault_types 可处理的
+    故障类型、buildings 负责的楼栋；管理员可传 worker_id 为其他维修员领取。并发领取不会重复分配，见 dispatch.py
+    """
+    try:
+        if not request.user.is_authenticated:
+            return ApiResponse({'error': '用户未登录'}, status=401)
+        
+        data = json.loads(request.body or '{}')
+        if not isinstance(data, dict):
+            return ApiResponse({'error': '请求数据格式错误'}, status=400)
+        fault_types = data.get('fault_types') or []
+        buildings = data.get('buildings') or []
+        if not isinstance(fault_types, list) or not isinstance(buildings, list):
+            return ApiResponse({'error': 'fault_types 和 buildings 应为数组'}, status=400)
+        invalid = set(fault_types) - set(dict(RepairOrder.FAULT_TYPE_CHOICES))
+        if invalid:
+            return ApiResponse({'error': f'无效的故障类型: {", ".join(sorted(map(str, invalid)))}'}, status=400)
+        
+        worker = request.user
+        worker_id = data.get('worker_id')
+        if worker_id is not None:
+            try:
+                worker_id = int(worker_id)
+            except (TypeError, ValueError):
+                return ApiResponse({'error': '无效的维修员ID'}, status=400)
+        if worker_id is not None and worker_id != request.user.pk:
+            if not request.user.is_staff:
+                return ApiResponse({'error': '没有权限'}, status=403)
+            worker = User.objects.filter(id=worker_id, is_active=True).first()
+            if worker is None or not assignment.is_worker(worker.pk):
+                return ApiResponse({'error': '维修员不存在'}, status=404)
+        elif not assignment.is_worker(worker.pk):
+            return ApiResponse({'error': '只有维修员可以领取工单'}, status=403)
+        
+        order_id = dispatch.claim_next_order(worker, fault_types, [str(name) for name in buildings])
+        if order_id is None:
+            return ApiResponse({
+                'message': '暂无可领取的工单',
+                'order': None
+            })
+        
+        fields = ORDER_DETAIL_FIELDS + ('repair_worker_id',)
+        row = RepairOrder.objects.values(*lookups_for(fields)).get(id=order_id)
+        return ApiResponse({
+            'message': '领取成功',
+            'order': serialize(row, fields)
+        })
+        
+    except (json.JSONDecodeError, TypeError, ValueError):
+        return ApiResponse({'error': '请求数据格式错误'}, status=400)
+    except Exception as e:
+        return ApiResponse({
+            'error': f'领取工单失败: {str(e)}'
+        }, status=500)
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def api_repair_order_assign_worker(request, order_id):
+    """
+    分配维修员API - 请求体 worker_id 指定维修员；不传时按负载、楼栋和专长自动挑选（见 assignment.py）
+    
+    待处理的工单分配后改为维修中，已分配的工单需指定 worker_id 重新分配
+    """
+    try:
+        if not request.user.is_authenticated:
+            return ApiResponse({'error': '用户未登录'}, status=401)
+        if not request.user.is_staff:
+            return ApiResponse({'error': '没有权限'}, status=403)
+        
+        data = json.loads(request.body or '{}')
+        worker_id = data.get('worker_id')
+        if worker_id is not None:
+            worker_id = int(worker_id)
+            # 只能分配给维修员（REPAIR_WORKER_GROUP），与领取工单、自动分配一致
+            if not assignment.is_worker(worker_id):
+                return ApiResponse({'error': '该用户不是维修员'}, status=400)
+        
+        try:
+            worker_id = assignment.assign_order(order_id, worker_id)
+        except RepairOrder.DoesNotExist:
+            return ApiResponse({'error': '工单不存在'}, status=404)
+        except assignment.AssignmentError as e:
+            return ApiResponse({'error': str(e)}, status=400)
+        if worker_id is None:
+            return ApiResponse({
+                'message': '暂无可分配的维修员',
+                'order': None
+            })
+        
+        fields = ORDER_DETAIL_FIELDS + ('repair_worker_id',)
+        row = RepairOrder.objects.values(*lookups_for(fields)).get(id=order_id)
+        return ApiResponse({
+            'message': '分配成功',
+            'order': serialize(row, fields)
+        })
+        
+    except (json.JSONDecodeError, TypeError, ValueError):
+        return ApiResponse({'error': '请求数据格式错误'}, status=400)
+    except Exception as e:
+        return ApiResponse({
+            'error': f'分配维修员失败: {str(e)}'
+        }, status=500)
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def api_repair_orders_auto_assign(request):
+    """
+    批量自动分配API - 为待处理、未分配的工单一次性挑选维修员
+    
+    请求体 ids 指定工单，不传时按优先级、创建时间取前 limit 张（默认且最多 BATCH_UPDATE_LIMIT）
+    """
+    try:
+        if not request.user.is_authenticated:
+            return ApiResponse({'error': '用户未登录'}, status=401)
+        if not request.user.is_staff:
+            return ApiResponse({'error': '没有权限'}, status=403)
+        
+        data = json.loads(request.body or '{}')
+        ids = data.get('ids')
+        limit = int(data.get('limit') or BATCH_UPDATE_LIMIT)
+        if ids is not None:
+            ids = list(dict.fromkeys(int(order_id) for order_id in ids))
+            if not ids:
+                return ApiResponse({'error': '请选择要分配的工单'}, status=400)
+            limit = len(ids)
+        if limit < 1 or limit > BATCH_UPDATE_LIMIT:
+            return ApiResponse({'error': f'单次最多分配{BATCH_UPDATE_LIMIT}个工单'}, status=400)
+        
+        assigned, skipped = assignment.assign_orders(ids, limit)
+        return ApiResponse({
+            'message': '自动分配完成',
+            'assigned': len(assigned),
+            'skipped': len(skipped),
+            'results': [
+                {'id': order_id, 'worker_id': worker_id} for order_id, worker_id in assigned.items()
+            ]
+        })
+        
+    except (json.JSONDecodeError, TypeError, ValueError):
+        return ApiResponse({'error': '请求数据格式错误'}, status=400)
+    except Exception as e:
+        return ApiResponse({
+            'error': f'自动分配失败: {str(e)}'
+        }, status=500)
+
+
+# 统计接口可按其分组的维度
+STATISTICS_GROUPS = ('date', 'status', 'priority', 'fault_type', 'building_name')
+# 默认统计最近多少天、最多可统计多少天
+STATISTICS_DEFAULT_DAYS = 30
+STATISTICS_MAX_DAYS = 3 * 366
+
+
+def _statistics_date_range(params):
+    """
+    解析 start_date/end_date（YYYY-MM-DD），默认最近 STATISTICS_DEFAULT_DAYS 天，参数无效时抛出 ValueError
+    """
+    today = timezone.localdate()
+    try:
+        end_date = date.fromisoformat(params['end_date']) if params.get('end_date') else today
+        start_date = (
+            date.fromisoformat(params['start_date']) if params.get('start_date')
+            else end_date - timedelta(days=STATISTICS_DEFAULT_DAYS - 1)
+        )
+    except ValueError:
+        raise ValueError('日期格式应为 YYYY-MM-DD')
+    if start_date > end_date:
+        raise ValueError('开始日期不能晚于结束日期')
+    if (end_date - start_date).days >= STATISTICS_MAX_DAYS:
+        raise ValueError(f'统计范围不能超过{STATISTICS_MAX_DAYS}天')
+    return start_date, end_date
+
+
+@csrf_exempt
+@require_http_methods(["GET"])
+def api_repair_orders_statistics(request):
+    """
+    工单统计API - 读取每日汇总（rollups.py），不扫描工单表
+    
+    参数：start_date、end_date（默认最近30天）；group_by=date|status|priority|fault_type|building_name
+    （默认 status）；可按 building_name/status/priority/fault_type 筛选。
+    按日期分组时范围内每天都有一项（没有工单为0），便于绘制趋势图
+    """
+    try:
+        start_date, end_date = _statistics_date_range(request.GET)
+        group_by = request.GET.get('group_by', 'status').strip() or 'status'
+        if group_by not in STATISTICS_GROUPS:
+            return ApiResponse({
+                'error': f'无效的分组方式: {group_by}，可选 {"/".join(STATISTICS_GROUPS)}'
+            }, status=400)
+        
+        queryset = rollups.stats_queryset(start_date, end_date, {
+            name: request.GET.get(name, '').strip() for name in rollups.DIMENSIONS
+        })
+        counts = dict(rollups.group_counts(queryset, group_by))
+        
+        if group_by == 'date':
+            days = (end_date - start_date).days + 1
+            keys = [start_date + timedelta(days=offset) for offset in range(days)]
+            labels = {}
+        elif group_by == 'building_name':
+            keys = sorted(counts)
+            labels = {}
+        else:
+            choices = RepairOrder._meta.get_field(group_by).choices
+            keys = [value for value, _ in choices]
+            labels = dict(choices)
+        
+        return ApiResponse({
+            'start_date': start_date,
+            'end_date': end_date,
+            'group_by': group_by,
+            'total': sum(counts.values()),
+            'results': [
+                {'key': key, 'label': labels.get(key, str(key)), 'count': counts.get(key, 0)}
+                for key in keys
+            ]
+        })
+        
+    except ValueError as e:
+        return ApiResponse({'error': str(e)}, status=400)
+    except Exception as e:
+        return ApiResponse({
+            'error': f'获取工单统计失败: {str(e)}'
+        }, status=500)
+
+
 # ========================
 # 学生管理API已移除 - 现在直接使用Django用户系统
 # ========================
@@ -403,7 +920,35 @@ def api_repair_order_detail(request, order_id):
 # 宿舍管理API
 # ========================
 
+def _dormitories_validators(request):
+    """
+    宿舍列表的校验值：查询参数和工单列表的数据版本（一次主键查询）
+
+    宿舍增删改、工单状态变化和报修人改名都会使版本递增，见 signals.bump_orders_version
+    """
+    return _dormitories_etag(request, counters.read_version()), None
+
+
+def _dormitories_etag(request, version):
+    return make_etag('dormitories', query_params(request), version)
+
+
+def _dormitory_validators(request, dormitory_id):
+    """
+    宿舍详情的校验值：宿舍的更新时间和数据版本，宿舍不存在时不做校验
+    """
+    updated_at = Dormitory.objects.filter(id=dormitory_id).values_list('updated_at', flat=True).first()
+    return _dormitory_etag(dormitory_id, updated_at, counters.read_version() if updated_at else None)
+
+
+def _dormitory_etag(dormitory_id, updated_at, version):
+    if updated_at is None:
+        return None, None
+    return make_etag('dormitory', dormitory_id, updated_at, version), None
+
+
 @csrf_exempt
+@conditional_get(_dormitories_validators)
 def api_dormitories(request):
     """
     宿舍管理API - 支持GET(列表)和POST(创建)
@@ -413,7 +958,7 @@ def api_dormitories(request):
     elif request.method == 'POST':
         return _create_dormitory(request)
     else:
-        return JsonResponse({'error': '不支持的请求方法'}, status=405)
+        return ApiResponse({'error': '不支持的请求方法'}, status=405)
 
 
 def _get_dormitories_list(request):
@@ -421,59 +966,129 @@ def _get_dormitories_list(request):
     获取宿舍列表
     """
     try:
-        # 获取查询参数
-        page = int(request.GET.get('page', 1))
-        page_size = int(request.GET.get('page_size', 12))
-        search = request.GET.get('search', '').strip()
-        building_name = request.GET.get('building_name', '').strip()
-        floor = request.GET.get('floor', '').strip()
-        
-        # 获取所有宿舍
-        queryset = Dormitory.objects.all().order_by('building_name', 'room_number')
-        
-        # 应用筛选
-        if search:
-            queryset = queryset.filter(
-                Q(building_name__icontains=search) |
-                Q(room_number__icontains=search)
-            )
+        return ApiResponse(_build_dormitories_page(request))
         
-        if building_name:
-            queryset = queryset.filter(building_name=building_name)
-            
-        if floor:
-            queryset = queryset.filter(floor=int(floor))
-        
-        total_count = queryset.count()
-        start_index = (page - 1) * page_size
-        end_index = start_index + page_size
-        page_dormitories = queryset[start_index:end_index]
-        
-        # 构造返回数据
-        results = []
-        for dormitory in page_dormitories:
-            # 统计报修次数（移除学生统计，因为不再有学生-宿舍关联）
-            repair_count = RepairOrder.objects.filter(dormitory=dormitory).count()
-            
-            results.append({
-                'id': dormitory.id,
-                'building_name': dormitory.building_name,
-                'room_number': dormitory.room_number,
-                'floor': dormitory.floor,
-                'repair_count': repair_count
-            })
-        
-        return JsonResponse({
+    except Exception as e:
+        return ApiResponse({
+            'error': f'获取宿舍列表失败: {str(e)}'
+        }, status=500)
+
+
+def _build_dormitories_page(request):
+    """
+    宿舍列表的响应数据
+    """
+    queryset, page_queryset, build = _dormitories_page(request)
+    page_dormitories = list(page_queryset)
+    # 一次 GROUP BY 查询统计本页所有宿舍的报修次数
+    status_counts = _repair_status_counts([dormitory.id for dormitory in page_dormitories])
+    return build(queryset.count(), page_dormitories, status_counts)
+
+
+def _dormitories_page(request):
+    """
+    解析宿舍列表的查询参数，返回 (筛选后的查询, 本页查询, build)
+    
+    build(总数, 本页宿舍, 报修统计) 生成响应数据，同步和异步视图共用
+    """
+    page = int(request.GET.get('page', 1))
+    page_size = int(request.GET.get('page_size', 12))
+    
+    queryset = _filter_dormitories(Dormitory.objects.all().order_by('building_name', 'room_number'), request.GET)
+    start_index = (page - 1) * page_size
+    end_index = start_index + page_size
+    
+    def build(total_count, page_dormitories, status_counts):
+        return {
             'count': total_count,
             'next': page + 1 if end_index < total_count else None,
             'previous': page - 1 if page > 1 else None,
-            'results': results
-        })
+            'results': [
+                _serialize_dormitory(dormitory, status_counts.get(dormitory.id))
+                for dormitory in page_dormitories
+            ]
+        }
+    
+    return queryset, queryset[start_index:end_index], build
+
+
+def _filter_dormitories(queryset, params):
+    """
+    按列表接口的查询参数（search/building_name/floor）筛选宿舍
+    """
+    search = params.get('search', '').strip()
+    building_name = params.get('building_name', '').strip()
+    floor = params.get('floor', '').strip()
+    
+    if search:
+        queryset = queryset.filter(
+            Q(building_name__icontains=search) |
+            Q(room_number__icontains=search)
+        )
+    
+    if building_name:
+        queryset = queryset.filter(building_name=building_name)
         
-    except Exception as e:
-        return JsonResponse({
-            'error': f'获取宿舍列表失败: {str(e)}'
-        }, status=500)
+    if floor:
+        queryset = queryset.filter(floor=int(floor))
+    
+    return queryset
+
+
+def _serialize_dormitory(dormitory, counts):
+    """
+    宿舍列表项，counts 为该宿舍按状态统计的报修次数
+    """
+    counts = counts or _empty_status_counts()
+    return {
+        'id': dormitory.id,
+        'building_name': dormitory.building_name,
+        'room_number': dormitory.room_number,
+        'floor': dormitory.floor,
+        'repair_count': sum(counts.values()),
+        'repair_status_counts': counts
+    }
+
+
+def _serialize_recent_repair(order):
+    return {
+        'id': order.id,
+        'order_number': order.order_number,
+        'title': order.title,
+        'status': order.status,
+        'student_name': f"{order.user.first_name} {order.user.last_name}".strip() or order.user.username,
+        'created_at': order.created_at
+    }
+
+
+def _empty_status_counts():
+    return {status: 0 for status, _ in RepairOrder.STATUS_CHOICES}
+
+
+def _repair_status_counts(dormitory_ids):
+    """
+    按宿舍和状态分组统计报修次数
+    
+    返回 {dormitory_id: {'pending': n, 'processing': n, ...}}，
+    无论传入多少宿舍都只执行一次查询
+    """
+    if not dormitory_ids:
+        return {}
+    return _group_status_counts(_repair_status_rows(dormitory_ids))
+
+
+def _repair_status_rows(dormitory_ids):
+    return RepairOrder.objects.filter(
+        dormitory_id__in=dormitory_ids
+    ).order_by().values('dormitory_id', 'status').annotate(total=Count('id'))
+
+
+def _group_status_counts(rows):
+    counts = {}
+    for row in rows:
+        bucket = counts.setdefault(row['dormitory_id'], _empty_status_counts())
+        bucket[row['status']] = bucket.get(row['status'], 0) + row['total']
+    return counts
 
 
 def _create_dormitory(request):
@@ -488,7 +1103,7 @@ def _create_dormitory(request):
             building_name=data['building_name'],
             room_number=data['room_number']
         ).exists():
-            return JsonResponse({'error': '宿舍已存在'}, status=400)
+            return ApiResponse({'error': '宿舍已存在'}, status=400)
         
         # 创建宿舍
         dormitory = Dormitory.objects.create(
@@ -497,7 +1112,7 @@ def _create_dormitory(request):
             floor=data['floor']
         )
         
-        return JsonResponse({
+        return ApiResponse({
             'message': '宿舍创建成功',
             'data': {
                 'id': dormitory.id,
@@ -507,41 +1122,167 @@ def _create_dormitory(request):
         }, status=201)
         
     except Exception as e:
-        return JsonResponse({
+        return ApiResponse({
             'error': f'创建宿舍失败: {str(e)}'
         }, status=500)
 
 
 @csrf_exempt
+@require_http_methods(["POST"])
+def api_dormitories_bulk(request):
+    """
+    批量开通宿舍API
+    
+    支持三种输入（dry_run=true 时只校验不写入）：
+    - {"building_name": "1号楼", "floors": "1-20", "rooms": "1-40", "room_format": "{floor}{room:02d}"}
+    - {"dormitories": [{"building_name": ..., "room_number": ..., "floor": ...}, ...]}
+    - {"csv": "building_name,room_number,floor\\n..."} 或 multipart 上传的 file 字段
+    
+    仅管理员可用
+    """
+    try:
+        if not request.user.is_authenticated:
+            return ApiResponse({'error': '用户未登录'}, status=401)
+        if not request.user.is_staff:
+            return ApiResponse({'error': '没有权限'}, status=403)
+        
+        if request.FILES.get('file'):
+            data = request.POST
+            rows = parse_dormitory_csv(request.FILES['file'].read().decode('utf-8'))
+        else:
+            data = json.loads(request.body)
+            if not isinstance(data, dict):
+                return ApiResponse({'error': '请求数据格式错误'}, status=400)
+            if data.get('csv'):
+                if not isinstance(data['csv'], str):
+                    return ApiResponse({'error': 'csv 必须是字符串'}, status=400)
+                rows = parse_dormitory_csv(data['csv'])
+            elif data.get('dormitories') is not None:
+                rows = data['dormitories']
+            elif data.get('building_name') and data.get('floors') and data.get('rooms'):
+                rows = expand_room_spec(
+                    data['building_name'], data['floors'], data['rooms'],
+                    data.get('room_format') or DEFAULT_ROOM_FORMAT
+                )
+            else:
+                return ApiResponse({'error': '请提供CSV、宿舍列表或楼层房间范围'}, status=400)
+        
+        dry_run = str(data.get('dry_run', '')).lower() in ('1', 'true')
+        result = provision_dormitories(rows, dry_run=dry_run)
+        
+        return ApiResponse({
+            'message': '校验完成' if dry_run else '批量开通完成',
+            'created': result['created'],
+            'skipped': result['skipped'],
+            'errors': result['errors']
+        }, status=200 if dry_run else 201)
+        
+    except ProvisioningError as e:
+        return ApiResponse({'error': str(e)}, status=400)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return ApiResponse({'error': '请求数据格式错误'}, status=400)
+    except Exception as e:
+        return ApiResponse({
+            'error': f'批量开通宿舍失败: {str(e)}'
+        }, status=500)
+
+
+@csrf_exempt
+@require_http_methods(["GET"])
+def api_dormitories_statistics(request):
+    """
+    宿舍统计API - 各楼栋的宿舍数、楼层数和历史报修数（按状态）
+    
+    宿舍数直接统计宿舍表，报修数读取每日汇总；传入 start_date/end_date 时只统计该范围内创建的工单
+    """
+    try:
+        if request.GET.get('start_date') or request.GET.get('end_date'):
+            start_date, end_date = _statistics_date_range(request.GET)
+            queryset = rollups.stats_queryset(start_date, end_date)
+        else:
+            queryset = rollups.stats_queryset(None, None)
+        
+        buildings = {
+            row['building_name']: {
+                'building_name': row['building_name'],
+                'dormitories': row['dormitories'],
+                'floors': row['floors'],
+                'orders': 0,
+                **_empty_status_counts(),
+            }
+            for row in Dormitory.objects.order_by('building_name').values('building_name').annotate(
+                dormitories=Count('id'), floors=Count('floor', distinct=True)
+            )
+        }
+        rows = queryset.order_by().values('building_name', 'status').annotate(total=Sum('order_count'))
+        for row in rows:
+            # 已删除宿舍的历史工单也计入其楼栋
+            bucket = buildings.setdefault(row['building_name'], {
+                'building_name': row['building_name'], 'dormitories': 0, 'floors': 0,
+                'orders': 0, **_empty_status_counts(),
+            })
+            bucket[row['status']] += row['total']
+            bucket['orders'] += row['total']
+        
+        results = sorted(buildings.values(), key=lambda item: item['building_name'])
+        return ApiResponse({
+            'total_buildings': len(results),
+            'total_dormitories': sum(item['dormitories'] for item in results),
+            'total_orders': sum(item['orders'] for item in results),
+            'buildings': results
+        })
+        
+    except ValueError as e:
+        return ApiResponse({'error': str(e)}, status=400)
+    except Exception as e:
+        return ApiResponse({
+            'error': f'获取宿舍统计失败: {str(e)}'
+        }, status=500)
+
+
+def _serialize_dormitory_detail(dormitory, repair_list, counts):
+    """
+    宿舍详情，repair_list 为最近的报修记录
+    """
+    counts = counts or _empty_status_counts()
+    return {
+        'id': dormitory.id,
+        'building_name': dormitory.building_name,
+        'room_number': dormitory.room_number,
+        'floor': dormitory.floor,
+        'recent_repairs': repair_list,
+        'repair_count': sum(counts.values()),
+        'repair_status_counts': counts
+    }
+
+
+def _build_dormitory_detail(dormitory_id):
+    """
+    宿舍详情的响应数据，宿舍不存在时抛出 Dormitory.DoesNotExist
+    """
+    dormitory = Dormitory.objects.get(id=dormitory_id)
+    # 获取该宿舍的报修记录
+    repair_orders = RepairOrder.objects.filter(dormitory=dormitory).select_related('user')
+    counts = _repair_status_counts([dormitory.id]).get(dormitory.id)
+    repair_list = [
+        _serialize_recent_repair(order) for order in repair_orders[:10]  # 只显示最近10条
+    ]
+    return _serialize_dormitory_detail(dormitory, repair_list, counts)
+
+
+@csrf_exempt
+@conditional_get(_dormitory_validators)
 def api_dormitory_detail(request, dormitory_id):
     """
     宿舍详情API - 支持GET(详情)、PUT/PATCH(更新)、DELETE(删除)
     """
     try:
+        if request.method == 'GET':
+            return ApiResponse(_build_dormitory_detail(dormitory_id))
+        
         dormitory = Dormitory.objects.get(id=dormitory_id)
         
-        if request.method == 'GET':
-            # 获取该宿舍的报修记录
-            repair_orders = RepairOrder.objects.filter(dormitory=dormitory).select_related('user')
-            repair_list = [{
-                'id': order.id,
-                'order_number': order.order_number,
-                'title': order.title,
-                'status': order.status,
-                'student_name': f"{order.user.first_name} {order.user.last_name}".strip() or order.user.username,
-                'created_at': order.created_at.isoformat()
-            } for order in repair_orders[:10]]  # 只显示最近10条
-            
-            return JsonResponse({
-                'id': dormitory.id,
-                'building_name': dormitory.building_name,
-                'room_number': dormitory.room_number,
-                'floor': dormitory.floor,
-                'recent_repairs': repair_list,
-                'repair_count': repair_orders.count()
-            })
-            
-        elif request.method in ['PUT', 'PATCH']:
+        if request.method in ['PUT', 'PATCH']:
             data = json.loads(request.body)
             
             # 更新字段
@@ -554,7 +1295,7 @@ def api_dormitory_detail(request, dormitory_id):
                     
             dormitory.save()
             
-            return JsonResponse({
+            return ApiResponse({
                 'message': '宿舍信息更新成功',
                 'data': {
                     'id': dormitory.id,
@@ -566,14 +1307,14 @@ def api_dormitory_detail(request, dormitory_id):
         elif request.method == 'DELETE':
             # 检查是否有未完成的报修工单
             if RepairOrder.objects.filter(dormitory=dormitory, status__in=['pending', 'processing']).exists():
-                return JsonResponse({'error': '宿舍有未完成的报修工单，无法删除'}, status=400)
+                return ApiResponse({'error': '宿舍有未完成的报修工单，无法删除'}, status=400)
             
             dormitory.delete()
-            return JsonResponse({'message': '宿舍删除成功'})
+            return ApiResponse({'message': '宿舍删除成功'})
             
     except Dormitory.DoesNotExist:
-        return JsonResponse({'error': '宿舍不存在'}, status=404)
+        return ApiResponse({'error': '宿舍不存在'}, status=404)
     except Exception as e:
-        return JsonResponse({
+        return ApiResponse({
             'error': f'操作失败: {str(e)}'
         }, status=500)
@@ -10,7 +10,15 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 import os
 
 from django.core.asgi import get_asgi_application
+from django.core.handlers.asgi import ASGIRequest
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'myproject.settings')
 
+
+class AsyncApiRequest(ASGIRequest):
+    # 使用异步读接口的路由（myproject/asgi_urls.py）
+    urlconf = 'myproject.asgi_urls'
+
+
 application = get_asgi_application()
+application.request_class = AsyncApiRequest
@@ -0,0 +1,11 @@
+"""
+ASGI 部署的根路由：/api/ 使用 dormitory_repair 的异步读接口，其余与 urls.py 相同
+"""
+from django.urls import include, path
+
+from .urls import urlpatterns as sync_urlpatterns
+
+urlpatterns = [
+    path('api/', include('dormitory_repair.async_urls')),
+    *sync_urlpatterns,
+]
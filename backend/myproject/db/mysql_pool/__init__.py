@@ -0,0 +1,18 @@
+"""
+带连接池的 MySQL 数据库后端
+
+用法（settings.DATABASES）:
+    'ENGINE': 'myproject.db.mysql_pool',
+    'OPTIONS': {
+        'charset': 'utf8mb4',
+        'pool': {
+            'max_size': 20,            # 每个进程最多打开的连接数
+            'timeout': 10,             # 连接全部占用时等待的秒数，超时抛 OperationalError
+            'max_lifetime': 1800,      # 连接使用多少秒后回收重建
+            'health_check_idle': 1,    # 空闲超过多少秒的连接在复用前先 ping 一次
+            'max_checkout': None,      # 连接取出超过多少秒视为泄漏、让出名额（默认不限）
+        },
+    },
+
+需要保持 CONN_MAX_AGE = 0：请求结束时 Django 关闭连接，这里改为归还到池中。
+"""
@@ -0,0 +1,82 @@
+"""
+MySQL 后端：连接从进程内连接池取出，close() 时归还而不是断开
+"""
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.mysql.base import Database, DatabaseWrapper as MySQLDatabaseWrapper
+
+from .pool import ConnectionPool, PoolTimeout, get_pool
+
+
+POOL_DEFAULTS = {
+    'max_size': 20,
+    'timeout': 10,
+    'max_lifetime': 1800,
+    'health_check_idle': 1,
+    'max_checkout': None,
+}
+
+
+class DatabaseWrapper(MySQLDatabaseWrapper):
+
+    # 置为 False 时直接建立/断开连接，不占用连接池名额（用于持锁期间的短连接，如领取工单号段）
+    pooled = True
+
+    def __init__(self, settings_dict, alias=None):
+        super().__init__(settings_dict, alias)
+        unknown = set(self.pool_options) - set(POOL_DEFAULTS)
+        if unknown:
+            raise ImproperlyConfigured(f"未知的连接池参数: {', '.join(sorted(unknown))}")
+        if settings_dict.get('CONN_MAX_AGE'):
+            raise ImproperlyConfigured('使用连接池时 CONN_MAX_AGE 必须为 0，连接由连接池复用')
+
+    @property
+    def pool_options(self):
+        return self.settings_dict['OPTIONS'].get('pool') or {}
+
+    @property
+    def pool(self):
+        return get_pool(self.alias, self._create_pool)
+
+    def _create_pool(self):
+        conn_params = self.get_connection_params()
+        options = {**POOL_DEFAULTS, **self.pool_options}
+        return ConnectionPool(
+            connect=lambda: MySQLDatabaseWrapper.get_new_connection(self, conn_params),
+            ping=lambda conn: conn.ping(False),
+            close=lambda conn: conn.close(),
+            **options,
+        )
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        params.pop('pool', None)
+        return params
+
+    def get_new_connection(self, conn_params):
+        if not self.pooled:
+            return super().get_new_connection(conn_params)
+        try:
+            return self.pool.acquire()
+        except PoolTimeout as e:
+            # 由 wrap_database_errors 转换为 django.db.OperationalError
+            raise Database.OperationalError(str(e)) from e
+
+    def _close(self):
+        if self.connection is None:
+            return
+        if not self.pooled:
+            return super()._close()
+        connection = self.connection
+        discard = False
+        if self.in_atomic_block:
+            # 事务中途关闭时包装器仍引用该连接，不能交给其他线程
+            discard = True
+        elif self.errors_occurred and not self.is_usable():
+            discard = True
+        elif not self.get_autocommit():
+            try:
+                connection.rollback()
+            except Exception:
+                discard = True
+        with self.wrap_database_errors:
+            self.pool.release(connection, discard=discard)
@@ -0,0 +1,242 @@
+"""
+进程内的数据库连接池
+
+与具体驱动无关：connect() 创建新连接，ping(conn) 检查连接是否可用，
+close(conn) 关闭连接，均由 base.DatabaseWrapper 提供。
+
+连接应由取出它的线程在用完后归还（Django 在请求结束时关闭连接即归还）。连接池满时会先回收
+泄漏的连接再等待：
+    - 取出连接的线程已经结束：该连接不会再被使用，直接关闭
+    - 设置了 max_checkout 且取出超过该秒数：不再计入连接数，让出名额；原线程之后归还时关闭
+仍然取不到连接时抛出 PoolTimeout，错误信息中列出占用时间最长的连接及其线程。
+"""
+import os
+import threading
+import time
+from collections import deque
+
+
+class PoolTimeout(Exception):
+    """等待可用连接超时"""
+
+
+class ConnectionPool:
+    def __init__(self, connect, ping, close, max_size=20, timeout=10, max_lifetime=1800, health_check_idle=1,
+                 max_checkout=None):
+        self._connect = connect
+        self._ping = ping
+        self._close = close
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.health_check_idle = health_check_idle
+        self.max_checkout = max_checkout
+
+        self._lock = threading.Condition()
+        # 空闲连接 (conn, 创建时间, 归还时间)，后进先出，优先复用刚用过的连接
+        self._idle = deque()
+        # 连接 -> 创建时间
+        self._created = {}
+        # 使用中的连接 -> (取出的线程, 取出时间)
+        self._checkouts = {}
+        self._opening = 0
+        self._waiting = 0
+        self._stats = dict.fromkeys([
+            'checkouts', 'reused', 'opened', 'closed', 'recycled',
+            'health_check_failures', 'timeouts', 'reclaimed', 'wait_total',
+        ], 0)
+        self._stats['wait_max'] = 0
+
+    @property
+    def size(self):
+        return len(self._created) + self._opening
+
+    def acquire(self):
+        """取出一个可用连接，必要时新建；连接数已满时最多等待 timeout 秒"""
+        started = time.monotonic()
+        deadline = started + self.timeout
+        while True:
+            with self._lock:
+                conn = self._take_idle(deadline)
+                if conn is None:
+                    self._opening += 1
+                waited = time.monotonic() - started
+                self._stats['checkouts'] += 1
+                self._stats['wait_total'] += waited
+                self._stats['wait_max'] = max(self._stats['wait_max'], waited)
+
+            if conn is None:
+                return self._open()
+
+            conn, returned_at = conn
+            if self.health_check_idle is not None and time.monotonic() - returned_at >= self.health_check_idle:
+                if not self._is_alive(conn):
+                    with self._lock:
+                        self._stats['health_check_failures'] += 1
+                        self._stats['checkouts'] -= 1
+                    self._discard(conn)
+                    continue
+            with self._lock:
+                self._stats['reused'] += 1
+                self._check_out(conn)
+            return conn
+
+    def _check_out(self, conn):
+        self._checkouts[id(conn)] = (threading.current_thread(), time.monotonic())
+
+    def _take_idle(self, deadline):
+        """在锁内调用：返回 (conn, 归还时间)；返回 None 表示调用方可以新建连接"""
+        while True:
+            while self._idle:
+                conn, created_at, returned_at = self._idle.pop()
+                if self._expired(created_at):
+                    self._created.pop(id(conn), None)
+                    self._stats['recycled'] += 1
+                    self._close_quietly(conn)
+                    continue
+                return conn, returned_at
+            if self.size < self.max_size:
+                return None
+            if self._reclaim():
+                continue
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self._stats['timeouts'] += 1
+                raise PoolTimeout(self._timeout_message())
+            self._waiting += 1
+            try:
+                self._lock.wait(remaining)
+            finally:
+                self._waiting -= 1
+
+    def _open(self):
+        try:
+            conn = self._connect()
+        except BaseException:
+            with self._lock:
+                self._opening -= 1
+                self._lock.notify()
+            raise
+        with self._lock:
+            self._opening -= 1
+            self._created[id(conn)] = (conn, time.monotonic())
+            self._stats['opened'] += 1
+            self._check_out(conn)
+        return conn
+
+    def _reclaim(self):
+        """
+        在锁内调用：回收线程已结束、或取出超过 max_checkout 秒的连接，返回回收的数量
+        """
+        now = time.monotonic()
+        reclaimed = 0
+        for key, (thread, checked_out_at) in list(self._checkouts.items()):
+            dead = not thread.is_alive()
+            if not dead and (self.max_checkout is None or now - checked_out_at < self.max_checkout):
+                continue
+            del self._checkouts[key]
+            conn, _ = self._created.pop(key)
+            if dead:
+                # 线程已结束，连接不会再被使用
+                self._close_quietly(conn)
+            # 仍在使用的连接不能从其他线程关闭，原线程归还时发现不属于本池，直接关闭
+            self._stats['reclaimed'] += 1
+            reclaimed += 1
+        return reclaimed
+
+    def _timeout_message(self):
+        now = time.monotonic()
+        holders = sorted(self._checkouts.values(), key=lambda item: item[1])[:3]
+        detail = '，'.join(f'{thread.name} 已占用 {now - checked_out_at:.1f} 秒' for thread, checked_out_at in holders)
+        return (
+            f'{self.timeout} 秒内没有可用的数据库连接（连接池上限 {self.max_size}，使用中 {len(self._checkouts)}'
+            f'{"：" + detail if detail else ""}）。请确认在请求之外取得的连接用完后已关闭'
+        )
+
+    def release(self, conn, discard=False):
+        """归还连接；discard=True 或超过 max_lifetime 时直接关闭"""
+        with self._lock:
+            entry = self._created.get(id(conn))
+            if entry is not None and entry[0] is conn:
+                self._checkouts.pop(id(conn), None)
+            if entry is None or entry[0] is not conn:
+                # 不是本池的连接（如池被重建），直接关闭
+                self._close_quietly(conn)
+                return
+            created_at = entry[1]
+            if discard or self._expired(created_at):
+                del self._created[id(conn)]
+                self._stats['recycled' if not discard else 'closed'] += 1
+                self._close_quietly(conn)
+            else:
+                self._idle.append((conn, created_at, time.monotonic()))
+            self._lock.notify()
+
+    def _discard(self, conn):
+        with self._lock:
+            self._created.pop(id(conn), None)
+            self._checkouts.pop(id(conn), None)
+            self._stats['closed'] += 1
+            self._close_quietly(conn)
+            self._lock.notify()
+
+    def _expired(self, created_at):
+        return self.max_lifetime is not None and time.monotonic() - created_at >= self.max_lifetime
+
+    def _is_alive(self, conn):
+        try:
+            self._ping(conn)
+            return True
+        except Exception:
+            return False
+
+    def _close_quietly(self, conn):
+        try:
+            self._close(conn)
+        except Exception:
+            pass
+
+    def close_all(self):
+        """关闭全部空闲连接（正在使用的连接归还时再关闭）"""
+        with self._lock:
+            while self._idle:
+                conn, _, _ = self._idle.pop()
+                self._created.pop(id(conn), None)
+                self._stats['closed'] += 1
+                self._close_quietly(conn)
+
+    def stats(self):
+        with self._lock:
+            idle = len(self._idle)
+            return {
+                'max_size': self.max_size,
+                'size': self.size,
+                'idle': idle,
+                'in_use': self.size - idle,
+                'waiting': self._waiting,
+                **self._stats,
+                'wait_total': round(self._stats['wait_total'], 6),
+                'wait_max': round(self._stats['wait_max'], 6),
+            }
+
+
+# (alias, pid) -> ConnectionPool；按进程区分，fork 出的子进程不会共用父进程的连接
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(alias, factory):
+    key = (alias, os.getpid())
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                pool = _pools[key] = factory()
+    return pool
+
+
+def pool_stats():
+    """当前进程中各数据库别名的连接池统计"""
+    pid = os.getpid()
+    return {alias: pool.stats() for (alias, owner), pool in list(_pools.items()) if owner == pid}
@@ -0,0 +1,121 @@
+"""
+读写分离
+
+- 写操作（以及 select_for_update）始终走主库 default
+- 读操作随机分到 settings.DATABASE_REPLICAS 中的只读副本，同一请求内固定使用同一个副本
+- 以下情况读主库：
+  * 没有配置副本
+  * 当前处于主库事务中（事务内要看到自己刚写入的数据）
+  * 非 GET/HEAD/OPTIONS 请求
+  * 用户在 REPLICA_PIN_SECONDS 秒内发生过写操作（由 read_your_writes_middleware 用 Cookie 记录），
+    避免副本延迟导致刚提交的工单在列表中"消失"
+  * DATABASE_PRIMARY_ONLY_APPS 中的应用（如 sessions，登录后立即要读到新会话）
+"""
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.utils.decorators import sync_and_async_middleware
+
+
+PIN_COOKIE = 'db_primary_until'
+
+# 本次请求（或代码块）是否固定读主库
+_pinned = ContextVar('db_pinned_to_primary', default=False)
+# 本次请求选中的副本
+_replica = ContextVar('db_replica', default=None)
+# 本次请求是否发生过写操作
+_wrote = ContextVar('db_wrote', default=False)
+
+
+def replicas():
+    return getattr(settings, 'DATABASE_REPLICAS', [])
+
+
+@contextmanager
+def use_primary():
+    """代码块内的读操作走主库"""
+    token = _pinned.set(True)
+    try:
+        yield
+    finally:
+        _pinned.reset(token)
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        aliases = replicas()
+        if not aliases or _pinned.get():
+            return DEFAULT_DB_ALIAS
+        if model._meta.app_label in getattr(settings, 'DATABASE_PRIMARY_ONLY_APPS', ()):
+            return DEFAULT_DB_ALIAS
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return _replica.get() or random.choice(aliases)
+
+    def db_for_write(self, model, **hints):
+        _wrote.set(True)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # 副本与主库数据相同，跨库关联的对象实际是同一份数据
+        databases = {DEFAULT_DB_ALIAS, *replicas()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # 副本通过数据库复制同步结构，不单独迁移
+        if db in replicas():
+            return False
+        return None
+
+
+def _pinned_by_cookie(request):
+    try:
+        return float(request.COOKIES.get(PIN_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+def _begin(request):
+    aliases = replicas()
+    pinned = request.method not in ('GET', 'HEAD', 'OPTIONS') or _pinned_by_cookie(request)
+    return (
+        _pinned.set(pinned),
+        _replica.set(random.choice(aliases) if aliases else None),
+        _wrote.set(False),
+    )
+
+
+def _finish(request, response, tokens):
+    wrote = _wrote.get()
+    for var, token in zip((_pinned, _replica, _wrote), tokens):
+        var.reset(token)
+    if replicas() and (wrote or request.method not in ('GET', 'HEAD', 'OPTIONS')):
+        seconds = getattr(settings, 'REPLICA_PIN_SECONDS', 5)
+        response.set_cookie(
+            PIN_COOKIE, f'{time.time() + seconds:.3f}', max_age=seconds, httponly=True, samesite='Lax'
+        )
+    return response
+
+
+@sync_and_async_middleware
+def read_your_writes_middleware(get_response):
+    """
+    用户写入后的 REPLICA_PIN_SECONDS 秒内，其读请求固定走主库
+    """
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            tokens = _begin(request)
+            return _finish(request, await get_response(request), tokens)
+    else:
+        def middleware(request):
+            tokens = _begin(request)
+            return _finish(request, get_response(request), tokens)
+    return middleware
@@ -0,0 +1,154 @@
+"""
+项目级中间件
+"""
+import zlib
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.text import compress_string
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - 取决于部署环境
+    brotli = None
+
+
+# 已经压缩过（或压缩收益很小）的内容类型前缀
+DEFAULT_SKIP_TYPES = (
+    'image/', 'video/', 'audio/', 'font/woff',
+    'application/zip', 'application/gzip', 'application/x-gzip', 'application/x-7z-compressed',
+    'application/x-rar-compressed', 'application/pdf', 'application/octet-stream',
+)
+
+
+def parse_accept_encoding(header):
+    """
+    解析 Accept-Encoding，返回 {编码: q值}
+    """
+    encodings = {}
+    for part in header.split(','):
+        name, _, params = part.partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        for param in params.split(';'):
+            key, _, value = param.partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        encodings[name] = quality
+    return encodings
+
+
+def _gzip_stream(level):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    # 每块都 SYNC_FLUSH，客户端收到一块即可解压一块
+    return lambda data: compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH), compressor.flush
+
+
+def _brotli_stream(quality):
+    compressor = brotli.Compressor(quality=quality)
+    return lambda data: compressor.process(data) + compressor.flush(), compressor.finish
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    按 Accept-Encoding 协商 br / gzip 压缩响应
+
+    - 普通响应小于 COMPRESSION_MIN_SIZE 字节、或压缩后没有变小时不压缩
+    - 流式响应（如工单导出）逐块压缩并立即输出，不等待全部内容
+    - 图片、压缩包等已压缩的类型（COMPRESSION_SKIP_TYPES）以及带 Cache-Control: no-transform 的响应跳过
+    - 压缩后强 ETag 改为弱 ETag，条件请求仍可命中
+    - text/html 页面含 CSRF 令牌，只用 gzip，并像 Django 的 GZipMiddleware 一样在
+      gzip 头中加入随机长度的填充（Heal The Breach），缓解 BREACH 攻击；
+      brotli 需要安装 brotli 包，用于 JSON 等其他类型
+    """
+
+    max_random_bytes = 100
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.min_size = getattr(settings, 'COMPRESSION_MIN_SIZE', 1024)
+        self.gzip_level = getattr(settings, 'COMPRESSION_GZIP_LEVEL', 6)
+        self.brotli_quality = getattr(settings, 'COMPRESSION_BROTLI_QUALITY', 5)
+        self.skip_types = tuple(getattr(settings, 'COMPRESSION_SKIP_TYPES', DEFAULT_SKIP_TYPES))
+
+    def process_response(self, request, response):
+        if response.has_header('Content-Encoding'):
+            return response
+        if not response.streaming and len(response.content) < self.min_size:
+            return response
+        content_type = response.get('Content-Type', '').split(';')[0].strip().lower()
+        if content_type.startswith(self.skip_types):
+            return response
+        if 'no-transform' in response.get('Cache-Control', ''):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+
+        encoding = self.choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''), content_type)
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            response.streaming_content = self.compress_stream(response, encoding)
+            # 压缩后的长度要等流结束才知道
+            del response.headers['Content-Length']
+        else:
+            compressed = self.compress(response.content, encoding)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(compressed))
+
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+    def choose_encoding(self, accept_encoding, content_type):
+        accepted = parse_accept_encoding(accept_encoding)
+        candidates = ['gzip']
+        if brotli is not None and content_type != 'text/html':
+            candidates.insert(0, 'br')
+        best, best_quality = None, 0.0
+        for encoding in candidates:
+            quality = accepted.get(encoding, accepted.get('*', 0.0))
+            # q 值相同时按 candidates 顺序优先 br
+            if quality > best_quality:
+                best, best_quality = encoding, quality
+        return best
+
+    def compress(self, content, encoding):
+        if encoding == 'br':
+            return brotli.compress(content, quality=self.brotli_quality)
+        return compress_string(content, max_random_bytes=self.max_random_bytes)
+
+    def compress_stream(self, response, encoding):
+        if encoding == 'br':
+            process, finish = _brotli_stream(self.brotli_quality)
+        else:
+            process, finish = _gzip_stream(self.gzip_level)
+        # 先取出原迭代器，避免之后 streaming_content 被替换时引用到自身
+        content = response.streaming_content
+
+        if response.is_async:
+            async def compressed():
+                async for chunk in content:
+                    data = process(chunk)
+                    if data:
+                        yield data
+                yield finish()
+        else:
+            def compressed():
+                for chunk in content:
+                    data = process(chunk)
+                    if data:
+                        yield data
+                yield finish()
+        return compressed()
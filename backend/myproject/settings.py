@@ -49,11 +49,14 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',  # CORS 中间件，必须放在最前面
+    'myproject.middleware.CompressionMiddleware',  # gzip/br 压缩，需在修改响应内容的中间件之前
     'django.middleware.security.SecurityMiddleware',
+    'myproject.db_routers.read_your_writes_middleware',  # 写操作后短时间内读主库
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'dormitory_repair.tokens.bearer_token_middleware',  # API 令牌认证，需在 AuthenticationMiddleware 之后
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -86,7 +89,8 @@ pymysql.install_as_MySQLdb()
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.mysql',
+        # MySQL + 进程内连接池（myproject/db/mysql_pool），请求结束时连接归还池中复用
+        'ENGINE': 'myproject.db.mysql_pool',
         'NAME': 'myproject',
         'USER': 'root',
         'PASSWORD': '123456',
@@ -94,9 +98,86 @@ DATABASES = {
         'PORT': '3306',
         'OPTIONS': {
             'charset': 'utf8mb4',
+            'pool': {
+                'max_size': 20,
+                'timeout': 10,
+                'max_lifetime': 1800,
+                'health_check_idle': 1,
+            },
         },
     }
 }
+# 只读副本：DATABASE_REPLICA_HOSTS 为逗号分隔的 host[:port] 列表，其余连接参数与主库相同
+DATABASE_REPLICAS = []
+for index, replica in enumerate(filter(None, os.environ.get('DATABASE_REPLICA_HOSTS', '').split(',')), start=1):
+    host, _, port = replica.strip().partition(':')
+    DATABASES[f'replica{index}'] = {
+        **DATABASES['default'],
+        'HOST': host,
+        'PORT': port or DATABASES['default']['PORT'],
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(f'replica{index}')
+
+# 读操作分到副本，写操作和事务内的读走主库（见 myproject/db_routers.py）
+DATABASE_ROUTERS = ['myproject.db_routers.ReplicaRouter']
+# 始终读主库的应用
+DATABASE_PRIMARY_ONLY_APPS = ['sessions']
+# 用户写入后多少秒内其读请求仍走主库，应大于副本的复制延迟
+REPLICA_PIN_SECONDS = 5
+
+# 工单号分配器（见 dormitory_repair/order_numbers.py）
+REPAIR_ORDER_NUMBER_ALLOCATOR = 'dormitory_repair.order_numbers.BlockSequenceAllocator'
+# 每个进程一次领取的号段大小
+REPAIR_ORDER_NUMBER_BLOCK_SIZE = 50
+# TimestampNodeAllocator 的节点号（0-99），每个进程必须不同
+REPAIR_ORDER_NUMBER_NODE = int(os.environ.get('REPAIR_ORDER_NUMBER_NODE', 0))
+
+
+# 响应压缩（myproject/middleware.py）：小于该字节数的响应不压缩
+COMPRESSION_MIN_SIZE = 1024
+COMPRESSION_GZIP_LEVEL = 6
+# brotli 压缩等级（0-11），需要安装 brotli 包
+COMPRESSION_BROTLI_QUALITY = 5
+
+# 列表总数统计（dormitory_repair/counting.py）：exact / estimate / cached
+# 报修工单后台列表页的分页总数
+REPAIR_ORDER_ADMIN_COUNT_MODE = 'estimate'
+# 工单列表API未传 ?count= 时的方式（另可为 none）
+REPAIR_ORDER_API_COUNT_MODE = 'exact'
+# 估算值小于该行数时改为精确统计
+COUNT_ESTIMATE_THRESHOLD = 1000
+# cached 方式的缓存秒数
+COUNT_CACHE_TTL = 60
+
+# API 令牌（dormitory_repair/tokens.py）：access / refresh 令牌有效期（秒）
+API_ACCESS_TOKEN_LIFETIME = 15 * 60
+API_REFRESH_TOKEN_LIFETIME = 7 * 24 * 3600
+# 令牌认证使用的进程内用户缓存：最多缓存的用户数、缓存有效期（秒）
+API_TOKEN_USER_CACHE_SIZE = 1024
+API_TOKEN_USER_CACHE_TTL = 60
+
+# 维修员自动分配（dormitory_repair/assignment.py）：维修员所在的用户组，该组不存在时为全部员工用户
+REPAIR_WORKER_GROUP = '维修员'
+# 每个维修员最多的未完成工单数，达到后不再自动分配
+REPAIR_WORKER_MAX_OPEN_ORDERS = 20
+# 进程内负载索引每隔多少秒从数据库重建（纳入其他进程的修改）
+REPAIR_ASSIGNMENT_REFRESH = 300
+
+# 缓存：default 为进程内缓存；shared 为各进程共享的数据库缓存（部署时执行 python manage.py createcachetable）
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'django_shared_cache',
+    },
+}
+# 后台分批执行的 admin action（simpleui AjaxAdmin）的任务状态，须为共享缓存
+SIMPLEUI_BACKGROUND_CACHE = 'shared'
+# 执行中的任务超过该秒数没有进度即判定失败（执行的进程已退出）
+SIMPLEUI_BACKGROUND_JOB_STALE = 15 * 60
 
 
 # Password validation
@@ -1,12 +1,67 @@
 import json
 import logging
+import threading
+import time
 import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 
+from django.conf import settings
 from django.contrib import admin
 from django.contrib.admin import ListFilter
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+from django.db import close_old_connections, connections, transaction
 from django.db.models import Q
 from django.http import JsonResponse, HttpResponseRedirect
-from django.urls import path
+from django.urls import path, reverse
+
+# 后台执行的action（见 AjaxAdmin.run_in_background）
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'SIMPLEUI_BACKGROUND_WORKERS', 2),
+                thread_name_prefix='simpleui-action'
+            )
+        return _executor
+
+
+class JobAbandoned(Exception):
+    """后台任务已被判定中断或已过期"""
+
+
+def _job_key(job_id):
+    return 'simpleui:action-job:{}'.format(job_id)
+
+
+def get_job_cache():
+    """
+    保存后台任务状态的缓存（SIMPLEUI_BACKGROUND_CACHE，默认 default）
+    多进程部署时必须是各进程共享的缓存（数据库、Redis、Memcached等），进程内缓存只对启动任务的进程可见
+    """
+    return caches[getattr(settings, 'SIMPLEUI_BACKGROUND_CACHE', DEFAULT_CACHE_ALIAS)]
+
+
+def get_job(job_id):
+    job = get_job_cache().get(_job_key(job_id))
+    if job is not None and job["status"] == "running" and time.time() - job["updated"] > getattr(
+            settings, 'SIMPLEUI_BACKGROUND_JOB_STALE', 15 * 60):
+        # 执行任务的进程重启或退出后不会再更新进度，超时未更新即判定失败，避免一直显示执行中
+        job["status"] = "error"
+        job["msg"] = "{}: 处理{}条后中断（执行任务的进程已退出或长时间无进度）".format(
+            job["description"], job["processed"])
+        save_job(job)
+    return job
+
+
+def save_job(job):
+    job["updated"] = time.time()
+    get_job_cache().set(_job_key(job['id']), job, getattr(settings, 'SIMPLEUI_BACKGROUND_JOB_TTL', 24 * 3600))
 
 
 class AjaxAdmin(admin.ModelAdmin):
@@ -128,6 +183,9 @@ class AjaxAdmin(admin.ModelAdmin):
         if hasattr(self, action):
             func, action, description = self.get_action(action)
             qs = self._get_queryset(request)
+            # 选择全部且action声明了background时，转到后台分批执行，请求立即返回
+            if getattr(func, "background", False) and post.get("select_across") not in (None, "", "0"):
+                return self.run_in_background(request, func, action, description, qs)
             r = func(self, request, qs)
             if r is None:
                 return JsonResponse(data={
@@ -147,6 +205,92 @@ class AjaxAdmin(admin.ModelAdmin):
                 logging.warning(f"action {action} return type is {type(r)}")
                 return JsonResponse(data={"status": "error", "msg": r})
 
+    def run_in_background(self, request, func, action, description, queryset):
+        """
+        在后台线程中按主键顺序分批执行action，每批一个事务，只锁定当前批次的行
+
+        action 设置 background = True（每批 SIMPLEUI_BACKGROUND_CHUNK_SIZE 条，默认500）
+        或 background = 批大小 即可启用，例如：
+            def approve(self, request, queryset): ...
+            approve.layer = {...}
+            approve.background = 1000
+        进度通过 progress 接口查询；已完成的批次不会因后续批次出错而回滚
+        任务状态保存在 SIMPLEUI_BACKGROUND_CACHE 指定的共享缓存中，超过 SIMPLEUI_BACKGROUND_JOB_STALE 秒
+        （默认15分钟，包括排队时间）没有进度的任务判定为失败
+        """
+        chunk_size = func.background if type(func.background) is int else getattr(
+            settings, 'SIMPLEUI_BACKGROUND_CHUNK_SIZE', 500)
+        info = self.model._meta.app_label, self.model._meta.model_name
+        job = {
+            "id": uuid.uuid4().hex,
+            "action": action,
+            "description": str(description),
+            "user": request.user.pk,
+            "status": "running",
+            "total": None,
+            "processed": 0,
+            "msg": "",
+        }
+        save_job(job)
+        get_executor().submit(self._run_job, job, request, func, queryset, chunk_size)
+        return JsonResponse(data={
+            "status": "background",
+            "msg": "{}: 已在后台执行".format(job["description"]),
+            "job": job["id"],
+            "progress_url": "{}?job={}".format(reverse("admin:%s_%s_progress" % info), job["id"]),
+        })
+
+    def _run_job(self, job, request, func, queryset, chunk_size):
+        close_old_connections()
+        try:
+            queryset = queryset.order_by("pk")
+            job["total"] = queryset.count()
+            self._save_running_job(job)
+            last_pk = None
+            while True:
+                chunk = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+                pks = list(chunk.values_list("pk", flat=True)[:chunk_size])
+                if not pks:
+                    break
+                with transaction.atomic():
+                    r = func(self, request, self.model._default_manager.filter(pk__in=pks))
+                if isinstance(r, dict) and r.get("msg"):
+                    job["msg"] = r["msg"]
+                last_pk = pks[-1]
+                job["processed"] += len(pks)
+                self._save_running_job(job)
+            job["status"] = "success"
+            if not job["msg"]:
+                job["msg"] = "{}: 完成，共处理{}条".format(job["description"], job["processed"])
+            save_job(job)
+        except JobAbandoned:
+            # 任务已被判定中断（排队或单批执行超过 SIMPLEUI_BACKGROUND_JOB_STALE），不再继续，也不覆盖失败状态
+            logging.warning("background action %s abandoned after %s rows", job["action"], job["processed"])
+        except Exception as e:
+            logging.exception("background action %s failed", job["action"])
+            job["status"] = "error"
+            job["msg"] = "{}: 处理{}条后出错: {}".format(job["description"], job["processed"], e)
+            save_job(job)
+        finally:
+            # 线程池中的线程会被复用，用完即关闭（归还）本线程的数据库连接
+            connections.close_all()
+
+    @staticmethod
+    def _save_running_job(job):
+        stored = get_job(job["id"])
+        if stored is None or stored["status"] != "running":
+            raise JobAbandoned(job["id"])
+        save_job(job)
+
+    def get_progress(self, request):
+        """
+        查询后台action的执行进度
+        """
+        job = get_job(request.GET.get("job", ""))
+        if job is None or job["user"] != request.user.pk:
+            return JsonResponse(data={"status": "error", "msg": "任务不存在或已过期"}, status=404)
+        return JsonResponse(data=job)
+
     def get_layer(self, request):
         """
         This method is used to get the layer of the admin interface.
@@ -175,5 +319,6 @@ class AjaxAdmin(admin.ModelAdmin):
 
         return super().get_urls() + [
             path("ajax", self.callback, name="%s_%s_ajax" % info),
-            path("layer", self.get_layer, name="%s_%s_layer" % info)
+            path("layer", self.get_layer, name="%s_%s_layer" % info),
+            path("progress", self.admin_site.admin_view(self.get_progress), name="%s_%s_progress" % info)
         ]
@@ -18,4 +18,32 @@ class SimpleApp(AppConfig):
 
         except Exception as e:
             pass
-        pass
+
+        # 自定义按钮的权限判断使用缓存，权限变化时清空
+        from django.contrib.auth.models import Permission
+        from django.db.models.signals import post_delete, post_migrate, post_save
+        from simpleui.templatetags.simpletags import clear_permission_cache
+        post_save.connect(clear_permission_cache, sender=Permission, dispatch_uid='simpleui_permission_cache_save')
+        post_delete.connect(clear_permission_cache, sender=Permission, dispatch_uid='simpleui_permission_cache_delete')
+        post_migrate.connect(clear_permission_cache, dispatch_uid='simpleui_permission_cache_migrate')
+
+        from django.core import checks
+        checks.register(check_background_cache)
+
+
+def check_background_cache(app_configs, **kwargs):
+    """后台action的任务状态需要各进程共享的缓存"""
+    from django.conf import settings
+    from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+    from django.core.cache.backends.dummy import DummyCache
+    from django.core.cache.backends.locmem import LocMemCache
+    from django.core import checks
+
+    alias = getattr(settings, 'SIMPLEUI_BACKGROUND_CACHE', DEFAULT_CACHE_ALIAS)
+    if isinstance(caches[alias], (LocMemCache, DummyCache)):
+        return [checks.Warning(
+            '后台action的任务状态保存在进程内缓存 {}，多进程部署时其他进程查询不到进度'.format(alias),
+            hint='把 SIMPLEUI_BACKGROUND_CACHE 设为数据库、Redis 等共享缓存',
+            id='simpleui.W001',
+        )]
+    return []
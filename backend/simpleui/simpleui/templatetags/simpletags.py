@@ -32,6 +32,7 @@ register = template.Library()
 
 PY_VER = sys.version[0]  # 2 or 3
 from django.utils.translation import gettext_lazy as _
+from django.utils.translation import get_language as get_active_language
 
 if PY_VER != '2':
     from importlib import reload
@@ -40,6 +41,9 @@ else:
     from urlparse import parse_qsl
 
 import copy
+import hashlib
+import threading
+from collections import OrderedDict
 
 def unicode_to_str(u, encoding='utf-8'):
     if PY_VER != '2':
@@ -225,14 +229,70 @@ def get_filtered_menus(menus, user_permissions):
     return menu_configs
 
 
+# 渲染好的菜单 {(配置版本, 语言, app_list, 权限): menus_string}，最多保留 MENUS_CACHE_SIZE 个
+_menus_cache = OrderedDict()
+_menus_cache_lock = threading.Lock()
+MENUS_CACHE_SIZE = 256
+
+
+def get_config_version(config, icons):
+    """
+    配置内容的指纹：按内容而不是对象计算，原地修改 SIMPLEUI_CONFIG 后菜单缓存同样失效
+    """
+    return hashlib.md5(
+        json.dumps([config, icons], sort_keys=True, cls=LazyEncoder).encode(), usedforsecurity=False
+    ).hexdigest()
+
+
+def get_menus_key(context, config, icons):
+    """
+    菜单只取决于配置、当前语言、用户可见的模型（app_list）以及配置了 permission 时用户的权限
+    """
+    app_list = tuple(
+        (
+            app.get('app_label'), str(app.get('name')),
+            tuple((m.get('object_name'), str(m.get('name')), m.get('admin_url'), m.get('add_url'))
+                  for m in app.get('models') or ())
+        )
+        for app in context.get('app_list')
+    )
+    permissions = None
+    if config and has_permission_in_config(config):
+        permissions = frozenset(context.request.user.get_all_permissions())
+    return get_config_version(config, icons), get_active_language(), app_list, permissions
+
+
 @register.simple_tag(takes_context=True)
 def menus(context, _get_config=None):
-    data = []
-
     # return request.user.has_perm("%s.%s" % (opts.app_label, codename))
     if not _get_config:
         _get_config = get_config
 
+    # 键中含配置内容的指纹，动态修改的配置（dynamic）同样能命中正确的缓存
+    key = get_menus_key(context, _get_config('SIMPLEUI_CONFIG'), _get_config('SIMPLEUI_ICON'))
+    with _menus_cache_lock:
+        menus_string = _menus_cache.get(key)
+        if menus_string is not None:
+            _menus_cache.move_to_end(key)
+    if menus_string is None:
+        menus_string = build_menus(context, _get_config)
+        with _menus_cache_lock:
+            _menus_cache[key] = menus_string
+            while len(_menus_cache) > MENUS_CACHE_SIZE:
+                _menus_cache.popitem(last=False)
+
+    # 把data放入session中，其他地方可以调用；菜单没有变化时不写会话
+    if not isinstance(context, dict) and context.request:
+        session = context.request.session
+        if session.get('_menus') != menus_string:
+            session['_menus'] = menus_string
+
+    return '<script type="text/javascript">var menus={}</script>'.format(menus_string)
+
+
+def build_menus(context, _get_config):
+    data = []
+
     config = _get_config('SIMPLEUI_CONFIG')
     if not config:
         config = {}
@@ -312,13 +372,7 @@ def menus(context, _get_config=None):
     # 给每个菜单增加一个唯一标识，用于tab页判断
     eid = 1000
     handler_eid(data, eid)
-    menus_string = json.dumps(data, cls=LazyEncoder)
-
-    # 把data放入session中，其他地方可以调用
-    if not isinstance(context, dict) and context.request:
-        context.request.session['_menus'] = menus_string
-
-    return '<script type="text/javascript">var menus={}</script>'.format(menus_string)
+    return json.dumps(data, cls=LazyEncoder)
 
 
 def handler_eid(data, eid):
@@ -415,6 +469,28 @@ def get_layer_url(admin):
         traceback.print_exc()
     return reverse(key)
 
+# 各模型在数据库中已定义的权限代码 {(app_label, model_name): (frozenset(codename), 加载时间)}
+# Permission 保存、删除及 migrate 后清空（见 apps.py）；其他进程修改的权限最迟 PERMISSION_CACHE_TTL 秒后生效
+_permission_codenames = {}
+PERMISSION_CACHE_TTL = 300
+
+
+def get_permission_codenames(app_label, model_name):
+    key = (app_label, model_name)
+    cached = _permission_codenames.get(key)
+    if cached is not None and time.monotonic() - cached[1] < PERMISSION_CACHE_TTL:
+        return cached[0]
+    codenames = frozenset(Permission.objects.filter(
+        content_type__app_label=app_label, content_type__model=model_name
+    ).values_list('codename', flat=True))
+    _permission_codenames[key] = (codenames, time.monotonic())
+    return codenames
+
+
+def clear_permission_cache(**kwargs):
+    _permission_codenames.clear()
+
+
 def get_custom_button(request, admin):
     data = {}
     actions = admin.get_actions(request)
@@ -459,9 +535,7 @@ def get_custom_button(request, admin):
             # ContentType.objects.first()
             # 不是超级用户才开始判断
             if not request.user.is_superuser:
-                exists = Permission.objects.filter(codename=name, content_type__app_label=app_label,
-                                                   content_type__model=admin.opts.model_name).exists()
-                if exists:
+                if name in get_permission_codenames(app_label, admin.opts.model_name):
                     if request.user.has_perm('{}.{}'.format(app_label, name)):
                         data[name] = values
                 else:
@@ -17,7 +17,7 @@ export const authAPI = {
   },
   
   /**
-   * 用户登出
+   * 用户登出，服务端注销该用户已签发的全部令牌
    * @returns {Promise} 登出响应
    */
   logout() {
@@ -40,6 +40,22 @@ export const dormitoryAPI = {
     return api.post('/dormitories/', data)
   },
   
+  /**
+   * 批量开通宿舍（仅管理员）
+   * @param {Object} data - 开通数据，以下三种方式任选其一
+   * @param {string} [data.building_name] - 楼栋名称（与 floors、rooms 一起使用）
+   * @param {string} [data.floors] - 楼层范围，如 '1-20'
+   * @param {string} [data.rooms] - 每层房间范围，如 '1-40'
+   * @param {string} [data.room_format] - 房间号格式，默认 '{floor}{room:02d}'，只能使用 {floor}、{room} 和补零宽度
+   * @param {Object[]} [data.dormitories] - 宿舍列表 [{building_name, room_number, floor}]
+   * @param {string} [data.csv] - CSV 文本，表头为 building_name,room_number,floor
+   * @param {boolean} [data.dry_run] - 只校验不写入
+   * @returns {Promise} 开通结果
+   */
+  bulkCreateDormitories(data) {
+    return api.post('/dormitories/bulk/', data)
+  },
+  
   /**
    * 更新宿舍信息（完整更新）
    * @param {number} id - 宿舍ID
@@ -14,6 +14,9 @@ export const repairAPI = {
    * @param {string} params.status - 状态筛选 (pending/processing/completed/cancelled)
    * @param {string} params.priority - 优先级筛选 (low/medium/high/urgent)
    * @param {string} params.fault_type - 故障类型筛选 (water/furniture/door_window/network/other)
+   * @param {string} [params.cursor] - 游标分页，首页传空字符串，之后传响应中的 next/previous
+   * @param {string} [params.fields] - 只返回指定字段，逗号分隔，如 'id,order_number,title,status'
+   * @param {string} [params.count] - 总数统计方式：exact（默认）/estimate（估算）/cached（缓存）/none（不统计，count 为 null）
    * @returns {Promise} 工单列表响应
    */
   getRepairList(params = {}) {
@@ -30,10 +33,12 @@ export const repairAPI = {
   /**
    * 获取工单详情
    * @param {number} id - 工单ID
+   * @param {Object} [params] - 查询参数
+   * @param {string} [params.fields] - 只返回指定字段，逗号分隔，如 'status,student'
    * @returns {Promise} 工单详情
    */
-  getRepairDetail(id) {
-    return api.get(`/repair-orders/${id}/`)
+  getRepairDetail(id, params = {}) {
+    return api.get(`/repair-orders/${id}/`, { params })
   },
   
   /**
@@ -93,8 +98,8 @@ export const repairAPI = {
   /**
    * 分配维修员
    * @param {number} id - 工单ID
-   * @param {number} workerId - 维修员ID
-   * @returns {Promise} 分配响应
+   * @param {number} [workerId] - 维修员ID，不传时按负载、楼栋和专长自动挑选
+   * @returns {Promise} 分配响应，没有可分配的维修员时 order 为 null
    */
   assignWorker(id, workerId) {
     return api.post(`/repair-orders/${id}/assign-worker/`, {
@@ -131,15 +136,39 @@ export const repairAPI = {
   /**
    * 获取工单统计信息
    * @param {Object} params - 统计参数
-   * @param {string} [params.start_date] - 开始日期
-   * @param {string} [params.end_date] - 结束日期
-   * @param {string} [params.group_by] - 分组方式 (status/priority/fault_type/date)
+   * @param {string} [params.start_date] - 开始日期 (YYYY-MM-DD)，默认为结束日期前29天
+   * @param {string} [params.end_date] - 结束日期 (YYYY-MM-DD)，默认为今天
+   * @param {string} [params.group_by] - 分组方式 (status/priority/fault_type/building_name/date)，默认 status
+   * @param {string} [params.building_name] - 按楼栋筛选，另可按 status/priority/fault_type 筛选
    * @returns {Promise} 统计数据
    */
   getStatistics(params = {}) {
     return api.get('/repair-orders/statistics/', { params })
   },
   
+  /**
+   * 维修员领取下一张工单（优先级最高、最早创建的待处理工单）
+   * @param {Object} [data] - 领取条件
+   * @param {string[]} [data.fault_types] - 可处理的故障类型，默认不限
+   * @param {string[]} [data.buildings] - 负责的楼栋，默认不限
+   * @param {number} [data.worker_id] - 代为领取的维修员ID（仅管理员）
+   * @returns {Promise} 领取结果，没有可领取的工单时 order 为 null
+   */
+  claimNext(data = {}) {
+    return api.post('/repair-orders/claim-next/', data)
+  },
+
+  /**
+   * 批量自动分配维修员（仅管理员）
+   * @param {Object} [data] - 分配范围
+   * @param {number[]} [data.ids] - 工单ID数组，默认按优先级、创建时间取待分配的工单
+   * @param {number} [data.limit] - 不传 ids 时最多分配的工单数
+   * @returns {Promise} 分配结果
+   */
+  autoAssign(data = {}) {
+    return api.post('/repair-orders/auto-assign/', data)
+  },
+
   /**
    * 批量更新工单状态
    * @param {number[]} ids - 工单ID数组
@@ -155,7 +184,9 @@ export const repairAPI = {
   
   /**
    * 导出工单数据
-   * @param {Object} params - 导出参数
+   * @param {Object} params - 导出参数，筛选条件与 getRepairList 相同
+   * @param {string} [params.format] - 导出格式 (csv/ndjson)，默认csv
+   * @param {string} [params.fields] - 导出的列，逗号分隔，默认全部
    * @returns {Promise} 导出响应
    */
   exportData(params = {}) {
@@ -21,6 +21,14 @@ export const systemAPI = {
     return api.get('/system/info/')
   },
   
+  /**
+   * 获取数据库连接池统计（仅管理员）
+   * @returns {Promise} 处理请求的进程号及各数据库连接池的使用情况
+   */
+  getDbPoolStats() {
+    return api.get('/system/db-pool/')
+  },
+  
   /**
    * 获取枚举选项
    * @param {string} type - 枚举类型 (status/priority/fault_type等)
@@ -127,6 +127,7 @@ router.beforeEach(async (to, from, next) => {
       console.log('用户信息验证失败，跳转到登录页')
       // 清除无效的认证信息
       localStorage.removeItem('token')
+      localStorage.removeItem('refresh_token')
       localStorage.removeItem('user')
       ElMessage.warning('登录信息已失效，请重新登录')
       next('/login')
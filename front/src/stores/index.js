@@ -23,6 +23,7 @@ export const useAuthStore = defineStore('auth', () => {
       
       // 保存到本地存储
       localStorage.setItem('token', response.token)
+      localStorage.setItem('refresh_token', response.refresh)
       localStorage.setItem('user', JSON.stringify(response.user))
       
       return response
@@ -43,6 +44,7 @@ export const useAuthStore = defineStore('auth', () => {
       token.value = ''
       user.value = null
       localStorage.removeItem('token')
+      localStorage.removeItem('refresh_token')
       localStorage.removeItem('user')
     }
   }
@@ -9,15 +9,38 @@ const api = axios.create({
     'Content-Type': 'application/json',
     'Accept': 'application/json',
   },
-  // 支持跨域请求，启用cookies以支持Django session认证
+  // 支持跨域请求，启用cookies（管理后台等仍使用Django session认证）
   withCredentials: true
 })
 
+// 正在进行的刷新请求，多个请求同时401时只刷新一次
+let refreshPromise = null
+
+const refreshAccessToken = () => {
+  if (!refreshPromise) {
+    const refresh = localStorage.getItem('refresh_token')
+    refreshPromise = (refresh
+      ? axios.post(`${api.defaults.baseURL}/auth/refresh/`, { refresh }, { withCredentials: true })
+      : Promise.reject(new Error('缺少refresh令牌'))
+    ).then((response) => {
+      localStorage.setItem('token', response.data.token)
+      localStorage.setItem('refresh_token', response.data.refresh)
+      return response.data.token
+    }).finally(() => {
+      refreshPromise = null
+    })
+  }
+  return refreshPromise
+}
+
 // 请求拦截器 - 前后端分离架构
 api.interceptors.request.use(
   (config) => {
-    // Django使用session认证，不需要添加Authorization头
-    // session会通过cookies自动传递
+    // 登录后携带签名令牌，后端无需查询会话
+    const token = localStorage.getItem('token')
+    if (token && !config.headers.Authorization) {
+      config.headers.Authorization = `Bearer ${token}`
+    }
     
     // 开发环境下的请求日志
     if (import.meta.env.DEV && import.meta.env.VITE_LOG_API_REQUESTS === 'true') {
@@ -61,7 +84,21 @@ api.interceptors.response.use(
     
     return response.data
   },
-  (error) => {
+  async (error) => {
+    // access令牌过期时用refresh令牌换取新令牌后重试一次
+    const config = error.config
+    if (error.response?.status === 401 && config && !config._retried &&
+        localStorage.getItem('refresh_token') && !config.url?.startsWith('/auth/')) {
+      config._retried = true
+      try {
+        const token = await refreshAccessToken()
+        config.headers.Authorization = `Bearer ${token}`
+        return api(config)
+      } catch (refreshError) {
+        localStorage.removeItem('refresh_token')
+      }
+    }
+    
     console.error('响应错误:', error)
     
     // 统一错误处理